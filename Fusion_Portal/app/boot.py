@@ -0,0 +1,167 @@
+"""Portal boot sequence.
+
+``boot()`` is the single place the Flask server is built and the Dash apps are
+mounted. Run under gunicorn with ``preload_app = True`` (see gunicorn.conf.py)
+it executes once in the master: settings, ODBC driver resolution, Dash app
+registration and the deferred module imports are then shared copy-on-write
+with every forked worker.
+
+Nothing here may open a database connection - pooled pyodbc handles must not
+cross a fork.
+
+Cold-start report for the current tree (does not start a server):
+    python -m app.boot
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from .config import get_settings
+
+# Third-party packages every mounted Dash app needs. Imported (and timed) ahead
+# of the modules so per-module numbers show only the module's own cost.
+FRAMEWORK_IMPORTS = ("flask", "flask_login", "pyodbc", "dash", "dash_bootstrap_components")
+
+# (name, module path, factory) - mounted in this order. Module apps
+# (/module/<slug>/) are not listed here: app.modules.registry mounts them on
+# first use, or at boot when named in FUSION_PRELOAD_MODULES.
+DASH_APPS = [
+    ("Portal", "app.dash_ui", "create_dash_app"),
+]
+
+@dataclass
+class BootReport:
+    preload: bool = False
+    pid: int = 0
+    total_s: float = 0.0
+    stages: list[tuple[str, float]] = field(default_factory=list)
+    imports: list[tuple[str, float, bool]] = field(default_factory=list)  # (module, seconds, was_cached)
+    warnings: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "preload": self.preload,
+            "pid": self.pid,
+            "total_ms": round(self.total_s * 1000, 1),
+            "max_rss_kb": _max_rss_kb(),
+            "stages": [{"stage": n, "ms": round(s * 1000, 1)} for n, s in self.stages],
+            "imports": [{"module": m, "ms": round(s * 1000, 1), "cached": c} for m, s, c in self.imports],
+            "warnings": list(self.warnings),
+        }
+
+    def render(self) -> str:
+        mode = "preload (master)" if self.preload else "per-worker"
+        lines = [f"[BOOT] pid={self.pid} mode={mode} total={self.total_s * 1000:.1f} ms"]
+        for name, secs in self.stages:
+            lines.append(f"[BOOT]   stage  {name:<34} {secs * 1000:8.1f} ms")
+        for mod, secs, cached in self.imports:
+            note = " (already loaded)" if cached else ""
+            lines.append(f"[BOOT]   import {mod:<34} {secs * 1000:8.1f} ms{note}")
+        rss = _max_rss_kb()
+        if rss is not None:
+            lines.append(f"[BOOT]   max RSS {rss / 1024:.1f} MiB")
+        for w in self.warnings:
+            lines.append(f"[BOOT]   warning: {w}")
+        return "\n".join(lines)
+
+def _max_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows dev boxes
+        return None
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+_report = BootReport()
+
+def boot_report() -> BootReport:
+    return _report
+
+@contextmanager
+def _stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report.stages.append((name, time.perf_counter() - t0))
+
+def _timed_import(name: str):
+    cached = name in sys.modules
+    t0 = time.perf_counter()
+    mod = importlib.import_module(name)
+    _report.imports.append((name, time.perf_counter() - t0, cached))
+    return mod
+
+def boot(preload: bool | None = None, quiet: bool = False):
+    """Build the portal WSGI app. Returns the Flask server."""
+    global _report
+    _report = BootReport(pid=os.getpid())
+    t_start = time.perf_counter()
+
+    with _stage("settings"):
+        settings = get_settings()
+    _report.preload = settings.preload if preload is None else preload
+
+    with _stage("odbc driver"):
+        from .db import resolve_driver
+        try:
+            resolve_driver()
+        except Exception as e:
+            # Keep booting: /healthz and /login must still answer. conn_str()
+            # retries resolution and surfaces the error on first DB use.
+            _report.warnings.append(f"ODBC driver not resolved: {type(e).__name__}: {e}")
+
+    with _stage("framework imports"):
+        for name in FRAMEWORK_IMPORTS:
+            _timed_import(name)
+
+    with _stage("flask server"):
+        from .server import create_server
+        server = create_server()
+
+    from .layout_cache import enable_layout_cache
+    from .profiling import instrument_dash_app
+
+    deferred: list[str] = []
+    for name, module_path, factory in DASH_APPS:
+        with _stage(f"dash app: {name}"):
+            mod = _timed_import(module_path)
+            dash_app = getattr(mod, factory)(server)
+            if hasattr(mod, "LAYOUT_DEPENDS_ON"):
+                enable_layout_cache(dash_app, name, mod.LAYOUT_DEPENDS_ON)
+            # Profiling wraps the cache so hits and 304s are measured too.
+            instrument_dash_app(dash_app, name)
+        deferred.extend(getattr(mod, "DEFERRED_IMPORTS", ()))
+
+    with _stage("module registry"):
+        from .modules.registry import preload_modules, register_module_routes
+        register_module_routes(server)
+    for slug in settings.preload_modules:
+        with _stage(f"module: {slug}"):
+            preload_modules([slug])
+
+    if _report.preload and deferred:
+        # Workers fork after this point, so paying for these here means no
+        # worker pays for them on its first chart or preview.
+        with _stage("warm deferred imports"):
+            for name in deferred:
+                _timed_import(name)
+
+    _report.total_s = time.perf_counter() - t_start
+    server.extensions["fusion_boot_report"] = _report
+    if not quiet:
+        print(_report.render(), flush=True)
+    return server
+
+if __name__ == "__main__":
+    import json
+
+    boot(quiet=True)
+    if "--json" in sys.argv:
+        print(json.dumps(_report.as_dict(), indent=2))
+    else:
+        print(_report.render())
@@ -0,0 +1,158 @@
+"""
+Per-database circuit breaker.
+
+One breaker per database name (the portal DB and CORE_DB trip independently).
+app.metrics reports every connect / execute outcome here:
+
+- closed:    calls pass; connect failures and query timeouts are counted and
+             DB_BREAKER_FAILURES consecutive ones open the breaker.
+- open:      get_conn() raises DatabaseUnavailable immediately, so pages show
+             their usual error alert in milliseconds instead of each request
+             thread waiting out the connect timeout.
+- half_open: a background thread probes (connect + SELECT 1) after
+             DB_BREAKER_RESET_S, doubling up to MAX_RESET_S while it keeps
+             failing. Requests still fail fast; the first successful probe
+             closes the breaker.
+
+States are per process and are reported on /healthz.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from .metrics import Counter, add_outcome_listener, register
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+MAX_RESET_S = 60.0
+
+# SQLSTATEs that mean "the server did not answer" rather than "bad statement"
+TIMEOUT_SQLSTATES = ("HYT00", "HYT01", "08S01", "08001")
+
+DB_BREAKER_OPENS = register(Counter(
+    "fusion_db_breaker_opens_total", "Times a database circuit breaker opened", ("database",)))
+
+class DatabaseUnavailable(RuntimeError):
+    pass
+
+def _sqlstate(exc: BaseException) -> str:
+    args = getattr(exc, "args", ())
+    return str(args[0]) if args else ""
+
+def is_availability_error(phase: str, exc: BaseException) -> bool:
+    if phase == "connect":
+        return not isinstance(exc, DatabaseUnavailable)
+    return _sqlstate(exc) in TIMEOUT_SQLSTATES
+
+class CircuitBreaker:
+    def __init__(self, database: str, failures: int, reset_s: float, probe):
+        self.database = database
+        self.threshold = max(1, failures)
+        self.base_reset_s = reset_s
+        self.probe = probe  # zero-arg callable, raises if the DB is still down
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error = ""
+        self.opened_at = 0.0
+        self.reset_s = reset_s
+        self._prober: threading.Thread | None = None
+
+    def allow(self) -> None:
+        if self.state == CLOSED:
+            return
+        retry = max(0.0, self.opened_at + self.reset_s - time.monotonic())
+        raise DatabaseUnavailable(
+            f"Database '{self.database}' is unavailable ({self.failures} consecutive failures, "
+            f"last: {self.last_error}); next check in {retry:.0f}s."
+        )
+
+    def on_outcome(self, phase: str, exc: BaseException | None) -> None:
+        if exc is None:
+            if self.failures or self.state != CLOSED:
+                with self._lock:
+                    self.failures = 0
+                    if self.state != CLOSED:
+                        self._close()
+            return
+        if not is_availability_error(phase, exc):
+            return
+        with self._lock:
+            self.failures += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"[:300]
+            if self.state == CLOSED and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.reset_s = self.base_reset_s
+        DB_BREAKER_OPENS.inc(self.database)
+        print(f"[DB] breaker open for {self.database}: {self.last_error}", flush=True)
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name=f"breaker-{self.database}", daemon=True)
+            self._prober.start()
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        print(f"[DB] breaker closed for {self.database}", flush=True)
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(max(0.0, self.opened_at + self.reset_s - time.monotonic()))
+            with self._lock:
+                if self.state == CLOSED:
+                    return
+                self.state = HALF_OPEN
+            try:
+                self.probe()
+            except Exception as e:
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"[:300]
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+                    self.reset_s = min(self.reset_s * 2, MAX_RESET_S)
+                continue
+            with self._lock:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._close()
+            return
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_probe_factory = None
+
+def configure(probe_factory) -> None:
+    """probe_factory(database) -> zero-arg probe callable (set by app.db)."""
+    global _probe_factory
+    _probe_factory = probe_factory
+
+def breaker_for(database: str) -> CircuitBreaker:
+    b = _breakers.get(database)
+    if b is None:
+        from .config import get_settings
+
+        s = get_settings()
+        with _breakers_lock:
+            b = _breakers.get(database)
+            if b is None:
+                probe = _probe_factory(database) if _probe_factory else (lambda: None)
+                b = _breakers[database] = CircuitBreaker(database, s.db_breaker_failures, s.db_breaker_reset_s, probe)
+    return b
+
+def breaker_states() -> dict[str, dict]:
+    return {name: b.as_dict() for name, b in sorted(_breakers.items())}
+
+def _on_outcome(database: str, phase: str, exc: BaseException | None) -> None:
+    if database:
+        breaker_for(database).on_outcome(phase, exc)
+
+add_outcome_listener(_on_outcome)
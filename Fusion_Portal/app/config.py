@@ -1,7 +1,10 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
+from .env import env_flag, env_float, env_int
+
 @dataclass(frozen=True)
 class Settings:
     db_driver: str = "ODBC Driver 18 for SQL Server"
@@ -16,6 +19,60 @@ class Settings:
     # Module DBs
     core_db: str = ""
 
+    # Boot: build everything in the gunicorn master (--preload)
+    preload: bool = False
+    # Module slugs mounted at boot rather than on first request
+    preload_modules: tuple = ()
+
+    # /metrics: scrapers send "Authorization: Bearer <token>"; without a token
+    # only admin sessions can read it, unless metrics_public opens it to all
+    metrics_token: str = ""
+    metrics_public: bool = False
+
+    # ADM.Users.role values (lower-case) allowed on /admin pages
+    admin_roles: tuple = ("admin", "ceo")
+
+    # Fail fast when a database is slow or unreachable (app/breaker.py)
+    db_connect_timeout: int = 5      # seconds, login timeout
+    db_query_timeout: int = 20       # seconds per statement, 0 = none
+    db_breaker_failures: int = 3     # consecutive failures before opening
+    db_breaker_reset_s: float = 10.0 # first background probe after opening
+
+    # Read-only workloads on a replica (app/replicas.py)
+    db_read_routing: bool = False
+    db_read_server: str = ""         # "" = primary server with ApplicationIntent=ReadOnly
+    db_read_database_suffix: str = ""
+    db_read_max_lag_s: float = 30.0  # 0 = do not check replica lag
+
+    # Per-user Dash layout cache (app/layout_cache.py)
+    layout_cache_ttl: int = 300      # seconds, 0 disables the cache
+    layout_cache_max: int = 2000     # entries per process
+
+    # Dash profiling (app/profiling.py)
+    profile_sample_rate: float = 0.0 # fraction of requests run under cProfile
+    profile_slow_ms: float = 2000.0  # always profile requests slower than this
+    profile_dir: str = "profiles"
+
+    # Modules (app/modules/registry.py): unload after this long idle, 0 = never
+    module_idle_unload_s: float = 0.0
+
+    # Core page panels (app/modules/core_dash.py), seconds each
+    core_kpi_timeout_s: float = 5.0
+    core_chart_timeout_s: float = 15.0
+    core_tables_timeout_s: float = 10.0
+    core_profile_timeout_s: float = 10.0
+    core_panel_workers: int = 8
+    core_typeahead_debounce_ms: int = 250
+    # Core table search (app/modules/core_search.py)
+    core_typeahead_limit: int = 50
+    core_catalog_ttl_s: int = 600
+    core_search_columns: bool = False
+    # Core column profile (app/modules/core_profile.py)
+    core_profile_exact_rows: int = 200_000
+    core_profile_sample_rows: int = 100_000
+    core_profile_max_columns: int = 100
+    core_profile_top_values: int = 5
+
 def load_settings() -> Settings:
     # Optional INI support (local dev). In production prefer env vars.
     ini_path = os.getenv("FUSION_INI_PATH")
@@ -58,4 +115,42 @@ def load_settings() -> Settings:
         db_trust_server_certificate=os.getenv("DB_TRUST_SERVER_CERTIFICATE") or ini_values.get("db_trust_server_certificate") or "no",
         secret_key=os.getenv("SECRET_KEY") or "change-me",
         core_db=core_db,
+        preload=env_flag("FUSION_PRELOAD"),
+        preload_modules=tuple(m.strip() for m in (os.getenv("FUSION_PRELOAD_MODULES") or "").split(",") if m.strip()),
+        metrics_token=(os.getenv("METRICS_TOKEN") or "").strip(),
+        metrics_public=env_flag("METRICS_PUBLIC"),
+        admin_roles=tuple(r.strip().lower() for r in (os.getenv("ADMIN_ROLES") or "Admin,CEO").split(",") if r.strip()),
+        db_connect_timeout=int(os.getenv("DB_CONNECT_TIMEOUT") or 5),
+        db_query_timeout=int(os.getenv("DB_QUERY_TIMEOUT") or 20),
+        db_breaker_failures=int(os.getenv("DB_BREAKER_FAILURES") or 3),
+        db_breaker_reset_s=float(os.getenv("DB_BREAKER_RESET_S") or 10),
+        db_read_routing=env_flag("DB_READ_ROUTING"),
+        db_read_server=(os.getenv("DB_READ_SERVER") or "").strip(),
+        db_read_database_suffix=(os.getenv("DB_READ_DATABASE_SUFFIX") or "").strip(),
+        db_read_max_lag_s=float(os.getenv("DB_READ_MAX_LAG_S") or 30),
+        layout_cache_ttl=env_int("LAYOUT_CACHE_TTL", 300),
+        layout_cache_max=env_int("LAYOUT_CACHE_MAX", 2000),
+        profile_sample_rate=env_float("PROFILE_SAMPLE_RATE", 0.0),
+        profile_slow_ms=env_float("PROFILE_SLOW_MS", 2000.0),
+        profile_dir=os.getenv("PROFILE_DIR") or "profiles",
+        module_idle_unload_s=env_float("MODULE_IDLE_UNLOAD_S", 0.0),
+        core_kpi_timeout_s=env_float("CORE_KPI_TIMEOUT_S", 5.0),
+        core_chart_timeout_s=env_float("CORE_CHART_TIMEOUT_S", 15.0),
+        core_tables_timeout_s=env_float("CORE_TABLES_TIMEOUT_S", 10.0),
+        core_profile_timeout_s=env_float("CORE_PROFILE_TIMEOUT_S", 10.0),
+        core_panel_workers=env_int("CORE_PANEL_WORKERS", 8),
+        core_typeahead_debounce_ms=env_int("CORE_TYPEAHEAD_DEBOUNCE_MS", 250),
+        core_typeahead_limit=env_int("CORE_TYPEAHEAD_LIMIT", 50),
+        core_catalog_ttl_s=env_int("CORE_CATALOG_TTL_S", 600),
+        core_search_columns=env_flag("CORE_SEARCH_COLUMNS"),
+        core_profile_exact_rows=env_int("CORE_PROFILE_EXACT_ROWS", 200_000),
+        core_profile_sample_rows=env_int("CORE_PROFILE_SAMPLE_ROWS", 100_000),
+        core_profile_max_columns=env_int("CORE_PROFILE_MAX_COLUMNS", 100),
+        core_profile_top_values=env_int("CORE_PROFILE_TOP_VALUES", 5),
     )
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # Resolved once per process. Under gunicorn --preload this happens in the
+    # master and workers inherit the result.
+    return load_settings()
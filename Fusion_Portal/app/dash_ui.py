@@ -6,7 +6,12 @@ import dash_bootstrap_components as dbc
 from flask import has_request_context
 from flask_login import current_user
 
+from . import versions
 from .data_access import fetch_kpis_for_user, fetch_modules_for_user, fetch_user_profile
+from .layout_cache import mark_uncacheable
+
+# Data the rendered landing page depends on (see app.layout_cache).
+LAYOUT_DEPENDS_ON = (versions.ADM_USERS, versions.ADM_PROFILE, versions.ADM_ACL)
 
 def kpi_tile(title: str, value: str, hint: str | None = None):
     return dbc.Card(
@@ -56,6 +61,7 @@ def build_layout():
         kpis = fetch_kpis_for_user(user_id)
         modules = fetch_modules_for_user(user_id)
     except Exception as e:
+        mark_uncacheable()
         return dbc.Container([
             header,
             dbc.Alert(f"Landing page could not load DB data: {type(e).__name__}: {e}", color="danger"),
@@ -3,17 +3,59 @@ from __future__ import annotations
 from typing import List, Optional
 
 from .db import get_conn
+from .statements import STATEMENTS
 from .user_model import User
 
+USER_BY_LOGIN = STATEMENTS.define("fetch_user_by_username_or_email", """
+SELECT TOP 1 user_id, username, email, password_hash, first_name, last_name, role, is_active
+FROM ADM.Users
+WHERE username = ? OR email = ?
+""", ("username", "email"))
+
+USER_BY_ID = STATEMENTS.define("fetch_user_by_id", """
+SELECT user_id, username, email, first_name, last_name, role, is_active
+FROM ADM.Users
+WHERE user_id = ?
+""", ("user_id",))
+
+UPDATE_LAST_LOGIN = STATEMENTS.define(
+    "update_last_login", "UPDATE ADM.Users SET last_login = SYSDATETIME() WHERE user_id = ?", ("user_id",))
+
+USER_PROFILE = STATEMENTS.define("fetch_user_profile", """
+SELECT theme, default_module, landing_layout, kpi_preferences
+FROM ADM.UserProfile
+WHERE user_id = ?
+""", ("user_id",))
+
+MODULES_FOR_USER = STATEMENTS.define("fetch_modules_for_user", """
+SELECT m.module_name, m.module_url, m.icon
+FROM ADM.Modules m
+INNER JOIN ADM.UserModuleAccess a ON a.module_id = m.module_id
+WHERE a.user_id = ? AND a.can_view = 1 AND m.is_active = 1
+ORDER BY m.module_name
+""", ("user_id",))
+
+ACTIVE_MODULES = STATEMENTS.define("fetch_active_modules", """
+SELECT module_name, module_url, icon
+FROM ADM.Modules
+WHERE is_active = 1
+ORDER BY module_name
+""")
+
+USER_CAN_ACCESS_URL = STATEMENTS.define("user_can_access_url", """
+SELECT TOP 1 1
+FROM ADM.Modules m
+INNER JOIN ADM.UserModuleAccess a ON a.module_id = m.module_id
+WHERE a.user_id = ?
+  AND a.can_view = 1
+  AND m.is_active = 1
+  AND (m.module_url = ? OR m.module_url = ?)
+""", ("user_id", "url", "url_slash"))
+
 def fetch_user_by_username_or_email(login: str) -> Optional[dict]:
-    sql = """
-    SELECT TOP 1 user_id, username, email, password_hash, first_name, last_name, role, is_active
-    FROM ADM.Users
-    WHERE username = ? OR email = ?
-    """
-    with get_conn() as conn:
+    with get_conn(query=USER_BY_LOGIN.name) as conn:
         cur = conn.cursor()
-        row = cur.execute(sql, login, login).fetchone()
+        row = USER_BY_LOGIN.execute(cur, login, login).fetchone()
         cur.close()
     if not row:
         return None
@@ -21,14 +63,9 @@ def fetch_user_by_username_or_email(login: str) -> Optional[dict]:
     return dict(zip(cols, row))
 
 def fetch_user_by_id(user_id: int) -> Optional[User]:
-    sql = """
-    SELECT user_id, username, email, first_name, last_name, role, is_active
-    FROM ADM.Users
-    WHERE user_id = ?
-    """
-    with get_conn() as conn:
+    with get_conn(query=USER_BY_ID.name) as conn:
         cur = conn.cursor()
-        row = cur.execute(sql, user_id).fetchone()
+        row = USER_BY_ID.execute(cur, user_id).fetchone()
         cur.close()
     if not row:
         return None
@@ -43,21 +80,15 @@ def fetch_user_by_id(user_id: int) -> Optional[User]:
     )
 
 def update_last_login(user_id: int) -> None:
-    sql = "UPDATE ADM.Users SET last_login = SYSDATETIME() WHERE user_id = ?"
-    with get_conn(autocommit=True) as conn:
+    with get_conn(autocommit=True, query=UPDATE_LAST_LOGIN.name) as conn:
         cur = conn.cursor()
-        cur.execute(sql, user_id)
+        UPDATE_LAST_LOGIN.execute(cur, user_id)
         cur.close()
 
 def fetch_user_profile(user_id: int) -> dict:
-    sql = """
-    SELECT theme, default_module, landing_layout, kpi_preferences
-    FROM ADM.UserProfile
-    WHERE user_id = ?
-    """
-    with get_conn() as conn:
+    with get_conn(query=USER_PROFILE.name) as conn:
         cur = conn.cursor()
-        row = cur.execute(sql, user_id).fetchone()
+        row = USER_PROFILE.execute(cur, user_id).fetchone()
         cur.close()
 
     if not row:
@@ -71,16 +102,17 @@ def fetch_user_profile(user_id: int) -> dict:
     }
 
 def fetch_modules_for_user(user_id: int) -> List[dict]:
-    sql = """
-    SELECT m.module_name, m.module_url, m.icon
-    FROM ADM.Modules m
-    INNER JOIN ADM.UserModuleAccess a ON a.module_id = m.module_id
-    WHERE a.user_id = ? AND a.can_view = 1 AND m.is_active = 1
-    ORDER BY m.module_name
-    """
-    with get_conn() as conn:
+    with get_conn(query=MODULES_FOR_USER.name) as conn:
+        cur = conn.cursor()
+        rows = MODULES_FOR_USER.execute(cur, user_id).fetchall()
+        cur.close()
+
+    return [{"name": r[0], "url": r[1], "icon": r[2]} for r in rows]
+
+def fetch_active_modules() -> List[dict]:
+    with get_conn(query=ACTIVE_MODULES.name) as conn:
         cur = conn.cursor()
-        rows = cur.execute(sql, user_id).fetchall()
+        rows = ACTIVE_MODULES.execute(cur).fetchall()
         cur.close()
 
     return [{"name": r[0], "url": r[1], "icon": r[2]} for r in rows]
@@ -90,18 +122,9 @@ def user_can_access_url(user_id: int, module_url: str) -> bool:
     url1 = module_url.rstrip("/")
     url2 = url1 + "/"
 
-    sql = """
-    SELECT TOP 1 1
-    FROM ADM.Modules m
-    INNER JOIN ADM.UserModuleAccess a ON a.module_id = m.module_id
-    WHERE a.user_id = ?
-      AND a.can_view = 1
-      AND m.is_active = 1
-      AND (m.module_url = ? OR m.module_url = ?)
-    """
-    with get_conn() as conn:
+    with get_conn(query=USER_CAN_ACCESS_URL.name) as conn:
         cur = conn.cursor()
-        row = cur.execute(sql, user_id, url1, url2).fetchone()
+        row = USER_CAN_ACCESS_URL.execute(cur, user_id, url1, url2).fetchone()
         cur.close()
     return bool(row)
 
@@ -1,5 +1,9 @@
+from functools import lru_cache
+
 import pyodbc
-from .config import load_settings
+from . import breaker, dbio, replicas
+from .config import get_settings
+from .metrics import instrument_connection
 
 pyodbc.pooling = True
 
@@ -21,14 +25,28 @@ def _pick_driver(requested: str) -> str:
 
     raise RuntimeError(f"No suitable SQL Server ODBC driver found. Available={available}")
 
-def conn_str(database: str | None = None) -> str:
-    s = load_settings()
-    driver = _pick_driver(s.db_driver)
+@lru_cache(maxsize=1)
+def resolve_driver() -> str:
+    # pyodbc.drivers() walks odbcinst.ini; do it once per process (once in the
+    # master under --preload). Failures are not cached, so a later call retries.
+    driver = _pick_driver(get_settings().db_driver)
+    print(f"[DB] Using ODBC driver: {driver}")
+    return driver
+
+def conn_str(database: str | None = None, readonly: bool = False) -> str:
+    s = get_settings()
+    driver = resolve_driver()
 
     db = database or s.db_database
+    server = s.db_server
+    intent = ""
+    if readonly:
+        db += s.db_read_database_suffix
+        server = s.db_read_server or server
+        intent = "" if s.db_read_server else "ApplicationIntent=ReadOnly;"
 
     missing = [k for k, v in {
-        "DB_SERVER": s.db_server,
+        "DB_SERVER": server,
         "DB_USER": s.db_user,
         "DB_PASSWORD": s.db_password,
         "DATABASE": db
@@ -37,19 +55,74 @@ def conn_str(database: str | None = None) -> str:
     if missing:
         raise RuntimeError(f"Missing DB settings: {', '.join(missing)}")
 
-    # No secrets in logs
-    print(f"[DB] Using ODBC driver: {driver} | Database: {db}")
-
     return (
         f"DRIVER={{{driver}}};"
-        f"SERVER={s.db_server};"
+        f"SERVER={server};"
         f"DATABASE={db};"
         f"UID={s.db_user};"
         f"PWD={s.db_password};"
         f"Encrypt={s.db_encrypt};"
         f"TrustServerCertificate={s.db_trust_server_certificate};"
-        "Connection Timeout=30;"
+        f"Connection Timeout={s.db_connect_timeout};"
+        f"{intent}"
     )
 
-def get_conn(autocommit: bool = False, database: str | None = None):
-    return pyodbc.connect(conn_str(database=database), autocommit=autocommit)
+def _connect(cs: str, autocommit: bool):
+    # Connect and every later driver call go through dbio's gate: bounded
+    # DB concurrency, and off the event loop under a gevent worker.
+    s = get_settings()
+    conn = dbio.connect(pyodbc.connect, cs, autocommit=autocommit, timeout=s.db_connect_timeout)
+    if s.db_query_timeout:
+        conn.timeout = s.db_query_timeout
+    return conn
+
+def _probe_factory(database: str):
+    readonly = database.endswith("@read")
+    target = database[:-len("@read")] if readonly else database
+
+    def probe():
+        conn = _connect(conn_str(database=target, readonly=readonly), autocommit=True)
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+        finally:
+            conn.close()
+    return probe
+
+breaker.configure(_probe_factory)
+
+def _replica_conn(db: str, autocommit: bool, query: str):
+    """Replica connection for a read-only workload, or None to use the primary."""
+    s = get_settings()
+    route = replicas.route_for(db, s.db_read_max_lag_s)
+    if not route.use_replica():
+        replicas.DB_READ_ROUTES.inc(db, "primary_stale")
+        return None
+    try:
+        breaker.breaker_for(route.label).allow()
+        cs = conn_str(database=db, readonly=True)
+        conn = instrument_connection(lambda: _connect(cs, autocommit), query, route.label)
+    except Exception:
+        # Breaker open or connect failed (counted against the replica's breaker)
+        replicas.DB_READ_ROUTES.inc(db, "primary_fallback")
+        return None
+    if route.lag_check_due():
+        route.check_lag(conn)
+        if not route.use_replica():
+            conn.close()
+            replicas.DB_READ_ROUTES.inc(db, "primary_stale")
+            return None
+    replicas.DB_READ_ROUTES.inc(db, "replica")
+    return conn
+
+def get_conn(autocommit: bool = False, database: str | None = None, query: str = "unnamed", readonly: bool = False):
+    # query names the statement(s) run on this connection in /metrics.
+    # readonly: the caller only reads and tolerates replica lag (app/replicas.py).
+    db = database or get_settings().db_database
+    if readonly and get_settings().db_read_routing:
+        conn = _replica_conn(db, autocommit, query)
+        if conn is not None:
+            return conn
+    cs = conn_str(database=database)
+    # Raises DatabaseUnavailable at once while this database's breaker is open
+    breaker.breaker_for(db).allow()
+    return instrument_connection(lambda: _connect(cs, autocommit), query, db)
@@ -0,0 +1,161 @@
+"""
+Per-user cache of serialised Dash layouts, served with ETags.
+
+enable_layout_cache() wraps a Dash app's ``_dash-layout`` view. The first
+request for (app, user, data versions) runs the layout function and Dash's
+JSON serialisation as usual; the JSON bytes are then stored together with
+their gzip (and, if the optional ``brotli`` package is installed, brotli)
+encodings and a content hash ETag. Later requests:
+
+- If-None-Match matches -> 304, no body
+- otherwise the stored bytes in the best encoding the client accepts
+
+Entries are keyed on app.versions counters, so bumping e.g. ADM_ACL makes
+every cached layout that depends on it stale at once. LAYOUT_CACHE_TTL
+(seconds, default 300) bounds staleness for changes nobody bumps for; while
+the ADM change bus is live the bound is versions.max_age() instead.
+Layout functions call mark_uncacheable() on error paths so a transient DB
+failure is never cached.
+"""
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import Response, g, request
+from flask_login import current_user
+
+from . import versions
+from .config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+LAYOUT_CACHE_TTL = get_settings().layout_cache_ttl       # 0 disables the cache
+LAYOUT_CACHE_MAX = get_settings().layout_cache_max       # entries per process
+COMPRESS_MIN_BYTES = 1024
+
+@dataclass(frozen=True)
+class CachedLayout:
+    body: bytes
+    gzip: bytes | None
+    br: bytes | None
+    etag: str
+    created: float
+
+class LayoutCache:
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, CachedLayout] = OrderedDict()
+        self.hits = self.misses = self.not_modified = 0
+
+    def get(self, key) -> CachedLayout | None:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is not None and time.monotonic() - e.created > versions.max_age(self.ttl_s):
+                del self._entries[key]
+                e = None
+            if e is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return e
+
+    def put(self, key, entry: CachedLayout) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, app: str | None = None, user_id: str | None = None) -> None:
+        with self._lock:
+            for k in [k for k in self._entries if (app is None or k[0] == app) and (user_id is None or k[1] == user_id)]:
+                del self._entries[k]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(e.body) for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+layout_cache = LayoutCache(LAYOUT_CACHE_MAX, LAYOUT_CACHE_TTL)
+
+def mark_uncacheable() -> None:
+    """Call from a layout function when it rendered a fallback/error layout."""
+    g.fusion_layout_uncacheable = True
+
+def _encode(body: bytes) -> CachedLayout:
+    gz = br = None
+    if len(body) >= COMPRESS_MIN_BYTES:
+        gz = gzip.compress(body, compresslevel=6)
+        if brotli is not None:
+            br = brotli.compress(body, quality=5)
+    etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+    return CachedLayout(body, gz, br, etag, time.monotonic())
+
+def _serve(entry: CachedLayout) -> Response:
+    headers = {
+        "ETag": f'"{entry.etag}"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding, Cookie",
+    }
+    if request.if_none_match.contains(entry.etag):
+        layout_cache.not_modified += 1
+        return Response(status=304, headers=headers)
+
+    accept = request.accept_encodings
+    if entry.br is not None and accept["br"]:
+        body, headers["Content-Encoding"] = entry.br, "br"
+    elif entry.gzip is not None and accept["gzip"]:
+        body, headers["Content-Encoding"] = entry.gzip, "gzip"
+    else:
+        body = entry.body
+    return Response(body, mimetype="application/json", headers=headers)
+
+def enable_layout_cache(dash_app, name: str, depends_on=(versions.ADM_USERS, versions.ADM_PROFILE, versions.ADM_ACL)):
+    """Cache dash_app's layout per user; depends_on lists app.versions names."""
+    if LAYOUT_CACHE_TTL <= 0:
+        return dash_app
+
+    server = dash_app.server
+    endpoint = dash_app.config.routes_pathname_prefix + "_dash-layout"
+    view = server.view_functions.get(endpoint)
+    if view is None or getattr(view, "_fusion_layout_cached", False):
+        return dash_app
+    depends_on = tuple(depends_on)
+
+    @functools.wraps(view)
+    def cached_view(*args, **kwargs):
+        if not getattr(current_user, "is_authenticated", False):
+            return view(*args, **kwargs)
+
+        key = (name, current_user.get_id(), versions.snapshot(depends_on))
+        entry = layout_cache.get(key)
+        if entry is None:
+            g.fusion_layout_uncacheable = False
+            resp = view(*args, **kwargs)
+            if resp.status_code != 200 or g.get("fusion_layout_uncacheable"):
+                return resp
+            entry = _encode(resp.get_data())
+            layout_cache.put(key, entry)
+        return _serve(entry)
+
+    cached_view._fusion_layout_cached = True
+    cached_view._fusion_profiled = getattr(view, "_fusion_profiled", False)
+    server.view_functions[endpoint] = cached_view
+    return dash_app
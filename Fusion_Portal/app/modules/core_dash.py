@@ -1,17 +1,46 @@
 from __future__ import annotations
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
 import dash
-from dash import html, dcc, dash_table, Input, Output
+from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
 from flask import has_request_context
 from flask_login import current_user
 
-from ..data_access import user_can_access_url
-from .core_data_access import fetch_object_counts, fetch_table_list, fetch_top_tables, fetch_table_preview
+from .. import versions
+from ..config import get_settings
+from ..layout_cache import mark_uncacheable
+from ..metrics import credit_db_time, thread_db_seconds
+from .registry import can_access
+from .core_data_access import fetch_object_counts, fetch_top_tables, fetch_table_preview
+from .core_profile import fetch_column_profile
+from .core_search import TYPEAHEAD_LIMIT, options as table_options, table_index
 
 BASE = "/module/Core/"
 
+# The page shell renders without touching Core DB; each panel fills in from
+# its own callback (the browser fires them in parallel) and gives up after
+# its own timeout, so one slow catalog query only holds back its own panel.
+PANEL_TIMEOUTS = {
+    "kpis": get_settings().core_kpi_timeout_s,
+    "chart": get_settings().core_chart_timeout_s,      # sys.partitions scan
+    "tables": get_settings().core_tables_timeout_s,
+    "profile": get_settings().core_profile_timeout_s,  # sampled, see core_profile
+}
+PANEL_WORKERS = get_settings().core_panel_workers
+# Quiet time after the last keystroke before the table selector searches.
+TYPEAHEAD_DEBOUNCE_MS = get_settings().core_typeahead_debounce_ms
+
+# Imported on first use (chart render / table preview) rather than at worker
+# boot. app.boot warms them in the master when running under --preload.
+DEFERRED_IMPORTS = ("plotly.graph_objects", "dash.dash_table")
+
+# Data the rendered Core page shell depends on (see app.layout_cache).
+LAYOUT_DEPENDS_ON = (versions.ADM_ACL,)
+
 def _kpi(title: str, value: str):
     return dbc.Card(dbc.CardBody([
         html.Div(title, className="kpi-title"),
@@ -19,6 +48,8 @@ def _kpi(title: str, value: str):
     ]), className="kpi-card")
 
 def _top_tables_figure(top_tables: list[dict]):
+    import plotly.graph_objects as go
+
     x = [t["table"] for t in top_tables]
     y = [t["rows"] for t in top_tables]
 
@@ -31,6 +62,145 @@ def _top_tables_figure(top_tables: list[dict]):
     )
     return fig
 
+_pool: ThreadPoolExecutor | None = None
+_pool_pid = 0
+_pool_lock = threading.Lock()
+
+def _panel_pool() -> ThreadPoolExecutor:
+    # Created per process on first use: app.boot may run in the gunicorn
+    # master and threads do not survive a fork.
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=PANEL_WORKERS, thread_name_prefix="core-panel")
+            _pool_pid = os.getpid()
+        return _pool
+
+def _timed_db_call(fn):
+    db0 = thread_db_seconds()
+    result = fn()
+    return result, thread_db_seconds() - db0
+
+def _run_with_timeout(fn, timeout_s: float):
+    """fn() on the panel pool; raises FuturesTimeout after timeout_s. A query
+    that times out keeps its pool thread until the driver returns."""
+    result, db_s = _panel_pool().submit(_timed_db_call, fn).result(timeout=timeout_s)
+    credit_db_time(db_s)
+    return result
+
+def _can_access(user_id: int) -> bool:
+    return can_access(user_id, "/module/Core")
+
+def _no_access():
+    return dbc.Container([
+        dbc.Alert("You do not have access to Fusion Core.", color="danger"),
+        html.A("Back to Home", href="/", className="btn btn-outline-primary btn-sm mt-2")
+    ], className="pt-4")
+
+def _access_alert():
+    """An Alert if the current user may not use Core, else None."""
+    if not getattr(current_user, "is_authenticated", False):
+        return dbc.Alert(["Not logged in. ", html.A("Login", href="/login")], color="warning")
+    try:
+        if not _can_access(int(current_user.get_id())):
+            return dbc.Alert("You do not have access to Fusion Core.", color="danger")
+    except Exception as e:
+        return dbc.Alert(f"Access check failed: {type(e).__name__}: {e}", color="danger")
+    return None
+
+def _load_panel(panel: str, what: str, fetch, render):
+    """Shared body of the panel callbacks: access check, timed fetch, render."""
+    denied = _access_alert()
+    if denied is not None:
+        return denied
+
+    timeout_s = PANEL_TIMEOUTS[panel]
+    try:
+        data = _run_with_timeout(fetch, timeout_s)
+    except FuturesTimeout:
+        return dbc.Alert(f"{what} did not load within {timeout_s:g}s. Use Refresh to retry.", color="warning")
+    except Exception as e:
+        return dbc.Alert(f"{what} failed to load from DB: {type(e).__name__}: {e}", color="danger")
+    return render(data)
+
+def _render_kpis(counts: dict):
+    return dbc.Row([
+        dbc.Col(_kpi("Tables", str(counts["tables"])), md=4),
+        dbc.Col(_kpi("Views", str(counts["views"])), md=4),
+        dbc.Col(_kpi("Stored Procs", str(counts["procs"])), md=4),
+    ], className="g-3")
+
+def _render_chart(top_tables: list[dict]):
+    return dcc.Graph(figure=_top_tables_figure(top_tables))
+
+def _short(value, width: int = 40) -> str:
+    text = "" if value is None else str(value)
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+def _render_profile(profile: dict):
+    from dash import dash_table
+
+    n, rows = profile["sample_rows"], profile["rows"]
+    if profile["sample_percent"] is None:
+        scope = f"All {n:,} rows"
+    else:
+        scope = f"Sample of {n:,} of ~{rows:,} rows (TABLESAMPLE {profile['sample_percent']:.3g}% of pages)"
+    note = f"{scope}, {profile['elapsed_ms']:.0f} ms."
+    if profile["columns_skipped"]:
+        note += f" First {len(profile['columns'])} columns only ({profile['columns_skipped']} more not profiled)."
+
+    data = []
+    for c in profile["columns"]:
+        distinct = c["distinct"]
+        data.append({
+            "Column": c["column"],
+            "Type": c["type"],
+            "Null %": "" if c["null_rate"] is None else f"{c['null_rate'] * 100:.1f}",
+            "Distinct": "" if distinct is None else (f"{distinct:,}" if c["distinct_exact"] else f"≈{distinct:,}"),
+            "Min": _short(c["min"]),
+            "Max": _short(c["max"]),
+            "Top values": ", ".join(f"{_short(v, 24)} ({cnt:,})" for v, cnt in c["top"]),
+        })
+    return html.Div([
+        html.H5("Column profile", className="mb-1"),
+        html.Div(note, className="text-muted mb-2"),
+        dash_table.DataTable(
+            columns=[{"name": k, "id": k} for k in ("Column", "Type", "Null %", "Distinct", "Min", "Max", "Top values")],
+            data=data,
+            page_size=25,
+            style_table={"overflowX": "auto"},
+            style_cell={"textAlign": "left", "fontFamily": "sans-serif", "fontSize": 13},
+        ),
+    ])
+
+def _render_table_picker(index):
+    # Only the largest tables go into the response; typing searches the
+    # server (core-table-query, see create_core_dash_app).
+    return html.Div([
+        dcc.Dropdown(
+            id="core-table",
+            options=table_options(index.search("", TYPEAHEAD_LIMIT)),
+            placeholder=f"Search {len(index):,} tables…",
+            clearable=True
+        ),
+        dcc.Store(id="core-table-query"),
+    ])
+
+# Copies the dropdown's search text into core-table-query once typing has
+# paused for the debounce interval, so the server sees one search per pause
+# instead of one per keystroke.
+_DEBOUNCE_JS = """
+function(search) {
+    window._coreTableSearch = search;
+    setTimeout(function () {
+        if (window._coreTableSearch === search) {
+            dash_clientside.set_props("core-table-query", {data: search || ""});
+        }
+    }, %d);
+    return dash_clientside.no_update;
+}
+"""
+
 def build_layout():
     if not has_request_context():
         return html.Div()
@@ -43,11 +213,15 @@ def build_layout():
     user_id = int(current_user.get_id())
 
     # Respect module access from portal DB
-    if not user_can_access_url(user_id, "/module/Core"):
+    try:
+        allowed = _can_access(user_id)
+    except Exception as e:
+        mark_uncacheable()
         return dbc.Container([
-            dbc.Alert("You do not have access to Fusion Core.", color="danger"),
-            html.A("Back to Home", href="/", className="btn btn-outline-primary btn-sm mt-2")
+            dbc.Alert(f"Access check failed: {type(e).__name__}: {e}", color="danger")
         ], className="pt-4")
+    if not allowed:
+        return _no_access()
 
     header = dbc.Row([
         dbc.Col(html.Div([
@@ -55,50 +229,30 @@ def build_layout():
             html.Div("Live module (Core DB) — object KPIs + data explorer", className="subhead"),
         ]), md=10),
         dbc.Col(html.Div([
+            html.Button("Refresh", id="core-refresh", className="btn btn-outline-secondary btn-sm me-2"),
             html.A("Home", href="/", className="btn btn-outline-primary btn-sm me-2"),
             html.A("Logout", href="/logout", className="btn btn-outline-secondary btn-sm"),
         ], className="text-end"), md=2),
     ], className="align-items-center")
 
-    try:
-        counts = fetch_object_counts()
-        top_tables = fetch_top_tables(10)
-        tables = fetch_table_list()
-    except Exception as e:
-        return dbc.Container([
-            header,
-            dbc.Alert(f"Core module failed to load from DB: {type(e).__name__}: {e}", color="danger")
-        ], fluid=True, className="pt-4 pb-5")
-
-    fig = _top_tables_figure(top_tables)
-
     return dbc.Container([
         header,
 
-        dbc.Row([
-            dbc.Col(_kpi("Tables", str(counts["tables"])), md=4),
-            dbc.Col(_kpi("Views", str(counts["views"])), md=4),
-            dbc.Col(_kpi("Stored Procs", str(counts["procs"])), md=4),
-        ], className="mt-3 g-3"),
+        dcc.Loading(html.Div(id="core-kpis", className="mt-3"), type="default"),
 
-        dbc.Row([
-            dbc.Col(dcc.Graph(figure=fig), md=12),
-        ], className="mt-3"),
+        dcc.Loading(html.Div(id="core-chart", className="mt-3", style={"minHeight": "450px"}), type="default"),
 
         html.H4("Data Explorer", className="mt-4"),
 
         dbc.Row([
             dbc.Col([
-                dcc.Dropdown(
-                    id="core-table",
-                    options=[{"label": t, "value": t} for t in tables],
-                    placeholder="Select a table…",
-                    clearable=True
-                ),
+                dcc.Loading(html.Div(id="core-table-picker"), type="dot"),
                 html.Div(className="text-muted mt-2", children="Shows TOP 100 rows from selected table (Core DB).")
             ], md=6),
         ], className="mt-2"),
 
+        dcc.Loading(html.Div(id="core-profile", className="mt-3"), type="default"),
+
         html.Div(id="core-preview", className="mt-3"),
 
     ], fluid=True, className="pt-4 pb-5")
@@ -114,6 +268,48 @@ def create_core_dash_app(server):
     )
     app.layout = build_layout
 
+    @app.callback(Output("core-kpis", "children"), Input("core-refresh", "n_clicks"))
+    def _load_kpis(_n):
+        return _load_panel("kpis", "Object counts", fetch_object_counts, _render_kpis)
+
+    @app.callback(Output("core-chart", "children"), Input("core-refresh", "n_clicks"))
+    def _load_chart(_n):
+        return _load_panel("chart", "Top tables", lambda: fetch_top_tables(10), _render_chart)
+
+    @app.callback(Output("core-table-picker", "children"), Input("core-refresh", "n_clicks"))
+    def _load_table_picker(n):
+        if n:  # Refresh re-reads the catalog
+            versions.bump(versions.CORE_CATALOG)
+        return _load_panel("tables", "Table list", table_index, _render_table_picker)
+
+    app.clientside_callback(
+        _DEBOUNCE_JS % TYPEAHEAD_DEBOUNCE_MS,
+        Output("core-table-query", "data"),
+        Input("core-table", "search_value"),
+        prevent_initial_call=True,
+    )
+
+    @app.callback(
+        Output("core-table", "options"),
+        Input("core-table-query", "data"),
+        State("core-table", "value"),
+        prevent_initial_call=True,
+    )
+    def _search_tables(query, selected):
+        if _access_alert() is not None:
+            return []
+        try:
+            index = _run_with_timeout(table_index, PANEL_TIMEOUTS["tables"])
+        except Exception:
+            return dash.no_update
+        return table_options(index.search(query or "", TYPEAHEAD_LIMIT), selected)
+
+    @app.callback(Output("core-profile", "children"), Input("core-table", "value"))
+    def _profile_table(table_name):
+        if not table_name:
+            return None
+        return _load_panel("profile", "Column profile", lambda: fetch_column_profile(table_name), _render_profile)
+
     @app.callback(
         Output("core-preview", "children"),
         Input("core-table", "value"),
@@ -127,6 +323,8 @@ def create_core_dash_app(server):
         except Exception as e:
             return dbc.Alert(f"Preview failed: {type(e).__name__}: {e}", color="danger")
 
+        from dash import dash_table
+
         return dash_table.DataTable(
             columns=[{"name": c, "id": c} for c in cols],
             data=data,
@@ -1,71 +1,123 @@
 from __future__ import annotations
 
-from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
-from ..config import load_settings
+from ..config import get_settings
 from ..db import get_conn
+from ..singleflight import coalesced, coalesced_cache
+from ..statements import STATEMENTS
+
+OBJECT_COUNTS = STATEMENTS.define("core.fetch_object_counts", """
+SELECT
+    SUM(CASE WHEN o.type = 'U' THEN 1 ELSE 0 END) AS tables_count,
+    SUM(CASE WHEN o.type = 'V' THEN 1 ELSE 0 END) AS views_count,
+    SUM(CASE WHEN o.type = 'P' THEN 1 ELSE 0 END) AS procs_count
+FROM sys.objects o
+WHERE o.is_ms_shipped = 0;
+""")
+
+TABLE_LIST = STATEMENTS.define("core.fetch_table_list", """
+SELECT s.name AS schema_name, t.name AS table_name
+FROM sys.tables t
+JOIN sys.schemas s ON s.schema_id = t.schema_id
+WHERE t.is_ms_shipped = 0
+ORDER BY s.name, t.name;
+""")
+
+TOP_TABLES = STATEMENTS.define("core.fetch_top_tables", """
+SELECT TOP (?)
+    QUOTENAME(s.name) + '.' + QUOTENAME(t.name) AS table_name,
+    SUM(p.rows) AS row_count
+FROM sys.tables t
+JOIN sys.schemas s ON t.schema_id = s.schema_id
+JOIN sys.partitions p ON p.object_id = t.object_id
+WHERE p.index_id IN (0,1)
+  AND t.is_ms_shipped = 0
+GROUP BY s.name, t.name
+ORDER BY row_count DESC;
+""", ("limit",))
+
+# Every user table's row count, for ranking table search results (core_search).
+TABLE_SIZES = STATEMENTS.define("core.fetch_table_sizes", """
+SELECT s.name AS schema_name, t.name AS table_name, SUM(p.rows) AS row_count
+FROM sys.tables t
+JOIN sys.schemas s ON t.schema_id = s.schema_id
+JOIN sys.partitions p ON p.object_id = t.object_id
+WHERE p.index_id IN (0,1)
+  AND t.is_ms_shipped = 0
+GROUP BY s.name, t.name;
+""")
+
+TABLE_COLUMNS = STATEMENTS.define("core.fetch_table_columns", """
+SELECT s.name AS schema_name, t.name AS table_name, c.name AS column_name
+FROM sys.columns c
+JOIN sys.tables t ON t.object_id = c.object_id
+JOIN sys.schemas s ON s.schema_id = t.schema_id
+WHERE t.is_ms_shipped = 0
+ORDER BY s.name, t.name, c.column_id;
+""")
+
+# {schema}/{table} come from the catalog (fetch_table_catalog), never from input.
+TABLE_PREVIEW = STATEMENTS.define(
+    "core.fetch_table_preview", "SELECT TOP (?) * FROM {schema}.{table};", ("limit",))
 
 def _core_db_name() -> str:
-    s = load_settings()
+    s = get_settings()
     if not s.core_db:
         raise RuntimeError("CORE_DB (or Core_DB) environment variable is not set.")
     return s.core_db
 
+# Catalog reads are the same for every user: concurrent identical calls (the
+# panels of several users opening the Core page) share one query.
+
+@coalesced("core.object_counts")
 def fetch_object_counts() -> Dict[str, int]:
-    sql = """
-    SELECT
-        SUM(CASE WHEN o.type = 'U' THEN 1 ELSE 0 END) AS tables_count,
-        SUM(CASE WHEN o.type = 'V' THEN 1 ELSE 0 END) AS views_count,
-        SUM(CASE WHEN o.type = 'P' THEN 1 ELSE 0 END) AS procs_count
-    FROM sys.objects o
-    WHERE o.is_ms_shipped = 0;
-    """
-    with get_conn(database=_core_db_name()) as conn:
-        row = conn.cursor().execute(sql).fetchone()
+    with get_conn(database=_core_db_name(), query=OBJECT_COUNTS.name, readonly=True) as conn:
+        row = OBJECT_COUNTS.execute(conn.cursor()).fetchone()
     return {"tables": int(row[0] or 0), "views": int(row[1] or 0), "procs": int(row[2] or 0)}
 
-@lru_cache(maxsize=1)
+@coalesced_cache(maxsize=1, name="core.table_catalog")
+def fetch_table_catalog() -> Dict[str, Tuple[str, str]]:
+    """'schema.table' -> (schema, table) for every user table in CORE_DB."""
+    with get_conn(database=_core_db_name(), query=TABLE_LIST.name, readonly=True) as conn:
+        rows = TABLE_LIST.execute(conn.cursor()).fetchall()
+    return {f"{r[0]}.{r[1]}": (r[0], r[1]) for r in rows}
+
 def fetch_table_list() -> List[str]:
-    sql = """
-    SELECT s.name AS schema_name, t.name AS table_name
-    FROM sys.tables t
-    JOIN sys.schemas s ON s.schema_id = t.schema_id
-    WHERE t.is_ms_shipped = 0
-    ORDER BY s.name, t.name;
-    """
-    with get_conn(database=_core_db_name()) as conn:
-        rows = conn.cursor().execute(sql).fetchall()
-    return [f"{r[0]}.{r[1]}" for r in rows]
+    return list(fetch_table_catalog())
 
+@coalesced("core.top_tables")
 def fetch_top_tables(limit: int = 10) -> List[Dict[str, Any]]:
-    sql = f"""
-    SELECT TOP ({limit})
-        QUOTENAME(s.name) + '.' + QUOTENAME(t.name) AS table_name,
-        SUM(p.rows) AS row_count
-    FROM sys.tables t
-    JOIN sys.schemas s ON t.schema_id = s.schema_id
-    JOIN sys.partitions p ON p.object_id = t.object_id
-    WHERE p.index_id IN (0,1)
-      AND t.is_ms_shipped = 0
-    GROUP BY s.name, t.name
-    ORDER BY row_count DESC;
-    """
-    with get_conn(database=_core_db_name()) as conn:
-        rows = conn.cursor().execute(sql).fetchall()
+    with get_conn(database=_core_db_name(), query=TOP_TABLES.name, readonly=True) as conn:
+        rows = TOP_TABLES.execute(conn.cursor(), int(limit)).fetchall()
     return [{"table": r[0], "rows": int(r[1] or 0)} for r in rows]
 
+@coalesced("core.table_sizes")
+def fetch_table_sizes() -> Dict[str, int]:
+    """'schema.table' -> rows (heap / clustered index partitions)."""
+    with get_conn(database=_core_db_name(), query=TABLE_SIZES.name, readonly=True) as conn:
+        rows = TABLE_SIZES.execute(conn.cursor()).fetchall()
+    return {f"{r[0]}.{r[1]}": int(r[2] or 0) for r in rows}
+
+@coalesced("core.table_columns")
+def fetch_table_columns() -> Dict[str, List[str]]:
+    """'schema.table' -> column names in column order."""
+    with get_conn(database=_core_db_name(), query=TABLE_COLUMNS.name, readonly=True) as conn:
+        rows = TABLE_COLUMNS.execute(conn.cursor()).fetchall()
+    out: Dict[str, List[str]] = {}
+    for r in rows:
+        out.setdefault(f"{r[0]}.{r[1]}", []).append(r[2])
+    return out
+
 def fetch_table_preview(full_name: str, limit: int = 100) -> Tuple[List[str], List[Dict[str, Any]]]:
-    allowed = set(fetch_table_list())
-    if full_name not in allowed:
+    ident = fetch_table_catalog().get(full_name)
+    if ident is None:
         raise ValueError("Invalid table selection.")
 
-    schema, table = full_name.split(".", 1)
-    sql = f"SELECT TOP ({limit}) * FROM [{schema}].[{table}];"
+    stmt = TABLE_PREVIEW.for_identifiers(schema=ident[0], table=ident[1])
 
-    with get_conn(database=_core_db_name()) as conn:
-        cur = conn.cursor()
-        cur.execute(sql)
+    with get_conn(database=_core_db_name(), query=TABLE_PREVIEW.name, readonly=True) as conn:
+        cur = stmt.execute(conn.cursor(), int(limit))
         cols = [d[0] for d in cur.description]
         rows = cur.fetchall()
 
@@ -0,0 +1,184 @@
+"""
+Column profile of a Core table for the Data Explorer.
+
+One batch per table, read once:
+
+    SELECT TOP (n) <columns> INTO #sample FROM [s].[t] [TABLESAMPLE SYSTEM (p PERCENT) REPEATABLE (r)]
+    SELECT COUNT_BIG(*), per column: null count, APPROX_COUNT_DISTINCT, MIN, MAX  FROM #sample
+    SELECT top values per column (CROSS APPLY VALUES ... GROUP BY)             FROM #sample
+
+Tables with up to CORE_PROFILE_EXACT_ROWS rows (per sys.partitions, from the
+catalog index) are profiled whole. Larger ones are page-sampled with
+TABLESAMPLE, aiming at CORE_PROFILE_SAMPLE_ROWS rows, so a 500M-row table
+costs about as much as a 100k-row one. On a sample, null rates and top
+values are estimates and the distinct count is scaled up only for columns
+that look unique in the sample (otherwise it is a lower bound).
+
+Only the first CORE_PROFILE_MAX_COLUMNS columns are profiled. LOB ((n)varchar(max),
+varbinary(max), xml), spatial and binary columns get a null rate only, and
+only their null flag is copied into #sample. Profiles are cached per table for the
+current CORE_CATALOG version (Refresh on the Core page) and
+CORE_CATALOG_TTL_S.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List
+
+from ..db import get_conn
+from ..singleflight import coalesced_cache
+from ..statements import STATEMENTS, Statement, quote_ident
+from .. import versions
+from ..config import get_settings
+from .core_data_access import _core_db_name, fetch_table_catalog
+from .core_search import CATALOG_TTL_S, table_index
+
+PROFILE_EXACT_ROWS = get_settings().core_profile_exact_rows
+PROFILE_SAMPLE_ROWS = get_settings().core_profile_sample_rows
+PROFILE_MAX_COLUMNS = get_settings().core_profile_max_columns
+PROFILE_TOP_VALUES = get_settings().core_profile_top_values
+# Page sampling returns whole pages, so the row count it yields varies: ask
+# for this many times the target and let TOP cut it.
+SAMPLE_OVERSHOOT = 2.0
+SAMPLE_SEED = 20240101
+
+COLUMN_TYPES = STATEMENTS.define("core.fetch_column_types", """
+SELECT c.name, TYPE_NAME(c.system_type_id) AS type_name, c.max_length
+FROM sys.columns c
+WHERE c.object_id = OBJECT_ID(?)
+ORDER BY c.column_id;
+""", ("table",))
+
+# Statement name for /metrics; the text is built per table below.
+PROFILE_NAME = "core.profile_table"
+
+ORDERED_TYPES = {
+    "tinyint", "smallint", "int", "bigint", "decimal", "numeric", "float", "real", "money", "smallmoney",
+    "date", "time", "datetime", "datetime2", "smalldatetime", "datetimeoffset",
+    "char", "varchar", "nchar", "nvarchar", "uniqueidentifier", "bit",
+}
+DATE_TYPES = {"date", "time", "datetime", "datetime2", "smalldatetime", "datetimeoffset"}
+
+_approx_distinct = True  # cleared if the server lacks APPROX_COUNT_DISTINCT (pre-2019)
+
+def _sample_clause(rows: int) -> tuple[str, float | None]:
+    if rows <= PROFILE_EXACT_ROWS:
+        return "", None
+    pct = min(100.0, 100.0 * PROFILE_SAMPLE_ROWS * SAMPLE_OVERSHOOT / rows)
+    return f" TABLESAMPLE SYSTEM ({pct:.6f} PERCENT) REPEATABLE ({SAMPLE_SEED})", pct
+
+def _profile_sql(schema: str, table: str, columns: list[tuple[str, str, int]], sample: str) -> tuple[str, list]:
+    """Batch text and, per profiled column, (name, type, ordered)."""
+    # max_length -1: (n)varchar(max) / varbinary(max) / xml, i.e. LOBs
+    cols = [(name, f"{type_name}(max)" if max_length == -1 and type_name != "xml" else type_name,
+             type_name in ORDERED_TYPES and max_length != -1)
+            for name, type_name, max_length in columns]
+    distinct_fn = "APPROX_COUNT_DISTINCT({})" if _approx_distinct else "COUNT(DISTINCT {})"
+
+    select, aggs, top = [], ["COUNT_BIG(*)"], []
+    for i, (name, type_name, ordered) in enumerate(cols):
+        c = quote_ident(name)
+        if not ordered:
+            # only the null flag goes into #sample
+            select.append(f"CASE WHEN {c} IS NULL THEN 1 ELSE 0 END AS {c}")
+            aggs.append(f"SUM({c})")
+            continue
+        select.append(c)
+        aggs.append(f"SUM(CASE WHEN {c} IS NULL THEN 1 ELSE 0 END)")
+        v = f"CAST({c} AS tinyint)" if type_name == "bit" else c
+        aggs += [distinct_fn.format(v), f"MIN({v})", f"MAX({v})"]
+        text = f"CONVERT(nvarchar(40), {c}, 126)" if type_name in DATE_TYPES else f"CAST({c} AS nvarchar(100))"
+        top.append(f"({i}, {text})")
+
+    select_list = ", ".join(select)
+    sql = (
+        "SET NOCOUNT ON;\n"
+        "DROP TABLE IF EXISTS #sample;\n"
+        f"SELECT TOP (?) {select_list} INTO #sample FROM {quote_ident(schema)}.{quote_ident(table)}{sample};\n"
+        f"SELECT {', '.join(aggs)} FROM #sample;\n"
+    )
+    if top:
+        sql += (
+            "SELECT i, v, n FROM (\n"
+            "    SELECT x.i, x.v, COUNT_BIG(*) AS n,\n"
+            "           ROW_NUMBER() OVER (PARTITION BY x.i ORDER BY COUNT_BIG(*) DESC, x.v) AS rn\n"
+            f"    FROM #sample CROSS APPLY (VALUES {', '.join(top)}) x(i, v)\n"
+            "    WHERE x.v IS NOT NULL\n"
+            "    GROUP BY x.i, x.v\n"
+            ") t WHERE rn <= ? ORDER BY i, n DESC;\n"
+        )
+    sql += "DROP TABLE #sample;"
+    return sql, cols
+
+def _run_profile(conn, schema: str, table: str, columns, sample: str):
+    sql, cols = _profile_sql(schema, table, columns, sample)
+    has_top = any(ordered for _, _, ordered in cols)
+    stmt = Statement(PROFILE_NAME, sql, ("limit", "top") if has_top else ("limit",))
+    args = (PROFILE_SAMPLE_ROWS if sample else PROFILE_EXACT_ROWS, PROFILE_TOP_VALUES)
+    cur = stmt.execute(conn.cursor(), *args[:len(stmt.params)])
+    agg = cur.fetchone()
+    top_rows = cur.fetchall() if has_top and cur.nextset() else []
+    return cols, agg, top_rows
+
+def _column_types(conn, schema: str, table: str) -> list[tuple[str, str, int]]:
+    rows = COLUMN_TYPES.execute(conn.cursor(), f"{quote_ident(schema)}.{quote_ident(table)}").fetchall()
+    return [(r[0], r[1], int(r[2] or 0)) for r in rows]
+
+@coalesced_cache(maxsize=256, name="core.profile")
+def _cached_profile(full_name: str, version: int, epoch: int) -> Dict[str, Any]:
+    global _approx_distinct
+    ident = fetch_table_catalog().get(full_name)
+    if ident is None:
+        raise ValueError("Invalid table selection.")
+    schema, table = ident
+    rows = table_index().sizes.get(full_name, 0)
+    sample, pct = _sample_clause(rows)
+
+    t0 = time.perf_counter()
+    with get_conn(database=_core_db_name(), query=PROFILE_NAME, readonly=True) as conn:
+        columns = _column_types(conn, schema, table)
+        profiled = columns[:PROFILE_MAX_COLUMNS]
+        try:
+            cols, agg, top_rows = _run_profile(conn, schema, table, profiled, sample)
+        except Exception as e:
+            if not (_approx_distinct and "APPROX_COUNT_DISTINCT" in str(e).upper()):
+                raise
+            _approx_distinct = False
+            cols, agg, top_rows = _run_profile(conn, schema, table, profiled, sample)
+
+    n = int(agg[0] or 0)
+    top: Dict[int, List[tuple]] = {}
+    for i, v, cnt in top_rows:
+        top.setdefault(int(i), []).append((v, int(cnt)))
+
+    out_cols, pos = [], 1
+    for i, (name, type_name, ordered) in enumerate(cols):
+        nulls = int(agg[pos] or 0)
+        pos += 1
+        col = {"column": name, "type": type_name, "null_rate": nulls / n if n else None,
+               "distinct": None, "distinct_exact": pct is None and not _approx_distinct,
+               "min": None, "max": None, "top": top.get(i, [])}
+        if ordered:
+            distinct, col["min"], col["max"] = agg[pos], agg[pos + 1], agg[pos + 2]
+            pos += 3
+            non_null = n - nulls
+            if distinct is not None and pct is not None and non_null and distinct >= 0.9 * non_null and rows > n:
+                # unique-looking in the sample: scale to the table
+                distinct = round(distinct * rows / n)
+            col["distinct"] = int(distinct) if distinct is not None else None
+        out_cols.append(col)
+
+    return {
+        "table": full_name,
+        "rows": rows,
+        "sample_rows": n,
+        "sample_percent": pct,
+        "columns": out_cols,
+        "columns_skipped": len(columns) - len(profiled),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+def fetch_column_profile(full_name: str) -> Dict[str, Any]:
+    """Column profile of a catalog table ('schema.table'), cached per catalog version."""
+    epoch = int(time.monotonic() // CATALOG_TTL_S) if CATALOG_TTL_S > 0 else 0
+    return _cached_profile(full_name, versions.current(versions.CORE_CATALOG), epoch)
@@ -0,0 +1,142 @@
+"""
+Server-side search over the Core catalog for the table selector.
+
+The Core page's dropdown no longer ships every table name in the layout: it
+starts with the largest TYPEAHEAD_LIMIT tables and asks the server for
+matches as the user types (core_dash, debounced in the browser).
+
+TableIndex is built from fetch_table_catalog + fetch_table_sizes (and, with
+CORE_SEARCH_COLUMNS=1, fetch_table_columns). Tables are kept in row-count
+order, and the lower-cased 'schema.table' names are joined into one
+newline-separated string, so a substring search is repeated str.find over
+that string (C speed, matches come out already ranked by size). Matches are
+then ordered by how they matched:
+
+    0  exact name ('schema.table' or just 'table')
+    1  table name starts with the query
+    2  'schema.table' starts with the query
+    3  substring anywhere in the name
+    4  only a column name matches (CORE_SEARCH_COLUMNS)
+
+and by row count within a tier. The index is memoised on the CORE_CATALOG
+version (the Core page's Refresh bumps it) and rebuilt after
+CORE_CATALOG_TTL_S.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+
+from .. import versions
+from ..config import get_settings
+from .core_data_access import fetch_table_catalog, fetch_table_columns, fetch_table_sizes
+
+TYPEAHEAD_LIMIT = get_settings().core_typeahead_limit
+CATALOG_TTL_S = get_settings().core_catalog_ttl_s
+SEARCH_COLUMNS = get_settings().core_search_columns
+
+class _Haystack:
+    """Newline-joined lower-cased strings; find() yields the ids containing a needle."""
+
+    def __init__(self, items: list[str]):
+        self.text = "\n".join(items) + "\n"
+        self.starts = []
+        pos = 0
+        for s in items:
+            self.starts.append(pos)
+            pos += len(s) + 1
+
+    def find(self, needle: str):
+        text, starts = self.text, self.starts
+        i = text.find(needle)
+        while i != -1:
+            idx = bisect.bisect_right(starts, i) - 1
+            yield idx
+            # next match in a later item: one hit per item is enough
+            i = text.find(needle, starts[idx + 1] if idx + 1 < len(starts) else len(text))
+
+class TableIndex:
+    def __init__(self, catalog: dict[str, tuple[str, str]], sizes: dict[str, int],
+                 columns: dict[str, list[str]] | None = None):
+        self.sizes = sizes
+        self.names = sorted(catalog, key=lambda n: (-sizes.get(n, 0), n.lower()))
+        self.rows = [sizes.get(n, 0) for n in self.names]
+        self.full = [n.lower() for n in self.names]
+        self.table = [catalog[n][1].lower() for n in self.names]
+        self._names = _Haystack(self.full)
+
+        self._columns = None
+        self._column_owner: list[int] = []
+        self._column_names: list[str] = []
+        if columns:
+            pos = {n: i for i, n in enumerate(self.names)}
+            items = []
+            for name, cols in columns.items():
+                if name in pos:
+                    for c in cols:
+                        items.append(c.lower())
+                        self._column_owner.append(pos[name])
+                        self._column_names.append(c)
+            self._columns = _Haystack(items)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = TYPEAHEAD_LIMIT) -> list[tuple[str, int, str | None]]:
+        """Top `limit` (name, rows, matched column or None) for query."""
+        q = (query or "").strip().lower()
+        if not q:
+            return [(self.names[i], self.rows[i], None) for i in range(min(limit, len(self.names)))]
+
+        hits: dict[int, tuple[int, str | None]] = {}
+        for i in self._names.find(q):
+            full, table = self.full[i], self.table[i]
+            if q == full or q == table:
+                tier = 0
+            elif table.startswith(q):
+                tier = 1
+            elif full.startswith(q):
+                tier = 2
+            else:
+                tier = 3
+            hits[i] = (tier, None)
+        if self._columns is not None and len(hits) < limit:
+            for j in self._columns.find(q):
+                owner = self._column_owner[j]
+                if owner not in hits:
+                    hits[owner] = (4, self._column_names[j])
+        # ids are in row-count order, so (tier, id) ranks by size within a tier
+        best = sorted(hits, key=lambda i: (hits[i][0], i))[:limit]
+        return [(self.names[i], self.rows[i], hits[i][1]) for i in best]
+
+_index: tuple[int, float, TableIndex] | None = None
+_index_lock = threading.Lock()
+
+def table_index() -> TableIndex:
+    """The current TableIndex, rebuilt when CORE_CATALOG is bumped or it is older than the TTL."""
+    global _index
+    version = versions.current(versions.CORE_CATALOG)
+    cached = _index
+    if cached and cached[0] == version and time.monotonic() - cached[1] < CATALOG_TTL_S:
+        return cached[2]
+    with _index_lock:
+        cached = _index
+        if cached and cached[0] == version and time.monotonic() - cached[1] < CATALOG_TTL_S:
+            return cached[2]
+        if cached:  # the preview whitelist must see the same catalog as the search
+            fetch_table_catalog.cache_clear()
+        index = TableIndex(fetch_table_catalog(), fetch_table_sizes(),
+                           fetch_table_columns() if SEARCH_COLUMNS else None)
+        _index = (version, time.monotonic(), index)
+        return index
+
+def options(results, selected: str | None = None) -> list[dict]:
+    """Dropdown options for search() results; keeps the selected table so Dash does not clear it."""
+    out = []
+    for name, rows, column in results:
+        label = f"{name} ({rows:,} rows)" if column is None else f"{name} ({rows:,} rows, column {column})"
+        out.append({"label": label, "value": name})
+    if selected and all(o["value"] != selected for o in out):
+        out.insert(0, {"label": selected, "value": selected})
+    return out
@@ -0,0 +1,273 @@
+"""
+Module registry and lazy mounting of module Dash apps.
+
+Which modules exist, their URLs and whether they are active comes from
+ADM.Modules (module_url = /module/<slug>/). The code behind a slug is looked
+up in MODULE_ENTRIES. A module's Dash app is built on its own Flask app the
+first time an authorised user requests /module/<slug>/..., so a worker only
+pays import time and memory for modules that are actually used:
+
+- register_module_routes(server) adds the /module/<slug>/ dispatcher view
+  to the portal server. It checks login + ADM access, mounts the module if
+  needed and forwards the request.
+- ModuleDispatcher (installed as server.wsgi_app) sends later requests for a
+  mounted module straight to its Flask app, which repeats the login/access
+  check in its own before_request.
+- MODULE_IDLE_UNLOAD_S > 0 unmounts modules unused for that long (routes,
+  callbacks and cached layouts are dropped; imported libraries stay loaded).
+- FUSION_PRELOAD_MODULES=Core,... mounts those at boot instead (e.g. in the
+  gunicorn master under --preload, shared copy-on-write with workers).
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import Flask, Response, redirect, request
+from flask_login import current_user
+
+from .. import versions
+from ..config import get_settings
+from ..data_access import fetch_active_modules, user_can_access_url
+
+# slug -> "package.module:factory"; factory(server) returns the Dash app,
+# mounted at /module/<slug>/.
+MODULE_ENTRIES = {
+    "Core": "app.modules.core_dash:create_core_dash_app",
+}
+
+REGISTRY_TTL_S = 60.0
+ACCESS_TTL_S = 60.0
+MODULE_IDLE_UNLOAD_S = get_settings().module_idle_unload_s
+
+_URL_RX = re.compile(r"^/module/([^/]+)/?$")
+
+@dataclass(frozen=True)
+class ModuleSpec:
+    slug: str
+    name: str
+    url: str
+    entry: str
+
+    @property
+    def base(self) -> str:
+        return f"/module/{self.slug}/"
+
+def _spec_from_row(row: dict) -> ModuleSpec | None:
+    m = _URL_RX.match((row.get("url") or "").strip())
+    if not m or m.group(1) not in MODULE_ENTRIES:
+        return None
+    slug = m.group(1)
+    return ModuleSpec(slug, row.get("name") or slug, f"/module/{slug}", MODULE_ENTRIES[slug])
+
+def builtin_spec(slug: str) -> ModuleSpec:
+    return ModuleSpec(slug, slug, f"/module/{slug}", MODULE_ENTRIES[slug])
+
+# ---------------------------------------------------------------------------
+# ADM lookups (memoised on the ADM_ACL version, bounded by a TTL that the
+# change bus lifts while it is live - see app.versions.max_age)
+# ---------------------------------------------------------------------------
+
+_registry: tuple[int, float, dict[str, ModuleSpec]] | None = None
+_registry_lock = threading.Lock()
+
+def active_modules() -> dict[str, ModuleSpec]:
+    """Active ADM.Modules rows that have code in this build, by slug."""
+    global _registry
+    version = versions.current(versions.ADM_ACL)
+    cached = _registry
+    if cached and cached[0] == version and time.monotonic() - cached[1] < versions.max_age(REGISTRY_TTL_S):
+        return cached[2]
+    with _registry_lock:
+        try:
+            rows = fetch_active_modules()
+        except Exception:
+            if cached:  # keep serving the last known registry while ADM is down
+                return cached[2]
+            raise
+        specs = {s.slug: s for s in map(_spec_from_row, rows) if s is not None}
+        _registry = (version, time.monotonic(), specs)
+        return specs
+
+_access_memo: dict[tuple[int, str, int], tuple[bool, float]] = {}
+
+def can_access(user_id: int, module_url: str) -> bool:
+    """user_can_access_url, memoised briefly per (user, module, ADM_ACL version)."""
+    key = (user_id, module_url, versions.current(versions.ADM_ACL))
+    hit = _access_memo.get(key)
+    now = time.monotonic()
+    if hit is not None and now - hit[1] < versions.max_age(ACCESS_TTL_S):
+        return hit[0]
+    allowed = user_can_access_url(user_id, module_url)
+    if len(_access_memo) > 10_000:
+        _access_memo.clear()
+    _access_memo[key] = (allowed, now)
+    return allowed
+
+# ---------------------------------------------------------------------------
+# Mounting
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MountedModule:
+    spec: ModuleSpec
+    server: Flask
+    dash_app: object
+    mounted_at: float
+    last_used: float
+
+_mounted: dict[str, MountedModule] = {}
+_mount_locks: dict[str, threading.Lock] = {}
+_mount_guard = threading.Lock()
+_portal_server: Flask | None = None
+
+def _forbidden(spec: ModuleSpec) -> Response:
+    return Response(
+        f'<p>You do not have access to {spec.name}.</p><p><a href="/">Back to Home</a></p>',
+        status=403, mimetype="text/html")
+
+def _unavailable(e: Exception) -> Response:
+    return Response(f"<p>Module registry unavailable: {type(e).__name__}: {e}</p>",
+                    status=503, mimetype="text/html")
+
+def _guard(spec: ModuleSpec):
+    """Login + ADM access check, shared by the dispatcher view and every
+    mounted module's before_request."""
+    if not getattr(current_user, "is_authenticated", False):
+        return redirect("/login")
+    try:
+        allowed = can_access(int(current_user.get_id()), spec.url)
+    except Exception as e:
+        return _unavailable(e)
+    if not allowed:
+        return _forbidden(spec)
+    return None
+
+def _build_module_server(spec: ModuleSpec) -> Flask:
+    from ..auth import login_manager
+
+    portal = _portal_server
+    sub = Flask(f"fusion_module_{spec.slug}")
+    sub.secret_key = portal.secret_key
+    sub.config.update({k: v for k, v in portal.config.items() if k.startswith("SESSION_")})
+    login_manager.init_app(sub)
+
+    @sub.before_request
+    def _require_access():
+        return _guard(spec)
+
+    return sub
+
+def mount(spec: ModuleSpec) -> MountedModule:
+    """Build the module's Dash app (once per process) and return it."""
+    mod = _mounted.get(spec.slug)
+    if mod is not None:
+        return mod
+    with _mount_guard:
+        lock = _mount_locks.setdefault(spec.slug, threading.Lock())
+    with lock:
+        mod = _mounted.get(spec.slug)
+        if mod is not None:
+            return mod
+
+        from ..layout_cache import enable_layout_cache
+        from ..profiling import instrument_dash_app
+
+        t0 = time.perf_counter()
+        module_path, factory = spec.entry.split(":", 1)
+        module = importlib.import_module(module_path)
+        server = _build_module_server(spec)
+        dash_app = getattr(module, factory)(server)
+        if hasattr(module, "LAYOUT_DEPENDS_ON"):
+            enable_layout_cache(dash_app, spec.slug, module.LAYOUT_DEPENDS_ON)
+        instrument_dash_app(dash_app, spec.slug)
+        for name in getattr(module, "DEFERRED_IMPORTS", ()):
+            importlib.import_module(name)
+
+        now = time.monotonic()
+        mod = _mounted[spec.slug] = MountedModule(spec, server, dash_app, now, now)
+        print(f"[MODULES] mounted {spec.slug} in {(time.perf_counter() - t0) * 1000:.0f} ms (pid {os.getpid()})",
+              flush=True)
+        return mod
+
+def unmount(slug: str) -> None:
+    from ..layout_cache import layout_cache
+
+    if _mounted.pop(slug, None) is not None:
+        layout_cache.invalidate(app=slug)
+        print(f"[MODULES] unmounted {slug} (idle)", flush=True)
+
+def _unload_idle() -> None:
+    if MODULE_IDLE_UNLOAD_S <= 0:
+        return
+    cutoff = time.monotonic() - MODULE_IDLE_UNLOAD_S
+    for slug, mod in list(_mounted.items()):
+        if mod.last_used < cutoff:
+            unmount(slug)
+
+def mounted_modules() -> dict[str, dict]:
+    now = time.monotonic()
+    return {slug: {"idle_s": round(now - m.last_used, 1), "mounted_s": round(now - m.mounted_at, 1)}
+            for slug, m in sorted(_mounted.items())}
+
+def preload_modules(slugs) -> None:
+    for slug in slugs:
+        if slug in MODULE_ENTRIES:
+            mount(builtin_spec(slug))
+
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+class ModuleDispatcher:
+    """WSGI front: requests under a mounted module's prefix go straight to
+    its Flask app; everything else (including not-yet-mounted modules) goes
+    to the portal, whose /module/<slug>/ view mounts on demand."""
+
+    def __init__(self, portal_wsgi):
+        self.portal_wsgi = portal_wsgi
+        self._last_sweep = time.monotonic()
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path.startswith("/module/"):
+            slug = path[len("/module/"):].split("/", 1)[0]
+            mod = _mounted.get(slug)
+            if mod is not None and path.startswith(mod.spec.base):
+                mod.last_used = time.monotonic()
+                return mod.server.wsgi_app(environ, start_response)
+        if MODULE_IDLE_UNLOAD_S > 0 and time.monotonic() - self._last_sweep > min(60.0, MODULE_IDLE_UNLOAD_S):
+            self._last_sweep = time.monotonic()
+            _unload_idle()
+        return self.portal_wsgi(environ, start_response)
+
+def register_module_routes(server: Flask) -> None:
+    global _portal_server
+    _portal_server = server
+
+    @server.route("/module/<slug>", methods=["GET"])
+    def module_redirect(slug):
+        return redirect(f"/module/{slug}/")
+
+    @server.route("/module/<slug>/", defaults={"rest": ""}, methods=["GET", "POST"])
+    @server.route("/module/<slug>/<path:rest>", methods=["GET", "POST"])
+    def module_dispatch(slug, rest):
+        try:
+            spec = active_modules().get(slug)
+        except Exception as e:
+            return _unavailable(e)
+        if spec is None:
+            return Response("<p>Unknown module.</p>", status=404, mimetype="text/html")
+        denied = _guard(spec)
+        if denied is not None:
+            return denied
+        mod = mount(spec)
+        mod.last_used = time.monotonic()
+        # First request only: later ones are routed by ModuleDispatcher.
+        return Response.from_app(mod.server.wsgi_app, request.environ)
+
+    server.wsgi_app = ModuleDispatcher(server.wsgi_app)
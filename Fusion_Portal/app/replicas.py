@@ -0,0 +1,94 @@
+"""
+Read-only replica routing.
+
+get_conn(readonly=True) marks a workload that tolerates slightly stale data
+(Core catalog scans and previews). With DB_READ_ROUTING on, those go to a
+read replica of the same database instead of the primary that serves logins
+and ADM writes:
+
+- DB_READ_SERVER set: that server; otherwise the primary's server with
+  ApplicationIntent=ReadOnly (Azure SQL / AG readable secondary). Either way
+  the connection string differs from the primary's, so the ODBC driver
+  manager pools replica connections separately.
+- DB_READ_DATABASE_SUFFIX: read from <database><suffix> instead, e.g. two
+  local stand-in databases (Fusion_Core and Fusion_Core_ro) for testing.
+- Fallback: the replica has its own circuit breaker ("<db>@read"); while it
+  is open, or a replica connect fails, the call goes to the primary.
+- Staleness: every LAG_CHECK_S the replica's redo lag is read from
+  sys.dm_database_replica_states; above DB_READ_MAX_LAG_S (0 = never check)
+  reads go to the primary until the next check. A replica without replica
+  states (stand-in database, lag DMV not visible) counts as current.
+
+Read-write callers (readonly=False, the default) always use the primary.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from .metrics import Counter, register
+
+LAG_CHECK_S = 15.0
+
+LAG_SQL = """
+SELECT MAX(ISNULL(secondary_lag_seconds, DATEDIFF(SECOND, last_redone_time, last_received_time)))
+FROM sys.dm_database_replica_states
+WHERE is_local = 1 AND database_id = DB_ID();
+"""
+
+DB_READ_ROUTES = register(Counter(
+    "fusion_db_read_routes_total", "Read-only connections by where they were served", ("database", "target")))
+
+def replica_label(database: str) -> str:
+    return f"{database}@read"
+
+class ReplicaRoute:
+    def __init__(self, database: str, max_lag_s: float):
+        self.database = database
+        self.label = replica_label(database)
+        self.max_lag_s = max_lag_s
+        self._lock = threading.Lock()
+        self.lag_s: float | None = None
+        self.lag_error = ""
+        self.checked_at = 0.0
+        self.stale = False
+
+    def lag_check_due(self) -> bool:
+        return self.max_lag_s > 0 and time.monotonic() - self.checked_at >= LAG_CHECK_S
+
+    def check_lag(self, conn) -> None:
+        """Run LAG_SQL on an open replica connection (one caller per interval)."""
+        with self._lock:
+            if not self.lag_check_due():
+                return
+            self.checked_at = time.monotonic()
+        try:
+            row = conn.cursor().execute(LAG_SQL).fetchone()
+            self.lag_s = float(row[0]) if row and row[0] is not None else 0.0
+            self.lag_error = ""
+        except Exception as e:
+            self.lag_s, self.lag_error = None, f"{type(e).__name__}: {e}"[:300]
+        was_stale = self.stale
+        self.stale = self.lag_s is not None and self.lag_s > self.max_lag_s
+        if self.stale != was_stale:
+            state = f"{self.lag_s:.0f}s behind, reading from primary" if self.stale else "caught up"
+            print(f"[DB] replica {self.label}: {state}", flush=True)
+
+    def use_replica(self) -> bool:
+        return not (self.stale and not self.lag_check_due())
+
+    def as_dict(self) -> dict:
+        return {"stale": self.stale, "lag_s": self.lag_s, "lag_error": self.lag_error}
+
+_routes: dict[str, ReplicaRoute] = {}
+_routes_lock = threading.Lock()
+
+def route_for(database: str, max_lag_s: float) -> ReplicaRoute:
+    r = _routes.get(database)
+    if r is None:
+        with _routes_lock:
+            r = _routes.setdefault(database, ReplicaRoute(database, max_lag_s))
+    return r
+
+def replica_states() -> dict[str, dict]:
+    return {r.label: r.as_dict() for _, r in sorted(_routes.items())}
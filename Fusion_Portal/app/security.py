@@ -1,9 +1,12 @@
 from passlib.context import CryptContext
 
+from .dbio import run_blocking
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+    # bcrypt holds its thread for ~0.25 s; off the event loop under gevent workers
+    return run_blocking(pwd_context.verify, password, password_hash)
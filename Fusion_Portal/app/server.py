@@ -1,32 +1,63 @@
-from flask import Flask, redirect, request
+import hmac
+
+from flask import Flask, Response, abort, redirect, request
 from flask_login import current_user
 
 from .auth import auth_bp, login_manager
-from .config import load_settings
+from .breaker import CLOSED, breaker_states
+from .config import get_settings
+from .dbio import gate as db_gate
+from .metrics import render_prometheus
+from .replicas import replica_states
+from .profiling import is_admin, profiling_bp
+from .singleflight import flight_status
+from .versions import change_bus, start_change_bus
 
 def create_server() -> Flask:
-    settings = load_settings()
+    settings = get_settings()
     server = Flask(__name__, template_folder="templates")
     server.secret_key = settings.secret_key
 
     login_manager.init_app(server)
     server.register_blueprint(auth_bp)
+    server.register_blueprint(profiling_bp)
 
     @server.get("/healthz")
     def healthz():
-        return {"status": "ok"}
+        # Always 200 while the process serves: an unreachable DB should not
+        # get the service restarted. Breakers appear once a DB has been used.
+        databases = breaker_states()
+        degraded = any(b["state"] != CLOSED for b in databases.values())
+        return {"status": "degraded" if degraded else "ok", "databases": databases,
+                "read_replicas": replica_states(), "change_bus": change_bus().status(),
+                "singleflight": flight_status(), "db_io": db_gate.status()}
+
+    def metrics_allowed() -> bool:
+        # Database and statement names and their traffic: not for anonymous users.
+        if settings.metrics_public:
+            return True
+        if settings.metrics_token:
+            sent = (request.headers.get("Authorization") or "").encode()
+            if hmac.compare_digest(sent, f"Bearer {settings.metrics_token}".encode()):
+                return True
+        return bool(getattr(current_user, "is_authenticated", False) and is_admin(current_user))
+
+    @server.get("/metrics")
+    def metrics():
+        if not metrics_allowed():
+            abort(401)
+        return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
 
-    # Redirect /module/Core (no slash) -> /module/Core/
-    @server.get("/module/Core")
-    def core_redirect():
-        return redirect("/module/Core/")
+    # Per process: under --preload the master never serves, so each worker
+    # starts its own poller on its first request.
+    server.before_request(start_change_bus)
 
     @server.before_request
     def require_login():
         path = request.path or ""
 
         # Public endpoints
-        allow_prefixes = ("/login", "/logout", "/healthz", "/assets", "/favicon.ico")
+        allow_prefixes = ("/login", "/logout", "/healthz", "/metrics", "/assets", "/favicon.ico")
         if path.startswith(allow_prefixes):
             return None
 
@@ -34,6 +65,7 @@ def create_server() -> Flask:
         needs_auth = (
             path == "/" or
             path.startswith("/module/") or
+            path.startswith("/admin/") or
             "/_dash" in path or
             "/_favicon" in path or
             "/_reload-hash" in path
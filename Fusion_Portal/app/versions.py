@@ -0,0 +1,74 @@
+"""
+Named data-version counters for the portal's caches.
+
+Each name stands for a group of source data (ADM tables, the Core catalog...).
+Anything that changes that data, or learns that it changed, calls bump(name);
+caches key their entries on snapshot(names) so a bump makes the old entries
+unreachable without having to find and delete them.
+
+Counters are per process. For ADM data, app.changebus polls the tables
+named in TABLES and bumps the matching counter in every worker when they
+change (start_change_bus(), called per request - it only starts once per
+process), so version-keyed caches may hold entries for max_age(ttl_s).
+"""
+from __future__ import annotations
+
+import threading
+
+ADM_USERS = "adm.users"
+ADM_PROFILE = "adm.profile"
+ADM_ACL = "adm.acl"          # ADM.Modules + ADM.UserModuleAccess
+CORE_CATALOG = "core.catalog"
+
+# Source tables per counter, watched by the change bus.
+TABLES = {
+    ADM_USERS: ("ADM.Users",),
+    ADM_PROFILE: ("ADM.UserProfile",),
+    ADM_ACL: ("ADM.Modules", "ADM.UserModuleAccess"),
+}
+# Columns whose updates count as a change. Logins stamp ADM.Users.last_login,
+# which no cache reads; counting it would drop every user's cached layouts in
+# every worker on each login (sql/005 turns on TRACK_COLUMNS_UPDATED for this).
+COLUMNS = {
+    "ADM.Users": ("username", "email", "password_hash", "first_name", "last_name", "role", "is_active"),
+}
+
+_lock = threading.Lock()
+_versions: dict[str, int] = {}
+
+def current(name: str) -> int:
+    return _versions.get(name, 0)
+
+def snapshot(names) -> tuple[int, ...]:
+    return tuple(_versions.get(n, 0) for n in names)
+
+def bump(*names: str) -> None:
+    with _lock:
+        for n in names:
+            _versions[n] = _versions.get(n, 0) + 1
+
+def all_versions() -> dict[str, int]:
+    with _lock:
+        return dict(_versions)
+
+_bus = None
+
+def change_bus():
+    global _bus
+    if _bus is None:
+        from .changebus import ChangeBus
+        from .db import get_conn
+
+        with _lock:
+            if _bus is None:
+                _bus = ChangeBus("adm", lambda: get_conn(autocommit=True, query="changebus.poll"), TABLES,
+                                 columns=COLUMNS)
+                _bus.subscribe(bump)
+    return _bus
+
+def start_change_bus() -> None:
+    change_bus().start()
+
+def max_age(ttl_s: float) -> float:
+    """ttl_s, or longer while the change bus is delivering invalidations."""
+    return _bus.max_age(ttl_s) if _bus is not None else ttl_s
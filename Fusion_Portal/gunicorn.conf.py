@@ -0,0 +1,27 @@
+# Gunicorn settings for the portal (picked up automatically from the working
+# directory; explicit: gunicorn -c gunicorn.conf.py wsgi:server).
+import os
+
+# Build the app once in the master; workers fork from the booted image.
+# app.boot reads FUSION_PRELOAD to warm deferred imports before the fork.
+preload_app = os.getenv("FUSION_PRELOAD", "1").strip().lower() in ("1", "true", "yes", "on")
+os.environ["FUSION_PRELOAD"] = "1" if preload_app else "0"
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = 120
+
+# GUNICORN_WORKER_CLASS=gevent: each worker serves up to worker_connections
+# requests on greenlets; app.dbio runs the blocking pyodbc calls on a pool of
+# DB_MAX_CONCURRENCY threads per worker. Patch here, before --preload imports
+# the app in the master, so every lock and socket created at boot is gevent's.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "").strip() or ("gthread" if threads > 1 else "sync")
+if worker_class == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "500"))
+
+def post_fork(server, worker):
+    server.log.info("Worker %s forked from %s master", worker.pid, "preloaded" if preload_app else "plain")
@@ -0,0 +1,306 @@
+"""
+In-process stand-in for pyodbc serving the portal (ADM) and Core databases.
+
+install() puts this module in sys.modules["pyodbc"] before the app is
+imported. Statements are routed by what they read (see ADM_ROUTES /
+CORE_ROUTES) to canned, deterministic data; connect and execute each sleep
+for a configurable latency so DB waits look like Azure SQL round trips:
+
+    LOADTEST_CONNECT_MS   per connect()   (default 15)
+    LOADTEST_QUERY_MS     per execute()   (default 5)
+    LOADTEST_USERS        ADM users       (default 500; loadtest_user0..N-1)
+    LOADTEST_CORE_TABLES  Core tables     (default 400)
+    LOADTEST_REPLICA_LAG_S    lag reported by read replicas (default 0)
+    LOADTEST_REPLICA_DOWN     1 = ApplicationIntent=ReadOnly connects fail
+
+Every user's password is "login" (same bcrypt hash as the seed script), so
+logins pay the real verify cost.
+"""
+import datetime as dt
+import os
+import re
+import sys
+import time
+
+pooling = True
+
+class Error(Exception):
+    pass
+
+class DatabaseError(Error):
+    pass
+
+class OperationalError(DatabaseError):
+    pass
+
+class ProgrammingError(DatabaseError):
+    pass
+
+class InterfaceError(Error):
+    pass
+
+# bcrypt("login"), from sql/seed/seed_aidan_full_access.sql
+PASSWORD_HASH = "$2b$12$mKzRv3xTBoxWiJWSdCEES.wtClWhgFsy.Kye0VS6fft3GaiozOwI."
+CORE_DB = "Fusion_Core_LoadTest"
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+CONNECT_S = _env_int("LOADTEST_CONNECT_MS", 15) / 1000.0
+QUERY_S = _env_int("LOADTEST_QUERY_MS", 5) / 1000.0
+N_USERS = _env_int("LOADTEST_USERS", 500)
+N_TABLES = _env_int("LOADTEST_CORE_TABLES", 400)
+REPLICA_LAG_S = _env_int("LOADTEST_REPLICA_LAG_S", 0)
+REPLICA_DOWN = _env_int("LOADTEST_REPLICA_DOWN", 0)
+
+MODULES = [("Fusion Core", "/module/Core/", "bi bi-database")]
+
+def user_row(user_id: int):
+    return (user_id, f"loadtest_user{user_id}", f"loadtest_user{user_id}@example.com",
+            PASSWORD_HASH, "Load", f"User{user_id}", "User", 1)
+
+def _block(seconds: float) -> None:
+    """Sleep without yielding, like a real driver call: under gevent
+    time.sleep is patched to switch greenlets, pyodbc's waits are not."""
+    monkey = sys.modules.get("gevent.monkey")
+    sleep = monkey.get_original("time", "sleep") if monkey and monkey.is_module_patched("time") else time.sleep
+    sleep(seconds)
+
+def _table_names():
+    schemas = ("dbo", "stg", "ref", "log")
+    return [(schemas[i % len(schemas)], f"Table{i:04d}") for i in range(N_TABLES)]
+
+# ---------------------------------------------------------------------------
+# Statement routing: (compiled regex on whitespace-normalised SQL, handler)
+# A handler gets (params, match) and returns (columns, rows).
+# ---------------------------------------------------------------------------
+
+def _user_by_login(params, _m):
+    login = str(params[0])
+    m = re.fullmatch(r"loadtest_user(\d+)(@example\.com)?", login)
+    if not m or int(m.group(1)) >= N_USERS:
+        return ["user_id"], []
+    u = user_row(int(m.group(1)))
+    return ["user_id", "username", "email", "password_hash", "first_name", "last_name", "role", "is_active"], [u]
+
+def _user_by_id(params, _m):
+    uid = int(params[0])
+    if uid >= N_USERS:
+        return ["user_id"], []
+    u = user_row(uid)
+    return ["user_id", "username", "email", "first_name", "last_name", "role", "is_active"], [
+        (u[0], u[1], u[2], u[4], u[5], u[6], u[7])]
+
+def _profile(params, _m):
+    return ["theme", "default_module", "landing_layout", "kpi_preferences"], [("light", "Fusion Core", "{}", "{}")]
+
+def _modules(params, _m):
+    return ["module_name", "module_url", "icon"], list(MODULES)
+
+def _can_access(params, _m):
+    return ["x"], [(1,)]
+
+def _noop(params, _m):
+    return [], []
+
+def _object_counts(params, _m):
+    return ["tables_count", "views_count", "procs_count"], [(N_TABLES, N_TABLES // 8, N_TABLES // 5)]
+
+def _table_list(params, _m):
+    return ["schema_name", "table_name"], sorted(_table_names())
+
+def _top_tables(params, m):
+    limit = int(params[0]) if m.group(1) == "?" else int(m.group(1))
+    rows = [(f"[{s}].[{t}]", (N_TABLES - i) * 1_000) for i, (s, t) in enumerate(_table_names())]
+    return ["table_name", "row_count"], rows[:limit]
+
+def _table_sizes(params, _m):
+    return ["schema_name", "table_name", "row_count"], [
+        (s, t, (N_TABLES - i) * 1_000) for i, (s, t) in enumerate(_table_names())]
+
+def _table_columns(params, _m):
+    cols = ["Id", "Code", "Name", "Amount", "CreatedAt", "IsActive", "Notes", "Ref"]
+    return ["schema_name", "table_name", "column_name"], [(s, t, c) for s, t in sorted(_table_names()) for c in cols]
+
+PREVIEW_COLUMNS = [("Id", "int"), ("Code", "nvarchar"), ("Name", "nvarchar"), ("Amount", "decimal"),
+                   ("CreatedAt", "datetime2"), ("IsActive", "bit"), ("Notes", "nvarchar"), ("Ref", "varchar")]
+
+def _column_types(params, _m):
+    # Notes is nvarchar(max)
+    return ["name", "type_name", "max_length"], [(c, t, -1 if c == "Notes" else 8) for c, t in PREVIEW_COLUMNS]
+
+def _column_profile(params, m):
+    # core_profile batch: aggregates over #sample, then top values (two result sets)
+    types = dict(PREVIEW_COLUMNS)
+    items = m.group(1).split(", ")
+    n = int(params[0])
+    agg = [n]
+    top = []
+    base = dt.datetime(2025, 1, 1)
+    for i, item in enumerate(items):
+        name = item.rsplit(" AS ", 1)[-1].strip("[]")
+        agg.append(n // 10 if name == "Notes" else 0)
+        if item.startswith("CASE WHEN"):  # null flag only
+            continue
+        lo, hi = {"int": (1, n), "decimal": (1.25, n * 1.25), "datetime2": (base, base + dt.timedelta(minutes=n)),
+                  "bit": (0, 1)}.get(types[name], (f"{name}-00001", f"{name}-{n:05d}"))
+        agg += [2 if types[name] == "bit" else n, lo, hi]
+        top += [(i, str(lo), 1), (i, str(hi), 1)]
+    return [(["n"] + [f"c{i}" for i in range(len(agg) - 1)], [tuple(agg)]), (["i", "v", "n"], top)]
+
+def _preview(params, m):
+    limit = int(params[0]) if m.group(1) == "?" else int(m.group(1))
+    cols = [c for c, _ in PREVIEW_COLUMNS]
+    base = dt.datetime(2025, 1, 1)
+    rows = [(i, f"C{i:05d}", f"Row {i}", i * 1.25, base + dt.timedelta(minutes=i), i % 2 == 0, None, f"R-{i}")
+            for i in range(limit)]
+    return cols, rows
+
+def _replica_lag(params, _m):
+    return ["lag"], [(REPLICA_LAG_S,)]
+
+def _change_tracking_tables(params, _m):
+    return ["name"], []
+
+def _change_signals(params, m):
+    # CHANGE_TRACKING_CURRENT_VERSION() then (count, checksum) per table; constant, so
+    # the change bus only ever sees its baseline.
+    n = m.group(1).count("(SELECT")
+    return ["v"] + [f"c{i}" for i in range(n)], [(None,) + (N_USERS,) * n]
+
+ADM_ROUTES = [
+    (r"^SELECT 1;?$", _can_access),  # breaker probe
+    (r"FROM sys\.change_tracking_tables", _change_tracking_tables),
+    (r"FROM sys\.dm_database_replica_states", _replica_lag),
+    (r"^SELECT CHANGE_TRACKING_CURRENT_VERSION\(\)(.*)$", _change_signals),
+    (r"FROM ADM\.Users WHERE username = \? OR email = \?", _user_by_login),
+    (r"FROM ADM\.Users WHERE user_id = \?", _user_by_id),
+    (r"UPDATE ADM\.Users SET last_login", _noop),
+    (r"FROM ADM\.UserProfile", _profile),
+    (r"SELECT TOP 1 1 FROM ADM\.Modules", _can_access),
+    (r"SELECT m\.module_name, m\.module_url", _modules),
+    (r"SELECT module_name, module_url, icon FROM ADM\.Modules WHERE is_active = 1", _modules),
+]
+CORE_ROUTES = [
+    (r"FROM sys\.objects", _object_counts),
+    (r"SELECT TOP \((\d+|\?)\)\s+QUOTENAME", _top_tables),
+    (r"SUM\(p\.rows\) AS row_count FROM sys\.tables", _table_sizes),
+    (r"FROM sys\.columns c WHERE c\.object_id = OBJECT_ID\(\?\)", _column_types),
+    (r"FROM sys\.columns c", _table_columns),
+    (r"SELECT TOP \(\?\) (.*?) INTO #sample FROM", _column_profile),
+    (r"FROM sys\.tables t JOIN sys\.schemas s ON s\.schema_id = t\.schema_id", _table_list),
+    (r"SELECT TOP \((\d+|\?)\) \* FROM", _preview),
+]
+_COMPILED = [(re.compile(p, re.IGNORECASE), h) for p, h in ADM_ROUTES + CORE_ROUTES]
+
+def _route(sql: str):
+    flat = " ".join(sql.split())
+    for rx, handler in _COMPILED:
+        m = rx.search(flat)
+        if m:
+            return handler, m
+    raise ProgrammingError(f"fake_pyodbc: unrouted statement: {flat[:120]}")
+
+class Cursor:
+    def __init__(self, conn):
+        self.connection = conn
+        self.description = None
+        self.rowcount = -1
+        self.fast_executemany = False
+        self._rows = []
+        self._sets = []
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = tuple(params[0])
+        handler, m = _route(sql)
+        if QUERY_S:
+            _block(QUERY_S)
+        result = handler(params, m)
+        self._sets = list(result) if isinstance(result, list) else [result]
+        self.nextset()
+        return self
+
+    def nextset(self):
+        if not self._sets:
+            return None
+        cols, rows = self._sets.pop(0)
+        self.description = [(c, str, None, None, None, None, True) for c in cols] if cols else None
+        self._rows = list(rows)
+        self.rowcount = len(self._rows)
+        return True
+
+    def executemany(self, sql, seq):
+        for params in seq:
+            self.execute(sql, *params)
+        return self
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size=1):
+        out, self._rows = self._rows[:size], self._rows[size:]
+        return out
+
+    def fetchall(self):
+        out, self._rows = self._rows, []
+        return out
+
+    def __iter__(self):
+        while self._rows:
+            yield self._rows.pop(0)
+
+    def close(self):
+        self._rows = []
+
+class Connection:
+    def __init__(self, database: str, autocommit: bool):
+        self.database = database
+        self.autocommit = autocommit
+        self.closed = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # pyodbc semantics: commit/rollback, do not close
+        return False
+
+def drivers():
+    return ["ODBC Driver 18 for SQL Server"]
+
+def connect(conn_str: str = "", autocommit: bool = False, **kwargs):
+    if CONNECT_S:
+        _block(CONNECT_S)
+    if REPLICA_DOWN and re.search(r"ApplicationIntent=ReadOnly", conn_str or "", re.IGNORECASE):
+        raise OperationalError("08001", "fake_pyodbc: read replica unreachable")
+    m = re.search(r"DATABASE=([^;]*)", conn_str or "", re.IGNORECASE)
+    return Connection(m.group(1) if m else "", autocommit)
+
+def install() -> None:
+    """Register as pyodbc and give the portal settings that reach it."""
+    sys.modules["pyodbc"] = sys.modules[__name__]
+    os.environ.setdefault("DB_SERVER", "loadtest.invalid")
+    os.environ.setdefault("DB_USER", "loadtest")
+    os.environ.setdefault("DB_PASSWORD", "loadtest")
+    os.environ.setdefault("DB_DATABASE", "Fusion_Dashboard")
+    os.environ.setdefault("CORE_DB", CORE_DB)
+    os.environ.setdefault("SECRET_KEY", "loadtest-secret")
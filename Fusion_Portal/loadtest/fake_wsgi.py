@@ -0,0 +1,11 @@
+"""WSGI entry point for load tests: the real portal on top of loadtest.fake_pyodbc.
+
+    gunicorn -c gunicorn.conf.py loadtest.fake_wsgi:server
+"""
+from loadtest import fake_pyodbc
+
+fake_pyodbc.install()
+
+from app.boot import boot  # noqa: E402
+
+server = boot()
@@ -0,0 +1,305 @@
+"""
+Offline load test of the portal's HTTP paths.
+
+Starts the real app (app.boot: create_server() + Dash apps) on top of
+loadtest.fake_pyodbc, drives it with concurrent scripted users and reports
+throughput and latency percentiles per step.
+
+    python -m loadtest.run --users 40 --duration 30 --workers 2 --threads 4
+    python -m loadtest.run --users 300 --worker-class gevent   # cooperative I/O workers
+    python -m loadtest.run --inprocess ...        # werkzeug threaded server (no gunicorn, e.g. Windows)
+    python -m loadtest.run --url http://host:port # existing server (must use fake_wsgi or real data)
+
+Journey per virtual user (repeated until --duration):
+    login (every --relogin-every iterations; bcrypt verify included)
+    landing: GET /  +  GET /_dash-layout
+    core:    GET /module/Core/  +  GET /module/Core/_dash-layout
+             + the three panel callbacks (KPIs, top-tables chart, table list)
+    search:  one table selector typeahead callback
+    preview: --previews x POST /module/Core/_dash-update-component (table preview)
+
+Fake DB latency: LOADTEST_CONNECT_MS / LOADTEST_QUERY_MS (see fake_pyodbc).
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+PORTAL_DIR = Path(__file__).resolve().parents[1]
+
+# (step name, Dash output) of the Core page's progressively loaded panels
+CORE_PANELS = [
+    ("core_kpis", "core-kpis.children"),
+    ("core_chart", "core-chart.children"),
+    ("core_tables", "core-table-picker.children"),
+]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_healthy(base: str, timeout: float = 60.0) -> None:
+    u = urlsplit(base)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            c = http.client.HTTPConnection(u.hostname, u.port, timeout=2)
+            c.request("GET", "/healthz")
+            if c.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"Server at {base} did not become healthy in {timeout:.0f}s")
+
+def start_gunicorn(port: int, workers: int, threads: int, preload: bool, worker_class: str = "",
+                   log_path: str | None = None):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+               FUSION_PRELOAD="1" if preload else "0", GUNICORN_WORKER_CLASS=worker_class)
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "loadtest.fake_wsgi:server"]
+    # stderr is never read here: a pipe would fill up and stall the server under test
+    log = open(log_path, "ab") if log_path else subprocess.DEVNULL
+    try:
+        return subprocess.Popen(cmd, cwd=PORTAL_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    finally:
+        if log_path:
+            log.close()  # the child has its own descriptor
+
+def start_inprocess(port: int):
+    from werkzeug.serving import make_server
+
+    from loadtest.fake_wsgi import server as app
+
+    srv = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, step: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[step].append(seconds)
+            if not ok:
+                self.errors[step] += 1
+
+def _pct(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+class VirtualUser(threading.Thread):
+    def __init__(self, idx: int, base: str, args, stats: Stats, stop_at: float):
+        super().__init__(daemon=True)
+        u = urlsplit(base)
+        self.host, self.port = u.hostname, u.port
+        self.user = f"loadtest_user{idx % args.user_pool}"
+        self.args = args
+        self.stats = stats
+        self.stop_at = stop_at
+        self.cookie = ""
+        self.conn = None
+        self.rng = random.Random(idx)
+
+    def _request(self, step: str, method: str, path: str, body=None, headers=None, expect=(200,),
+                 location: str | None = None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.args.timeout)
+            self.conn.request(method, path, body=body, headers=headers)
+            resp = self.conn.getresponse()
+            resp.read()
+            ok = resp.status in expect and (
+                location is None or urlsplit(resp.getheader("Location", "")).path == location)
+            for k, v in resp.getheaders():
+                if k.lower() == "set-cookie" and v.startswith("session="):
+                    self.cookie = v.split(";", 1)[0]
+            if resp.getheader("Connection", "").lower() == "close":
+                self.conn.close()
+                self.conn = None
+        except (OSError, http.client.HTTPException):
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+        self.stats.add(step, time.perf_counter() - t0, ok)
+        return ok
+
+    def login(self) -> bool:
+        self.cookie = ""
+        body = urlencode({"login": self.user, "password": "login"})
+        # a bad login also redirects (back to /login): only a redirect to / counts
+        return self._request("login", "POST", "/login", body,
+                             {"Content-Type": "application/x-www-form-urlencoded"}, expect=(302,), location="/")
+
+    def core_panel(self, step: str, output: str) -> None:
+        component, prop = output.split(".")
+        payload = {
+            "output": output,
+            "outputs": {"id": component, "property": prop},
+            "inputs": [{"id": "core-refresh", "property": "n_clicks", "value": None}],
+            "changedPropIds": [],
+            "state": [],
+        }
+        self._request(step, "POST", "/module/Core/_dash-update-component", json.dumps(payload),
+                      {"Content-Type": "application/json"})
+
+    def table_search(self) -> None:
+        query = f"table{self.rng.randrange(self.args.tables) // 10:03d}"
+        payload = {
+            "output": "core-table.options",
+            "outputs": {"id": "core-table", "property": "options"},
+            "inputs": [{"id": "core-table-query", "property": "data", "value": query}],
+            "changedPropIds": ["core-table-query.data"],
+            "state": [{"id": "core-table", "property": "value", "value": None}],
+        }
+        self._request("table_search", "POST", "/module/Core/_dash-update-component", json.dumps(payload),
+                      {"Content-Type": "application/json"})
+
+    def preview(self) -> None:
+        table = f"{('dbo', 'stg', 'ref', 'log')[self.rng.randrange(4)]}.Table{self.rng.randrange(self.args.tables):04d}"
+        payload = {
+            "output": "core-preview.children",
+            "outputs": {"id": "core-preview", "property": "children"},
+            "inputs": [{"id": "core-table", "property": "value", "value": table}],
+            "changedPropIds": ["core-table.value"],
+            "state": [],
+        }
+        self._request("table_preview", "POST", "/module/Core/_dash-update-component", json.dumps(payload),
+                      {"Content-Type": "application/json"})
+
+    def run(self):
+        i = 0
+        while time.time() < self.stop_at:
+            if i % self.args.relogin_every == 0 and not self.login():
+                time.sleep(0.5)
+                i = 0
+                continue
+            self._request("landing", "GET", "/")
+            self._request("landing_layout", "GET", "/_dash-layout")
+            self._request("core_page", "GET", "/module/Core/")
+            self._request("core_layout", "GET", "/module/Core/_dash-layout")
+            for step, output in CORE_PANELS:
+                self.core_panel(step, output)
+            self.table_search()
+            for _ in range(self.args.previews):
+                self.preview()
+            i += 1
+            if self.args.think_ms:
+                time.sleep(self.args.think_ms / 1000.0)
+
+def report(stats: Stats, elapsed: float) -> dict:
+    steps = {}
+    total = 0
+    for step, vals in sorted(stats.latencies.items()):
+        s = sorted(vals)
+        total += len(s)
+        steps[step] = {
+            "count": len(s),
+            "errors": stats.errors.get(step, 0),
+            "rps": round(len(s) / elapsed, 2),
+            "p50_ms": round(_pct(s, 0.50) * 1000, 1),
+            "p90_ms": round(_pct(s, 0.90) * 1000, 1),
+            "p95_ms": round(_pct(s, 0.95) * 1000, 1),
+            "p99_ms": round(_pct(s, 0.99) * 1000, 1),
+            "max_ms": round(s[-1] * 1000, 1),
+        }
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 2), "steps": steps}
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline load test of the portal HTTP paths (fake ADM/Core DBs).")
+    ap.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds")
+    ap.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    ap.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    ap.add_argument("--worker-class", default="", help="gunicorn worker class, e.g. gevent (default: gthread)")
+    ap.add_argument("--no-preload", action="store_true", help="boot each gunicorn worker separately")
+    ap.add_argument("--inprocess", action="store_true", help="werkzeug threaded server instead of gunicorn")
+    ap.add_argument("--url", default=None, help="target an already running server instead")
+    ap.add_argument("--previews", type=int, default=3, help="table previews per journey")
+    ap.add_argument("--relogin-every", type=int, default=10, help="journeys between logins")
+    ap.add_argument("--think-ms", type=float, default=0.0, help="pause between journeys")
+    ap.add_argument("--user-pool", type=int, default=500, help="distinct fake accounts to log in as")
+    ap.add_argument("--tables", type=int, default=400, help="Core tables to preview from")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    ap.add_argument("--server-log", default=None, help="append gunicorn's stderr here (default: discarded)")
+    ap.add_argument("--out", default=None, help="write the JSON report here")
+    args = ap.parse_args()
+
+    os.environ.setdefault("LOADTEST_USERS", str(args.user_pool))
+    os.environ.setdefault("LOADTEST_CORE_TABLES", str(args.tables))
+
+    proc = srv = None
+    if args.url:
+        base = args.url.rstrip("/")
+        mode = "external"
+    else:
+        port = _free_port()
+        base = f"http://127.0.0.1:{port}"
+        if args.inprocess:
+            srv = start_inprocess(port)
+            mode = "werkzeug threaded (in-process)"
+        else:
+            proc = start_gunicorn(port, args.workers, args.threads, preload=not args.no_preload,
+                                  worker_class=args.worker_class, log_path=args.server_log)
+            mode = f"gunicorn workers={args.workers} threads={args.threads} preload={not args.no_preload}"
+            if args.worker_class:
+                mode += f" worker_class={args.worker_class}"
+
+    try:
+        _wait_healthy(base)
+        print(f"target {base} ({mode}); {args.users} users for {args.duration:.0f}s", flush=True)
+        stats = Stats()
+        t0 = time.time()
+        users = [VirtualUser(i, base, args, stats, t0 + args.duration) for i in range(args.users)]
+        for u in users:
+            u.start()
+        for u in users:
+            u.join(args.duration + args.timeout + 5)
+        result = report(stats, time.time() - t0)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if srv is not None:
+            srv.shutdown()
+
+    result["config"] = {k: v for k, v in vars(args).items() if k != "out"} | {
+        "mode": mode,
+        "connect_ms": os.getenv("LOADTEST_CONNECT_MS", "15"),
+        "query_ms": os.getenv("LOADTEST_QUERY_MS", "5"),
+    }
+
+    print(f"\n{'step':<16}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for step, s in result["steps"].items():
+        print(f"{step:<16}{s['count']:>8}{s['errors']:>6}{s['rps']:>9}{s['p50_ms']:>9}{s['p90_ms']:>9}"
+              f"{s['p95_ms']:>9}{s['p99_ms']:>9}{s['max_ms']:>9}")
+    print(f"\ntotal {result['requests']} requests in {result['elapsed_s']}s = {result['rps']} req/s")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"saved {args.out}")
+
+if __name__ == "__main__":
+    main()
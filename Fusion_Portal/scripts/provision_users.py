@@ -0,0 +1,275 @@
+"""
+Bulk-provision portal users, profiles and module grants from CSV or JSON.
+
+    python scripts/provision_users.py users.csv
+    python scripts/provision_users.py users.json --replace-grants
+    python scripts/provision_users.py users.csv --dry-run
+
+Columns / keys (only username and email are required):
+    username, email, password | password_hash, first_name, last_name, role,
+    is_active, theme, default_module, modules, edit_modules
+
+modules / edit_modules are ADM.Modules.module_name lists (";"-separated in
+CSV, arrays in JSON); edit_modules implies view. New users need a password or
+a password_hash; existing users (matched on username) are updated and keep
+their hash unless one is given.
+
+Passwords are bcrypt-hashed in parallel worker processes. Rows go into temp
+tables with fast_executemany and are upserted into ADM.Users,
+ADM.UserProfile and ADM.UserModuleAccess with set-based statements, all in
+one transaction.
+"""
+import argparse
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pyodbc
+from passlib.context import CryptContext
+
+from create_user import load_conn_str  # scripts/ is on sys.path when run as a script
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+USER_FIELDS = ["username", "email", "password_hash", "first_name", "last_name", "role", "is_active",
+               "theme", "default_module"]
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _flag(value, default: int = 1) -> int:
+    if value is None or str(value).strip() == "":
+        return default
+    v = str(value).strip().lower()
+    if v in ("1", "true", "yes", "y", "on"):
+        return 1
+    if v in ("0", "false", "no", "n", "off"):
+        return 0
+    raise ValueError(f"not a boolean: {value!r}")
+
+def _names(value) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split(";") if v.strip()]
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def read_records(path: Path) -> list[dict]:
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(data, dict):
+            data = data.get("users", [])
+        return list(data)
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+def parse(records: list[dict]):
+    """-> (users, grants, passwords_to_hash, errors); users keyed by username."""
+    users: dict[str, dict] = {}
+    grants: dict[tuple[str, str], int] = {}
+    to_hash: dict[str, str] = {}
+    errors: list[str] = []
+    emails: set[str] = set()
+
+    for n, rec in enumerate(records, start=1):
+        username = _clean(rec.get("username"))
+        email = _clean(rec.get("email"))
+        if not username or not email:
+            errors.append(f"record {n}: username and email are required")
+            continue
+        key = username.lower()
+        if key in users:
+            errors.append(f"record {n}: duplicate username {username!r}")
+            continue
+        if email.lower() in emails:
+            errors.append(f"record {n}: duplicate email {email!r}")
+            continue
+        try:
+            is_active = _flag(rec.get("is_active"))
+        except ValueError as e:
+            errors.append(f"record {n}: is_active {e}")
+            continue
+        emails.add(email.lower())
+        users[key] = {
+            "username": username,
+            "email": email,
+            "password_hash": _clean(rec.get("password_hash")),
+            "first_name": _clean(rec.get("first_name")),
+            "last_name": _clean(rec.get("last_name")),
+            "role": _clean(rec.get("role")) or "User",
+            "is_active": is_active,
+            "theme": _clean(rec.get("theme")),
+            "default_module": _clean(rec.get("default_module")),
+        }
+        password = rec.get("password")
+        if password and not users[key]["password_hash"]:
+            to_hash[key] = str(password)
+        for m in _names(rec.get("modules")):
+            grants.setdefault((username, m), 0)
+        for m in _names(rec.get("edit_modules")):
+            grants[(username, m)] = 1
+    return users, grants, to_hash, errors
+
+def hash_all(to_hash: dict[str, str], workers: int | None) -> dict[str, str]:
+    if not to_hash:
+        return {}
+    keys = list(to_hash)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(_hash, (to_hash[k] for k in keys), chunksize=8))
+    return dict(zip(keys, hashes))
+
+STAGE_SQL = """
+CREATE TABLE #stage_users (
+    username NVARCHAR(100) NOT NULL PRIMARY KEY, email NVARCHAR(255) NOT NULL, password_hash NVARCHAR(255) NULL,
+    first_name NVARCHAR(100) NULL, last_name NVARCHAR(100) NULL, role NVARCHAR(50) NOT NULL, is_active BIT NOT NULL,
+    theme NVARCHAR(50) NULL, default_module NVARCHAR(100) NULL);
+CREATE TABLE #stage_grants (
+    username NVARCHAR(100) NOT NULL, module_name NVARCHAR(100) NOT NULL, can_edit BIT NOT NULL,
+    PRIMARY KEY (username, module_name));
+"""
+
+CHECK_SQL = """
+SELECT 'new user without password' AS problem, s.username AS item
+FROM #stage_users s
+WHERE s.password_hash IS NULL AND NOT EXISTS (SELECT 1 FROM ADM.Users u WHERE u.username = s.username)
+UNION ALL
+SELECT DISTINCT 'unknown module', g.module_name
+FROM #stage_grants g
+WHERE NOT EXISTS (SELECT 1 FROM ADM.Modules m WHERE m.module_name = g.module_name)
+UNION ALL
+SELECT 'email used by another user', s.email
+FROM #stage_users s
+JOIN ADM.Users u ON u.email = s.email AND u.username <> s.username;
+"""
+
+UPSERT_SQL = [
+    ("users updated", """
+UPDATE u SET
+    email = s.email,
+    password_hash = COALESCE(s.password_hash, u.password_hash),
+    first_name = s.first_name, last_name = s.last_name, role = s.role, is_active = s.is_active
+FROM ADM.Users u JOIN #stage_users s ON s.username = u.username;
+"""),
+    ("users inserted", """
+INSERT INTO ADM.Users (username, email, password_hash, first_name, last_name, role, is_active)
+SELECT s.username, s.email, s.password_hash, s.first_name, s.last_name, s.role, s.is_active
+FROM #stage_users s
+WHERE NOT EXISTS (SELECT 1 FROM ADM.Users u WHERE u.username = s.username);
+"""),
+    ("profiles updated", """
+UPDATE p SET
+    theme = COALESCE(s.theme, p.theme),
+    default_module = COALESCE(s.default_module, p.default_module)
+FROM ADM.UserProfile p
+JOIN ADM.Users u ON u.user_id = p.user_id
+JOIN #stage_users s ON s.username = u.username
+WHERE s.theme IS NOT NULL OR s.default_module IS NOT NULL;
+"""),
+    ("profiles inserted", """
+INSERT INTO ADM.UserProfile (user_id, theme, default_module)
+SELECT u.user_id, COALESCE(s.theme, 'light'), s.default_module
+FROM #stage_users s
+JOIN ADM.Users u ON u.username = s.username
+WHERE NOT EXISTS (SELECT 1 FROM ADM.UserProfile p WHERE p.user_id = u.user_id);
+"""),
+    ("grants updated", """
+UPDATE a SET can_view = 1, can_edit = g.can_edit
+FROM ADM.UserModuleAccess a
+JOIN ADM.Users u ON u.user_id = a.user_id
+JOIN ADM.Modules m ON m.module_id = a.module_id
+JOIN #stage_grants g ON g.username = u.username AND g.module_name = m.module_name;
+"""),
+    ("grants inserted", """
+INSERT INTO ADM.UserModuleAccess (user_id, module_id, can_view, can_edit)
+SELECT u.user_id, m.module_id, 1, g.can_edit
+FROM #stage_grants g
+JOIN ADM.Users u ON u.username = g.username
+JOIN ADM.Modules m ON m.module_name = g.module_name
+WHERE NOT EXISTS (SELECT 1 FROM ADM.UserModuleAccess a WHERE a.user_id = u.user_id AND a.module_id = m.module_id);
+"""),
+]
+
+# --replace-grants: provisioned users lose grants the file does not list
+REVOKE_SQL = ("grants revoked", """
+DELETE a
+FROM ADM.UserModuleAccess a
+JOIN ADM.Users u ON u.user_id = a.user_id
+JOIN #stage_users s ON s.username = u.username
+JOIN ADM.Modules m ON m.module_id = a.module_id
+WHERE NOT EXISTS (SELECT 1 FROM #stage_grants g WHERE g.username = u.username AND g.module_name = m.module_name);
+""")
+
+def _stage(cur, users: dict, grants: dict) -> None:
+    cur.execute(STAGE_SQL)
+    cur.fast_executemany = True
+    if users:
+        cur.executemany(
+            f"INSERT INTO #stage_users ({', '.join(USER_FIELDS)}) VALUES ({', '.join('?' * len(USER_FIELDS))})",
+            [tuple(u[f] for f in USER_FIELDS) for u in users.values()],
+        )
+    if grants:
+        cur.executemany(
+            "INSERT INTO #stage_grants (username, module_name, can_edit) VALUES (?, ?, ?)",
+            [(u, m, e) for (u, m), e in grants.items()],
+        )
+    cur.fast_executemany = False
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk upsert ADM users, profiles and module grants from CSV/JSON.")
+    ap.add_argument("file", help=".csv or .json")
+    ap.add_argument("--replace-grants", action="store_true",
+                    help="remove grants of listed users that the file does not mention")
+    ap.add_argument("--workers", type=int, default=None, help="hashing processes (default: all cores)")
+    ap.add_argument("--dry-run", action="store_true", help="validate the file only; no hashing, no DB")
+    args = ap.parse_args()
+
+    path = Path(args.file)
+    if not path.exists():
+        raise SystemExit(f"File not found: {path}")
+
+    t0 = time.perf_counter()
+    users, grants, to_hash, errors = parse(read_records(path))
+    if errors:
+        raise SystemExit("Invalid input:\n  " + "\n  ".join(errors[:50]))
+    print(f"Parsed {len(users)} users, {len(grants)} grants, {len(to_hash)} passwords to hash "
+          f"({time.perf_counter() - t0:.2f} s)")
+    if args.dry_run:
+        return
+
+    t1 = time.perf_counter()
+    for key, h in hash_all(to_hash, args.workers).items():
+        users[key]["password_hash"] = h
+    print(f"Hashed {len(to_hash)} passwords in {time.perf_counter() - t1:.2f} s")
+
+    t2 = time.perf_counter()
+    conn_str = load_conn_str()
+    with pyodbc.connect(conn_str, autocommit=False) as conn:
+        cur = conn.cursor()
+        try:
+            _stage(cur, users, grants)
+            problems = cur.execute(CHECK_SQL).fetchall()
+            if problems:
+                conn.rollback()
+                raise SystemExit("Nothing written:\n  " + "\n  ".join(f"{p}: {i}" for p, i in problems[:50]))
+            steps = UPSERT_SQL + ([REVOKE_SQL] if args.replace_grants else [])
+            for label, sql in steps:
+                cur.execute(sql)
+                print(f"  {label}: {cur.rowcount}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+    print(f"Committed in {time.perf_counter() - t2:.2f} s (total {time.perf_counter() - t0:.2f} s).")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import argparse
+import hashlib
 import os
 import re
+import time
 from pathlib import Path
 
 import pyodbc
@@ -52,31 +54,181 @@ def load_conn_str() -> str:
         "Connection Timeout=30;"
     )
 
+GO_LINE = re.compile(r"^\s*GO\s*$", flags=re.IGNORECASE | re.MULTILINE)
+
+# Statements SQL Server refuses inside a user transaction. A file containing
+# any of them runs batch by batch in autocommit mode instead.
+NON_TRANSACTIONAL = re.compile(
+    r"^\s*(CREATE|ALTER|DROP)\s+DATABASE\b|^\s*(BACKUP|RESTORE)\b|^\s*(CREATE|ALTER|DROP)\s+FULLTEXT\s+(CATALOG|INDEX)\b"
+    r"|^\s*RECONFIGURE\b",
+    flags=re.IGNORECASE | re.MULTILINE,
+)
+
+MIGRATIONS_TABLE = "dbo.FusionMigrations"
+PORTAL_ROOT = Path(__file__).resolve().parents[1]
+
+CREATE_MIGRATIONS_SQL = f"""
+IF OBJECT_ID('{MIGRATIONS_TABLE}', 'U') IS NULL
+BEGIN
+    CREATE TABLE {MIGRATIONS_TABLE} (
+        script       NVARCHAR(400) NOT NULL,
+        checksum     CHAR(64)      NOT NULL,
+        batch_no     INT           NOT NULL,
+        duration_ms  INT           NOT NULL,
+        applied_at   DATETIME2(0)  NOT NULL CONSTRAINT DF_FusionMigrations_applied_at DEFAULT SYSDATETIME(),
+        CONSTRAINT PK_FusionMigrations PRIMARY KEY (script, checksum)
+    );
+END
+"""
+
+COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", flags=re.DOTALL)
+
 def split_batches(sql_text: str):
-    pattern = re.compile(r"^\s*GO\s*$", flags=re.IGNORECASE | re.MULTILINE)
-    return [p.strip() for p in pattern.split(sql_text) if p.strip()]
+    # Comment-only batches (e.g. "-- included in ddl_all.sql") are not batches.
+    return [p.strip() for p in GO_LINE.split(sql_text) if COMMENTS.sub("", p).strip()]
+
+def batch_checksum(batch: str) -> str:
+    # Line endings and trailing spaces do not count as a change.
+    norm = "\n".join(line.rstrip() for line in batch.replace("\r\n", "\n").split("\n")).strip()
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+def script_key(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(PORTAL_ROOT).as_posix()
+    except ValueError:
+        return path.name
+
+def collect_files(targets) -> list[Path]:
+    files = []
+    for t in targets:
+        p = Path(t)
+        if p.is_dir():
+            files.extend(sorted(p.glob("*.sql")))
+        elif p.exists():
+            files.append(p)
+        else:
+            raise SystemExit(f"SQL file not found: {p}")
+    return files
+
+def applied_checksums(cur, script: str) -> set[str]:
+    if cur is None:
+        return set()
+    cur.execute(f"SELECT checksum FROM {MIGRATIONS_TABLE} WHERE script = ?", script)
+    return {r[0] for r in cur.fetchall()}
+
+def migrations_table_exists(cur) -> bool:
+    cur.execute("SELECT OBJECT_ID(?, 'U')", MIGRATIONS_TABLE)
+    return cur.fetchone()[0] is not None
+
+def _summary(batch: str) -> str:
+    first = next((line.strip() for line in COMMENTS.sub("", batch).splitlines() if line.strip()), "")
+    return first[:70]
+
+def plan_file(path: Path, cur, force: bool):
+    script = script_key(path)
+    batches = split_batches(path.read_text(encoding="utf-8"))
+    done = set() if force else applied_checksums(cur, script)
+    steps = []
+    for i, batch in enumerate(batches, start=1):
+        checksum = batch_checksum(batch)
+        steps.append((i, batch, checksum, checksum not in done))
+    transactional = not NON_TRANSACTIONAL.search("\n".join(batches))
+    return script, steps, transactional
+
+def record(cur, script: str, checksum: str, batch_no: int, duration_ms: int) -> None:
+    cur.execute(
+        f"DELETE FROM {MIGRATIONS_TABLE} WHERE script = ? AND checksum = ?; "
+        f"INSERT INTO {MIGRATIONS_TABLE} (script, checksum, batch_no, duration_ms) VALUES (?, ?, ?, ?);",
+        script, checksum, script, checksum, batch_no, duration_ms,
+    )
+
+def run_file(conn, path: Path, force: bool, use_transaction: bool) -> tuple[int, int]:
+    cur = conn.cursor()
+    script, steps, transactional = plan_file(path, cur, force)
+    pending = [s for s in steps if s[3]]
+    print(f"[MIGRATE] {script}: {len(pending)}/{len(steps)} batches to run"
+          + ("" if not pending else f" ({'transaction' if transactional and use_transaction else 'autocommit'})"))
+    if not pending:
+        return 0, len(steps)
+
+    in_tx = transactional and use_transaction
+    t_file = time.perf_counter()
+    try:
+        conn.autocommit = not in_tx
+        for i, batch, checksum, _ in pending:
+            t0 = time.perf_counter()
+            cur.execute(batch)
+            while cur.nextset():  # drain result sets / row counts
+                pass
+            ms = int((time.perf_counter() - t0) * 1000)
+            record(cur, script, checksum, i, ms)
+            print(f"[MIGRATE]   batch {i}/{len(steps)} {ms:>7} ms  {_summary(batch)}")
+        if in_tx:
+            conn.commit()
+    except Exception:
+        if in_tx:
+            conn.rollback()
+            print(f"[MIGRATE] {script}: failed, rolled back")
+        else:
+            print(f"[MIGRATE] {script}: failed; batches before this one stay applied")
+        raise
+    finally:
+        conn.autocommit = True
+        cur.close()
+    print(f"[MIGRATE] {script}: done in {(time.perf_counter() - t_file) * 1000:.0f} ms")
+    return len(pending), len(steps) - len(pending)
+
+def print_plan(conn, files, force: bool) -> None:
+    cur = None
+    if conn is not None:
+        cur = conn.cursor()
+        if not migrations_table_exists(cur):
+            print(f"[MIGRATE] {MIGRATIONS_TABLE} does not exist yet: every batch is pending")
+            cur = None
+    for path in files:
+        script, steps, transactional = plan_file(path, cur, force)
+        pending = sum(1 for s in steps if s[3])
+        mode = "transaction" if transactional else "autocommit"
+        print(f"{script}: {pending}/{len(steps)} to run ({mode})")
+        for i, batch, checksum, todo in steps:
+            print(f"  {'RUN ' if todo else 'skip'} {i:>3} {checksum[:12]}  {_summary(batch)}")
 
 def main():
-    ap = argparse.ArgumentParser(description="Run a SQL Server .sql file, splitting on GO statements.")
-    ap.add_argument("sql_file", help="Path to .sql file")
+    ap = argparse.ArgumentParser(
+        description="Apply SQL Server .sql files (split on GO), running only batches not yet recorded "
+                    f"in {MIGRATIONS_TABLE}.")
+    ap.add_argument("sql_files", nargs="+", help=".sql files or directories (files applied in name order)")
+    ap.add_argument("--dry-run", action="store_true", help="print the plan; change nothing")
+    ap.add_argument("--offline", action="store_true", help="with --dry-run: do not connect, treat all as pending")
+    ap.add_argument("--force", action="store_true", help="re-run every batch, even if already applied")
+    ap.add_argument("--no-transaction", action="store_true", help="autocommit each batch instead of one transaction per file")
     args = ap.parse_args()
 
-    sql_path = Path(args.sql_file)
-    if not sql_path.exists():
-        raise SystemExit(f"SQL file not found: {sql_path}")
+    files = collect_files(args.sql_files)
+    if not files:
+        raise SystemExit("No SQL files found.")
 
-    batches = split_batches(sql_path.read_text(encoding="utf-8"))
-    if not batches:
-        raise SystemExit("No SQL batches found.")
+    if args.dry_run and args.offline:
+        print_plan(None, files, args.force)
+        return
 
     conn_str = load_conn_str()
     with pyodbc.connect(conn_str, autocommit=True) as conn:
+        if args.dry_run:
+            print_plan(conn, files, args.force)
+            return
+
         cur = conn.cursor()
-        for i, batch in enumerate(batches, start=1):
-            print(f"Running batch {i}/{len(batches)}...")
-            cur.execute(batch)
+        cur.execute(CREATE_MIGRATIONS_SQL)
         cur.close()
-    print("Done.")
+
+        t0 = time.perf_counter()
+        ran = skipped = 0
+        for path in files:
+            r, s = run_file(conn, path, args.force, not args.no_transaction)
+            ran += r
+            skipped += s
+    print(f"Done: {ran} batches applied, {skipped} unchanged, {(time.perf_counter() - t0):.1f} s.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,57 @@
+"""
+Copy the modules the dashboard shares with the portal into fusion_dashboard/.
+
+    python scripts/sync_shared.py           # rewrite the dashboard copies
+    python scripts/sync_shared.py --check   # exit 1 if any copy is stale
+
+app/<name>.py is the source. The portal imports them as a package and the
+dashboard as flat modules, so "from .x import" becomes "from x import" and
+each copy starts with a generated-file header. Shared modules may only
+import each other (and the stdlib); anything else has no dashboard copy.
+"""
+import argparse
+import re
+from pathlib import Path
+
+PORTAL_APP = Path(__file__).resolve().parents[1] / "app"
+DASHBOARD = Path(__file__).resolve().parents[2] / "fusion_dashboard"
+
+SHARED = ("env", "metrics", "statements", "singleflight", "changebus", "dbio")
+
+RELATIVE_IMPORT = re.compile(r"^from \.(\w*)(?: import)", flags=re.MULTILINE)
+
+def render(name: str) -> str:
+    src = (PORTAL_APP / f"{name}.py").read_text(encoding="utf-8")
+    for m in RELATIVE_IMPORT.finditer(src):
+        if m.group(1) not in SHARED:
+            raise SystemExit(f"app/{name}.py imports .{m.group(1)}, which is not shared with the dashboard")
+    header = (f"# Generated from Fusion_Portal/app/{name}.py by Fusion_Portal/scripts/sync_shared.py.\n"
+              "# Edit that file and re-run the script; do not edit this copy.\n")
+    return header + RELATIVE_IMPORT.sub(r"from \1 import", src)
+
+def stale() -> list[str]:
+    out = []
+    for name in SHARED:
+        target = DASHBOARD / f"{name}.py"
+        if not target.exists() or target.read_text(encoding="utf-8") != render(name):
+            out.append(name)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Sync the portal's shared modules into fusion_dashboard/.")
+    ap.add_argument("--check", action="store_true", help="only report stale copies (exit 1 if any)")
+    args = ap.parse_args()
+
+    names = stale()
+    if args.check:
+        for name in names:
+            print(f"stale: fusion_dashboard/{name}.py (run python scripts/sync_shared.py)")
+        raise SystemExit(1 if names else 0)
+    for name in names:
+        # newline="" keeps the source's line endings
+        (DASHBOARD / f"{name}.py").write_text(render(name), encoding="utf-8", newline="")
+        print(f"updated fusion_dashboard/{name}.py")
+    print(f"{len(SHARED) - len(names)} of {len(SHARED)} already in sync")
+
+if __name__ == "__main__":
+    main()
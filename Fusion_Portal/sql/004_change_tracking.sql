@@ -0,0 +1,33 @@
+/* =========================================================
+   Change tracking for the tables behind the portal / dashboard caches
+   (app/changebus.py). Optional: without it the change bus falls back to
+   COUNT_BIG + CHECKSUM_AGG per table.
+   ALTER DATABASE cannot run in a transaction, so run_sql.py applies this
+   file in autocommit mode.
+   ========================================================= */
+
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_databases WHERE database_id = DB_ID())
+    ALTER DATABASE CURRENT SET CHANGE_TRACKING = ON (CHANGE_RETENTION = 2 DAYS, AUTO_CLEANUP = ON);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('ADM.Users'))
+    ALTER TABLE ADM.Users ENABLE CHANGE_TRACKING;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('ADM.UserProfile'))
+    ALTER TABLE ADM.UserProfile ENABLE CHANGE_TRACKING;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('ADM.Modules'))
+    ALTER TABLE ADM.Modules ENABLE CHANGE_TRACKING;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('ADM.UserModuleAccess'))
+    ALTER TABLE ADM.UserModuleAccess ENABLE CHANGE_TRACKING;
+GO
+
+-- Dashboard config, when it lives in the same database
+IF OBJECT_ID('CFG.Interface_Movements', 'U') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('CFG.Interface_Movements'))
+    ALTER TABLE CFG.Interface_Movements ENABLE CHANGE_TRACKING;
+GO
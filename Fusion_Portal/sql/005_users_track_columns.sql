@@ -0,0 +1,18 @@
+/* =========================================================
+   Column-level change tracking for ADM.Users.
+   Every login updates ADM.Users.last_login; with TRACK_COLUMNS_UPDATED the
+   change bus (app/changebus.py, app/versions.COLUMNS) can tell those updates
+   from edits to the columns the caches depend on. The option can only be
+   set when enabling tracking, so a table tracked without it is re-enabled
+   (its change history restarts; the bus then invalidates once).
+   ========================================================= */
+
+IF EXISTS (SELECT 1 FROM sys.change_tracking_tables
+           WHERE object_id = OBJECT_ID('ADM.Users') AND is_track_columns_updated_on = 0)
+    ALTER TABLE ADM.Users DISABLE CHANGE_TRACKING;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.change_tracking_databases WHERE database_id = DB_ID())
+   AND NOT EXISTS (SELECT 1 FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID('ADM.Users'))
+    ALTER TABLE ADM.Users ENABLE CHANGE_TRACKING WITH (TRACK_COLUMNS_UPDATED = ON);
+GO
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# scripts/ are run as files (python scripts/run_sql.py), not as a package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
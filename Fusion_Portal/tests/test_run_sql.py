@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("pyodbc")
+import run_sql  # noqa: E402
+
+def test_split_batches_on_go_lines_only():
+    sql = (
+        "CREATE TABLE a (x INT);\nGO\n"
+        "-- included in ddl_all.sql\n/* nothing here */\n  go  \n"
+        "INSERT INTO a VALUES (1); -- GOTO is not GO\nSELECT 'GO';\ngo\n"
+        "\n\n"
+    )
+    assert run_sql.split_batches(sql) == [
+        "CREATE TABLE a (x INT);",
+        "INSERT INTO a VALUES (1); -- GOTO is not GO\nSELECT 'GO';",
+    ]
+    assert run_sql.split_batches("-- only a comment\nGO\n") == []
+
+def test_batch_checksum_ignores_line_endings_and_trailing_space():
+    batch = "CREATE TABLE a (\n    x INT\n);"
+    same = run_sql.batch_checksum(batch)
+    assert run_sql.batch_checksum(batch.replace("\n", "\r\n")) == same
+    assert run_sql.batch_checksum("\n" + batch.replace("\n", "   \n") + "  \n") == same
+    assert run_sql.batch_checksum(batch.replace("x INT", "x BIGINT")) != same
+    assert run_sql.batch_checksum(batch.replace("    x", "  x")) != same
+    assert len(same) == 64
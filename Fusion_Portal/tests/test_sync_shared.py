@@ -0,0 +1,4 @@
+import sync_shared
+
+def test_dashboard_copies_are_in_sync():
+    assert sync_shared.stale() == [], "run python scripts/sync_shared.py"
@@ -4,7 +4,10 @@ from dotenv import load_dotenv
 # Load local .env for dev; Render sets env vars directly
 load_dotenv()
 
-from app import server  # noqa: E402
+from app.boot import boot  # noqa: E402
+
+# Under gunicorn --preload (gunicorn.conf.py) this runs once in the master.
+server = boot()
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "10000"))
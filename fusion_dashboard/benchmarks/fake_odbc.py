@@ -0,0 +1,124 @@
+"""
+Offline stand-in for a pyodbc connection serving synthetic frames.
+
+Implements just the DB-API surface pd.read_sql uses (cursor, execute with a
+params list, description, fetchall/fetchmany, close) and routes each
+statement to a frame by what it selects from. Rows come back as tuples of
+Python objects, like pyodbc, so read_sql pays the same conversion cost it
+does in production.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+# statement fingerprint (substring) -> dataset key
+ROUTES = [
+    ("FROM LOG.RunDetail rd", "run"),
+    ("FROM CFG.Interface_Movements", "cfg"),
+    ("CONVERT(char(7), StartTime, 120)", "months"),
+]
+
+class FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+        self._rows = []
+        self._pos = 0
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = tuple(params[0])
+        columns, rows = self._conn.rows_for(sql, params)
+        if self._conn.latency_s:
+            time.sleep(self._conn.latency_s)
+        self.description = [(c, None, None, None, None, None, True) for c in columns]
+        self._rows = rows
+        self._pos = 0
+        self.rowcount = len(self._rows)
+        return self
+
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._rows[self._pos - 1]
+
+    def fetchmany(self, size=1):
+        out = self._rows[self._pos:self._pos + size]
+        self._pos += len(out)
+        return out
+
+    def fetchall(self):
+        out = self._rows[self._pos:] if self._pos else list(self._rows)
+        self._pos = len(self._rows)
+        return out
+
+    def close(self):
+        self._rows = []
+
+def _to_rows(frame: pd.DataFrame) -> list[tuple]:
+    cols = []
+    for c in frame.columns:
+        s = frame[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            vals = np.array(s.dt.to_pydatetime(), dtype=object)
+            vals[s.isna().to_numpy()] = None
+        else:
+            vals = s.astype(object).where(s.notna(), None).to_numpy()
+        cols.append(vals)
+    return list(zip(*cols)) if cols else []
+
+class FakeConnection:
+    """
+    datasets: {"run": RunDetail frame, "cfg": CFG frame}; latency_s is added
+    per execute. Converted row tuples are cached in datasets["_rows"] so
+    repeated reads measure the client side (read_sql), not the fake.
+    """
+
+    def __init__(self, datasets: dict, latency_s: float = 0.0):
+        self.datasets = datasets
+        self.latency_s = latency_s
+
+    def rows_for(self, sql: str, params) -> tuple[list[str], list[tuple]]:
+        cache = self.datasets.setdefault("_rows", {})
+        key = (sql, tuple(params))
+        if key not in cache:
+            frame = self.frame_for(sql, params)
+            cache[key] = (list(frame.columns), _to_rows(frame))
+        return cache[key]
+
+    def frame_for(self, sql: str, params) -> pd.DataFrame:
+        for needle, key in ROUTES:
+            if needle in sql:
+                break
+        else:
+            raise NotImplementedError(f"fake_odbc: no dataset for statement: {sql.strip()[:80]}")
+
+        if key == "run":
+            run = self.datasets["run"]
+            start, end = params[0], params[1]
+            return run.loc[(run["StartTime"] >= start) & (run["StartTime"] < end)]
+        if key == "cfg":
+            return self.datasets["cfg"]
+        months = self.datasets["run"]["StartTime"].dropna().dt.strftime("%Y-%m").drop_duplicates()
+        return pd.DataFrame({"MonthKey": months.sort_values(ascending=False).to_numpy()})
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,194 @@
+"""
+Benchmark the month pipeline on synthetic data, fully offline.
+
+Run from fusion_dashboard/:
+    python -m benchmarks.pipeline                      # 100k and 1M rows
+    python -m benchmarks.pipeline --rows 100k,1m,10m   # 10M needs ~20+ GB RAM
+    python -m benchmarks.pipeline --compare bench_results/<older>.json
+
+Stages timed per size (seconds, plus peak traced memory unless --no-memory):
+read_sql, _derive_fields, load_cfg_active, build_expected_map,
+compute_route_completeness, build_month_sketches, load_month end to end and,
+with pyarrow, coldtier.freeze / thaw of the loaded month.
+data_loader._conn is pointed at benchmarks.fake_odbc for the run, so the
+real read_sql -> DataFrame conversion and the DB instrumentation are
+included. Results go to bench_results/<timestamp>_<label>.json.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import coldtier
+import data_loader
+from metrics import instrument_connection
+from sketches import build_month_sketches
+
+from .fake_odbc import FakeConnection
+from .synthetic import generate_cfg, generate_rundetail
+
+SIZES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+MONTH = "2025-01"
+
+def _parse_rows(spec: str) -> list[int]:
+    out = []
+    for part in spec.split(","):
+        part = part.strip().lower()
+        out.append(SIZES[part] if part in SIZES else int(float(part)))
+    return out
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+def _clear_caches() -> None:
+    data_loader.clear_month_cache()
+
+@contextmanager
+def _offline(datasets: dict, latency_s: float):
+    original = data_loader._conn
+    data_loader._conn = lambda query="unnamed", readonly=True: instrument_connection(
+        lambda: FakeConnection(datasets, latency_s), query, "synthetic")
+    _clear_caches()
+    try:
+        yield
+    finally:
+        data_loader._conn = original
+        _clear_caches()
+
+class StageTimer:
+    def __init__(self, memory: bool):
+        self.memory = memory
+        self.stages: list[dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        yield
+        rec = {"stage": name, "seconds": round(time.perf_counter() - t0, 4)}
+        if self.memory:
+            rec["peak_mb"] = round((tracemalloc.get_traced_memory()[1] - base) / 2**20, 1)
+        self.stages.append(rec)
+        mem = f"  peak {rec['peak_mb']:>9.1f} MB" if self.memory else ""
+        print(f"    {name:<28} {rec['seconds']:>9.3f} s{mem}", flush=True)
+
+def run_size(rows: int, memory: bool, latency_s: float, seed: int) -> dict:
+    print(f"  rows={rows:,}", flush=True)
+    t0 = time.perf_counter()
+    cfg = generate_cfg(seed=seed)
+    run_raw = generate_rundetail(rows, MONTH, cfg, seed=seed + 1)
+    gen_s = time.perf_counter() - t0
+    print(f"    {'(generate)':<28} {gen_s:>9.3f} s", flush=True)
+
+    datasets = {"run": run_raw, "cfg": cfg}
+    start, end = data_loader.month_to_range(MONTH)
+    timer = StageTimer(memory)
+
+    # Materialise the fake's row tuples up front (the server side of the wire)
+    fake = FakeConnection(datasets)
+    fake.rows_for(data_loader.RUNDETAIL.sql, data_loader.RUNDETAIL.bind(start, end))
+    fake.rows_for(data_loader.EXPECTED.sql, [])
+
+    if memory:
+        tracemalloc.start()
+    with _offline(datasets, latency_s):
+        with timer.stage("read_sql"):
+            conn = data_loader._conn("bench.rundetail")
+            try:
+                raw = pd.read_sql(data_loader.RUNDETAIL.sql, conn, params=data_loader.RUNDETAIL.bind(start, end))
+            finally:
+                conn.close()
+        with timer.stage("_derive_fields"):
+            run = data_loader._derive_fields(raw)
+        del raw
+        with timer.stage("load_cfg_active"):
+            cfg_active = data_loader.load_cfg_active()
+        with timer.stage("build_expected_map"):
+            exp_map = data_loader.build_expected_map(cfg_active)
+        with timer.stage("compute_route_completeness"):
+            data_loader.compute_route_completeness(run, exp_map)
+        with timer.stage("build_month_sketches"):
+            build_month_sketches(run)
+        del run
+        _clear_caches()
+        with timer.stage("load_month"):
+            run = data_loader.load_month(MONTH)["run"]
+        if coldtier.available():
+            with timer.stage("coldtier.freeze"):
+                frozen = coldtier.freeze(run)
+            with timer.stage("coldtier.thaw"):
+                coldtier.thaw(frozen)
+            print(f"    {'(frozen)':<28} {frozen.size / 2**20:>9.1f} MB  x{frozen.ratio:.1f}", flush=True)
+            del frozen
+        del run
+    if memory:
+        tracemalloc.stop()
+
+    return {"rows": rows, "generate_seconds": round(gen_s, 3), "stages": timer.stages}
+
+def _compare(current: dict, previous_path: str) -> None:
+    prev = json.loads(Path(previous_path).read_text(encoding="utf-8"))
+    before = {(r["rows"], s["stage"]): s for r in prev["results"] for s in r["stages"]}
+    print(f"\nvs {previous_path} ({prev['meta'].get('label') or prev['meta'].get('git_rev')}):")
+    for r in current["results"]:
+        for s in r["stages"]:
+            old = before.get((r["rows"], s["stage"]))
+            if not old or not old["seconds"]:
+                continue
+            ratio = s["seconds"] / old["seconds"]
+            print(f"  {r['rows']:>11,} {s['stage']:<28} {old['seconds']:>9.3f} -> {s['seconds']:>9.3f} s  x{ratio:.2f}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline benchmark of the data_loader month pipeline.")
+    ap.add_argument("--rows", default="100k,1m", help="comma list: 100k,1m,10m or integers")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="added per fake execute()")
+    ap.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, timing only)")
+    ap.add_argument("--label", default="", help="tag stored in the result file (e.g. release)")
+    ap.add_argument("--out", default="bench_results", help="directory for the JSON result")
+    ap.add_argument("--compare", default=None, help="previous result JSON to diff against")
+    args = ap.parse_args()
+
+    memory = not args.no_memory
+
+    meta = {
+        "label": args.label,
+        "git_rev": _git_rev(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "latency_ms": args.latency_ms,
+        "memory_traced": memory,
+    }
+    print(f"pipeline benchmark {meta['git_rev']} {meta['label']}".rstrip())
+    results = [run_size(n, memory, args.latency_ms / 1000.0, args.seed) for n in _parse_rows(args.rows)]
+    report = {"meta": meta, "results": results}
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{args.label or meta['git_rev'] or 'run'}.json"
+    (out_dir / name).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nsaved {out_dir / name}")
+
+    if args.compare:
+        _compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
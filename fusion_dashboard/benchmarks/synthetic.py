@@ -0,0 +1,167 @@
+"""
+Deterministic synthetic data shaped like LOG.RunDetail (as returned by
+RUNDETAIL_SQL, joins included) and CFG.Interface_Movements (EXPECTED_SQL).
+
+Same (rows, seed) -> same frames, so timings are comparable between runs.
+What makes it realistic enough to benchmark:
+- principal volume is Zipf-skewed (a few principals own most rows)
+- routes have 1-12 expected movements; ~10% of runs stop short
+- ~2% of rows hit routes that are not configured (RouteStatus UNKNOWN)
+- ~1% in-progress rows (EndTime NULL), a few negative durations
+- messy Status spellings/whitespace, NULLs, and error messages that only
+  differ by file name / GUID / timestamp
+"""
+import numpy as np
+import pandas as pd
+
+RUNDETAIL_COLUMNS = [
+    "DetailID", "RunID", "MovementCode", "InterfaceCode", "Principal_Code",
+    "PrincipalName", "InterfaceName", "InterfaceType", "InterfaceProfile",
+    "ConfigDirection", "RunDirection", "FileName", "SourcePath", "DestinationPath",
+    "FileSizeBytes", "Status", "ErrorMessage", "StartTime", "EndTime",
+]
+CFG_COLUMNS = [
+    "InterfaceCode", "Principal_Code", "MovementCode", "Variant", "Type", "Profile",
+    "Interface", "Direction", "FilePattern", "File_Mask", "Source", "Destination", "Active",
+]
+
+SUCCESS_STATUSES = ["Success", "SUCCESS", "success ", " OK", "Completed", "SUCCEEDED", "Successful"]
+FAILURE_STATUSES = ["Failed", "FAILED", "Error", "error ", "TIMEOUT", "Aborted", None]
+ERROR_TEMPLATES = [
+    "File {f} not found in {p}",
+    "Timeout after {n} seconds while copying {f} (transfer id {g})",
+    "Access to the path '{p}\\{f}' is denied.",
+    "Remote host closed connection at {ts}",
+    "Checksum mismatch for {f}: expected {h} got {h2}",
+    "Login failed for user 'svc_{n}'",
+]
+
+def _zipf_weights(n: int, a: float = 1.3) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** a
+    return w / w.sum()
+
+def generate_cfg(n_principals: int = 40, n_interfaces: int = 300, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    principals = [f"P{i:03d}" for i in range(n_principals)]
+    rows = []
+    for i in range(n_interfaces):
+        code = f"IF{i:04d}"
+        # Each interface serves 1-4 principals and has 1-12 movements per route
+        for p in rng.choice(principals, size=int(rng.integers(1, 5)), replace=False):
+            n_mov = int(rng.integers(1, 13))
+            for m in range(n_mov):
+                rows.append((
+                    code, p, f"M{m:02d}", "A", rng.choice(["SFTP", "API", "SMB", "AS2"]),
+                    rng.choice(["Standard", "Bulk", "Realtime"]), f"Interface {i}",
+                    rng.choice(["IN", "OUT"]), f"{code}_*.csv", "*.csv",
+                    f"\\\\fileserver\\{p}\\in", f"/data/{p}/out", 1,
+                ))
+    return pd.DataFrame(rows, columns=CFG_COLUMNS)
+
+def generate_rundetail(rows: int, month: str = "2025-01", cfg: pd.DataFrame | None = None, seed: int = 11) -> pd.DataFrame:
+    """rows RunDetail rows for month ('YYYY-MM'), RUNDETAIL_SQL column order."""
+    rng = np.random.default_rng(seed)
+    cfg = generate_cfg() if cfg is None else cfg
+
+    routes = cfg.groupby(["Principal_Code", "InterfaceCode"])["MovementCode"].apply(list)
+    route_keys = list(routes.index)
+    route_movs = routes.tolist()
+    n_routes = len(route_keys)
+
+    # Skew: weight routes by their principal's Zipf rank
+    principals = sorted({p for p, _ in route_keys})
+    p_weight = dict(zip(principals, _zipf_weights(len(principals))))
+    w = np.array([p_weight[p] for p, _ in route_keys])
+    w = w / w.sum()
+
+    # Runs: pick a route, emit its movements (10% of runs stop short)
+    avg_movs = float(np.mean([len(m) for m in route_movs]))
+    n_runs = int(rows / avg_movs) + 1
+    run_route = rng.choice(n_routes, size=n_runs, p=w)
+    mov_counts = np.array([len(route_movs[r]) for r in run_route])
+    short = rng.random(n_runs) < 0.10
+    mov_counts[short] = np.maximum(1, (mov_counts[short] * rng.random(short.sum())).astype(int))
+
+    row_run = np.repeat(np.arange(n_runs), mov_counts)[:rows]
+    offsets = np.arange(len(row_run)) - np.repeat(np.cumsum(mov_counts) - mov_counts, mov_counts)[:rows]
+    row_route = run_route[row_run]
+    n = len(row_run)
+    if n < rows:  # tiny configs: top up with repeats
+        extra = rng.integers(0, n, size=rows - n)
+        row_run, offsets, row_route = (np.concatenate([a, a[extra]]) for a in (row_run, offsets, row_route))
+        n = rows
+
+    principal = np.array([route_keys[r][0] for r in range(n_routes)], dtype=object)[row_route]
+    interface = np.array([route_keys[r][1] for r in range(n_routes)], dtype=object)[row_route]
+    mov_flat = np.array([m for movs in route_movs for m in movs], dtype=object)
+    mov_len = np.array([len(m) for m in route_movs])
+    mov_start = np.cumsum(mov_len) - mov_len
+    movement = mov_flat[mov_start[row_route] + np.minimum(offsets, mov_len[row_route] - 1)]
+
+    # ~2% rows on unconfigured routes: LEFT JOINs to CFG come back NULL
+    unknown = rng.random(n) < 0.02
+    interface[unknown] = "IFX" + pd.Series(rng.integers(0, 50, unknown.sum())).astype(str).str.zfill(3).to_numpy()
+
+    cfg_dim = cfg.drop_duplicates(["Principal_Code", "InterfaceCode", "MovementCode"]).set_index(
+        ["Principal_Code", "InterfaceCode", "MovementCode"])[["Interface", "Type", "Profile", "Direction"]]
+    joined = cfg_dim.reindex(pd.MultiIndex.from_arrays([principal, interface, movement]))
+
+    # Times: runs spread over the month, movements a few seconds apart
+    start, end = pd.Timestamp(f"{month}-01"), pd.Timestamp(f"{month}-01") + pd.offsets.MonthBegin(1)
+    span = (end - start).total_seconds() - 86_400
+    run_start = start + pd.to_timedelta(rng.random(n_runs) * span, unit="s")
+    start_time = run_start[row_run] + pd.to_timedelta(offsets * 5, unit="s")
+    duration = rng.lognormal(mean=2.0, sigma=1.2, size=n)
+    duration[rng.random(n) < 0.001] *= -1  # clock skew
+    end_time = pd.Series(start_time + pd.to_timedelta(duration, unit="s"))
+    end_time[rng.random(n) < 0.01] = pd.NaT  # in progress
+
+    failed = rng.random(n) < 0.06
+    status = np.where(
+        failed,
+        np.array(FAILURE_STATUSES, dtype=object)[rng.integers(0, len(FAILURE_STATUSES), n)],
+        np.array(SUCCESS_STATUSES, dtype=object)[rng.integers(0, len(SUCCESS_STATUSES), n)],
+    )
+
+    file_id = pd.Series(rng.integers(0, max(n // 3, 1), n)).astype(str)
+    file_name = (pd.Series(interface) + "_" + file_id + ".csv").to_numpy()
+    source = ("\\\\fileserver\\" + pd.Series(principal) + "\\in").to_numpy()
+    dest = ("/data/" + pd.Series(principal) + "/out").to_numpy()
+
+    error = np.full(n, None, dtype=object)
+    fidx = np.flatnonzero(failed)
+    if len(fidx):
+        tmpl = rng.integers(0, len(ERROR_TEMPLATES), len(fidx))
+        nums = rng.integers(1, 10_000, len(fidx))
+        error[fidx] = [
+            ERROR_TEMPLATES[t].format(
+                f=file_name[i], p=source[i], n=k, g=f"{k:08x}-1a2b-4c3d-8e9f-{i:012x}",
+                ts=(start + pd.Timedelta(seconds=int(k) * 37)).isoformat(), h=f"{k * 7919 & 0xFFFFFFFF:08x}", h2=f"{k * 104729 & 0xFFFFFFFF:08x}",
+            )
+            for t, i, k in zip(tmpl.tolist(), fidx.tolist(), nums.tolist())
+        ]
+
+    size = np.round(rng.lognormal(mean=10, sigma=2, size=n)).astype(float)
+    size[rng.random(n) < 0.01] = np.nan
+
+    return pd.DataFrame({
+        "DetailID": np.arange(1, n + 1),
+        "RunID": row_run + 1,
+        "MovementCode": movement,
+        "InterfaceCode": interface,
+        "Principal_Code": principal,
+        "PrincipalName": ("Principal " + pd.Series(principal).str[1:]).to_numpy(),
+        "InterfaceName": joined["Interface"].to_numpy(),
+        "InterfaceType": joined["Type"].to_numpy(),
+        "InterfaceProfile": joined["Profile"].to_numpy(),
+        "ConfigDirection": joined["Direction"].to_numpy(),
+        "RunDirection": rng.choice(np.array(["IN", "OUT", "in", None], dtype=object), n),
+        "FileName": file_name,
+        "SourcePath": source,
+        "DestinationPath": dest,
+        "FileSizeBytes": size,
+        "Status": status,
+        "ErrorMessage": error,
+        "StartTime": start_time,
+        "EndTime": end_time.to_numpy(),
+    }, columns=RUNDETAIL_COLUMNS)
@@ -0,0 +1,208 @@
+# Generated from Fusion_Portal/app/changebus.py by Fusion_Portal/scripts/sync_shared.py.
+# Edit that file and re-run the script; do not edit this copy.
+"""
+Change-version driven cache invalidation.
+
+A ChangeBus watches groups of tables ({"adm.acl": ("ADM.Modules",
+"ADM.UserModuleAccess"), ...}). Every CHANGE_BUS_INTERVAL_S seconds
+(default 5, 0 = off) a background thread runs one batched SELECT that reads
+a cheap version signal per table and calls the subscribers with each group
+whose signal moved:
+
+- tables with SQL Server change tracking enabled: whether
+  CHANGETABLE(CHANGES t, <last version>) has any rows, i.e. anything
+  committed since the previous poll (an index seek, not a table scan);
+- other tables: COUNT_BIG(*) and CHECKSUM_AGG(BINARY_CHECKSUM(*)). Fine for
+  small config tables; CHECKSUM_AGG can in rare cases miss an update that
+  swaps values between rows, so enable change tracking where that matters.
+
+columns={"schema.table": (column, ...)} limits what counts as a change in a
+table to inserts, deletes and updates of those columns (e.g. leave out a
+last-login stamp written on every login). With change tracking that needs
+TRACK_COLUMNS_UPDATED = ON - without it every update still counts; the
+checksum fallback checksums just those columns.
+
+The first successful poll reports every group as changed, so anything cached
+before the bus started is dropped once.
+
+Buses are per process: start() launches the poller in the calling process
+(again after a fork), so each worker invalidates its own caches. Caches may
+then hold entries for up to max_age(ttl_s) - CHANGE_BUS_MAX_AGE_S (default
+3600) while live() (recent successful poll), falling back to their own short
+TTL while the database or the bus is down.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+
+from env import env_float
+
+CHANGE_BUS_INTERVAL_S = env_float("CHANGE_BUS_INTERVAL_S", 5.0)
+CHANGE_BUS_MAX_AGE_S = env_float("CHANGE_BUS_MAX_AGE_S", 3600.0)
+
+_TABLE_RX = re.compile(r"^(\w+)\.(\w+)$")
+_COLUMN_RX = re.compile(r"^\w+$")
+
+TRACKED_TABLES_SQL = """
+SELECT s.name + N'.' + t.name
+FROM sys.change_tracking_tables ct
+JOIN sys.tables t ON t.object_id = ct.object_id
+JOIN sys.schemas s ON s.schema_id = t.schema_id;
+"""
+
+def _quoted(table: str) -> str:
+    m = _TABLE_RX.match(table)
+    if not m:
+        raise ValueError(f"Expected schema.table, got {table!r}")
+    return f"[{m.group(1)}].[{m.group(2)}]"
+
+def _column(name: str) -> str:
+    if not _COLUMN_RX.match(name):
+        raise ValueError(f"Invalid column name {name!r}")
+    return name
+
+class ChangeBus:
+    def __init__(self, name: str, connect, groups: dict, interval_s: float = CHANGE_BUS_INTERVAL_S,
+                 columns: dict | None = None):
+        """connect() returns a DB-API connection (closed after each poll);
+        groups maps a group name to the "schema.table" names behind it;
+        columns optionally maps a table to the only columns whose updates count."""
+        self.name = name
+        self.connect = connect
+        self.groups = {g: tuple(tables) for g, tables in groups.items()}
+        self.interval_s = interval_s
+        self._tables = sorted({t for tables in self.groups.values() for t in tables})
+        for t in self._tables:
+            _quoted(t)
+        self.columns = {t: tuple(_column(c) for c in cols) for t, cols in (columns or {}).items()}
+        self._subscribers: list = []
+        self._lock = threading.Lock()
+        self._pid = 0
+        self._tracked: set[str] | None = None  # discovered on the first poll
+        self._ct_version = None
+        self._signals: dict[str, tuple] | None = None
+        self.last_ok = 0.0
+        self.last_error = ""
+        self.polls = self.invalidations = 0
+
+    def subscribe(self, fn) -> None:
+        """fn(group) is called on the poller thread for every changed group."""
+        self._subscribers.append(fn)
+
+    # -- polling ------------------------------------------------------------
+
+    def _signal_query(self) -> tuple[str, list, list]:
+        cols, params, layout = ["CHANGE_TRACKING_CURRENT_VERSION()"], [], []
+        for t in self._tables:
+            q = _quoted(t)
+            watched = self.columns.get(t)
+            if t in self._tracked and self._ct_version is not None:
+                where = ""
+                if watched:
+                    # SYS_CHANGE_COLUMNS is NULL for inserts / deletes and without TRACK_COLUMNS_UPDATED
+                    in_mask = " OR ".join(
+                        f"CHANGE_TRACKING_IS_COLUMN_IN_MASK(COLUMNPROPERTY(OBJECT_ID(N'{q}'), N'{c}', 'ColumnId'), "
+                        f"ct.SYS_CHANGE_COLUMNS) = 1" for c in watched)
+                    where = f" WHERE ct.SYS_CHANGE_OPERATION <> N'U' OR ct.SYS_CHANGE_COLUMNS IS NULL OR {in_mask}"
+                cols.append(f"(SELECT COUNT_BIG(*) FROM CHANGETABLE(CHANGES {q}, ?) AS ct{where})")
+                cols.append(f"CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID(N'{q}'))")
+                params.append(self._ct_version)
+                layout.append((t, "ct"))
+            else:
+                checksum = ", ".join(f"[{c}]" for c in watched) if watched else "*"
+                cols.append(f"(SELECT COUNT_BIG(*) FROM {q})")
+                cols.append(f"(SELECT CHECKSUM_AGG(BINARY_CHECKSUM({checksum})) FROM {q})")
+                layout.append((t, "checksum"))
+        return "SELECT " + ",\n       ".join(cols) + ";", params, layout
+
+    def poll(self) -> list[str]:
+        """One poll on the calling thread; returns (and publishes) the changed groups."""
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            if self._tracked is None:
+                self._tracked = {r[0] for r in cur.execute(TRACKED_TABLES_SQL).fetchall()}
+            sql, params, layout = self._signal_query()
+            row = cur.execute(sql, *params).fetchone()
+        finally:
+            conn.close()
+
+        first = self._signals is None
+        prev = self._signals or {}
+        signals, changed_tables = {}, set()
+        for i, (table, kind) in enumerate(layout):
+            a, b = row[1 + 2 * i], row[2 + 2 * i]
+            if kind == "ct":
+                # rows since the last version, or that version already cleaned up
+                if a or (b is not None and b > self._ct_version):
+                    changed_tables.add(table)
+                signals[table] = ("ct",)
+            else:
+                signals[table] = (a, b)
+                if prev.get(table) != signals[table]:
+                    changed_tables.add(table)
+        self._signals = signals
+        self._ct_version = row[0]
+        self.last_ok = time.monotonic()
+        self.last_error = ""
+        self.polls += 1
+
+        changed = sorted(self.groups) if first else sorted(
+            g for g, tables in self.groups.items() if changed_tables.intersection(tables))
+        for group in changed:
+            self.invalidations += 1
+            for fn in list(self._subscribers):
+                try:
+                    fn(group)
+                except Exception as e:
+                    print(f"[CACHE] {self.name} subscriber failed for {group}: {type(e).__name__}: {e}", flush=True)
+        if changed and not first:
+            print(f"[CACHE] {self.name} invalidated {', '.join(changed)}", flush=True)
+        return changed
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"[:300]
+                self._tracked = None  # rediscover after e.g. a failover
+            time.sleep(self.interval_s)
+
+    def start(self) -> None:
+        """Start the poller in this process (no-op if running or disabled)."""
+        if self._pid == os.getpid() or self.interval_s <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # A forked child inherits the parent's signals but not its thread:
+            # start from scratch so its first poll drops anything stale.
+            self._signals = self._ct_version = self._tracked = None
+            threading.Thread(target=self._run, name=f"changebus-{self.name}", daemon=True).start()
+
+    # -- consumers ----------------------------------------------------------
+
+    def live(self) -> bool:
+        return (self._pid == os.getpid() and self.last_ok > 0
+                and time.monotonic() - self.last_ok < 3 * self.interval_s + 5)
+
+    def max_age(self, ttl_s: float) -> float:
+        """How long a version-keyed cache entry may be served: ttl_s normally,
+        CHANGE_BUS_MAX_AGE_S while the bus is live."""
+        return max(ttl_s, CHANGE_BUS_MAX_AGE_S) if self.live() else ttl_s
+
+    def status(self) -> dict:
+        return {
+            "live": self.live(),
+            "interval_s": self.interval_s,
+            "polls": self.polls,
+            "invalidations": self.invalidations,
+            "last_ok_s_ago": round(time.monotonic() - self.last_ok, 1) if self.last_ok else None,
+            "last_error": self.last_error,
+            "change_tracking": sorted(self._tracked or ()),
+        }
@@ -0,0 +1,256 @@
+"""
+Chart data layer: figures sized to the screen, not to the month.
+
+A month of LOG.RunDetail is easily a few hundred thousand rows, while a chart
+is ~1000 px wide; sending every point costs JSON encoding, transfer and
+browser layout for detail nobody can see. Figures are built as plain dicts
+(dcc.Graph accepts them) with:
+
+- a point budget of CHART_POINTS_PER_PX points per pixel of plot width
+  (point_budget), clamped to [MIN_POINTS, MAX_POINTS];
+- series reduced to that budget server-side: lttb() (Largest Triangle Three
+  Buckets) keeps the visual shape of line series, minmax_indices() keeps the
+  extremes per pixel bucket (spikes survive), and time_bucket() picks the
+  finest "nice" interval (1 min ... 1 day) whose bucket count fits the
+  budget for aggregated series such as runs per interval;
+- scatter series capped at CHART_SCATTER_FACTOR x the point budget (markers
+  carry density, so a few per pixel): per-bucket extremes plus an even
+  sample; above SCATTERGL_THRESHOLD points drawn as WebGL ("scattergl")
+  instead of SVG;
+- numeric arrays sent as typed arrays ({"dtype": "f8", "bdata": <base64>},
+  plotly.js >= 2.28, bundled with dash >= 2.15) rather than JSON number
+  lists. Datetimes are sent as epoch milliseconds on a date axis.
+  CHART_TYPED_ARRAYS=0 falls back to plain lists.
+
+Everything below is vectorised with numpy; the only Python loop is LTTB's
+one-iteration-per-output-point selection.
+"""
+from __future__ import annotations
+
+import base64
+
+import numpy as np
+import pandas as pd
+
+from env import env_flag, env_float, env_int
+
+POINTS_PER_PX = env_float("CHART_POINTS_PER_PX", 2.0)
+DEFAULT_WIDTH_PX = 1200
+MIN_POINTS = 100
+MAX_POINTS = 20_000
+SCATTER_FACTOR = env_float("CHART_SCATTER_FACTOR", 4.0)
+SCATTERGL_THRESHOLD = env_int("CHART_SCATTERGL_THRESHOLD", 2000)
+TYPED_ARRAYS = env_flag("CHART_TYPED_ARRAYS", True)
+
+# Candidate bucket widths for time_bucket(), finest first.
+BUCKET_STEPS = ["1min", "5min", "15min", "30min", "1h", "3h", "6h", "12h", "1D"]
+
+def point_budget(width_px: int | None = None) -> int:
+    """Points worth sending for a plot width_px pixels wide."""
+    width = width_px if width_px and width_px > 0 else DEFAULT_WIDTH_PX
+    return int(min(MAX_POINTS, max(MIN_POINTS, round(width * POINTS_PER_PX))))
+
+# ---------------------------------------------------------------------------
+# Downsampling (all return sorted indices into the input)
+# ---------------------------------------------------------------------------
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest Triangle Three Buckets over a series sorted by x.
+
+    Keeps the first and last point; from each of the n_out - 2 buckets in
+    between keeps the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket. NaN y values are dropped
+    first (they cannot form a triangle).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    idx = np.flatnonzero(~np.isnan(y))
+    n = len(idx)
+    if n_out >= n or n_out < 3:
+        return idx
+    xs, ys = x[idx], y[idx]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    # Mean of each bucket (the "next bucket" for the one before it).
+    csx = np.concatenate(([0.0], np.cumsum(xs)))
+    csy = np.concatenate(([0.0], np.cumsum(ys)))
+    sizes = np.maximum(ends - starts, 1)
+    mean_x = (csx[ends] - csx[starts]) / sizes
+    mean_y = (csy[ends] - csy[starts]) / sizes
+    mean_x = np.append(mean_x[1:], xs[-1])
+    mean_y = np.append(mean_y[1:], ys[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        if e <= s:
+            e = s + 1
+        bx, by = xs[s:e], ys[s:e]
+        area = np.abs((xs[a] - mean_x[i]) * (by - ys[a]) - (xs[a] - bx) * (mean_y[i] - ys[a]))
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return idx[np.unique(out)]
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Min and max y of each of n_buckets equal-width x buckets (x sorted).
+
+    Up to 2 * n_buckets points; every local extreme wider than a bucket
+    survives, which LTTB does not guarantee.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    idx = np.flatnonzero(~np.isnan(y) & ~np.isnan(x))
+    if len(idx) <= 2 * n_buckets or n_buckets < 1:
+        return idx
+    xs, ys = x[idx], y[idx]
+    span = xs[-1] - xs[0]
+    if span <= 0:
+        return idx[[int(np.argmin(ys)), int(np.argmax(ys))]]
+    bucket = np.minimum(((xs - xs[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    # Sorted by (bucket, y): each bucket's first / last entries are its min / max.
+    order = np.lexsort((ys, bucket))
+    ends = np.r_[starts[1:], len(xs)]
+    keep = np.concatenate((order[starts], order[ends - 1]))
+    return idx[np.unique(keep)]
+
+def downsample(x, y, budget: int, method: str = "lttb") -> np.ndarray:
+    """Indices of at most ~budget points of (x, y); x must be sorted."""
+    if method == "lttb":
+        return lttb(x, y, budget)
+    if method == "minmax":
+        return minmax_indices(x, y, max(1, budget // 2))
+    raise ValueError(f"Unknown downsampling method: {method!r}")
+
+def time_bucket(times: pd.Series, budget: int) -> str:
+    """Finest BUCKET_STEPS interval giving at most budget buckets over times."""
+    t = pd.to_datetime(times, errors="coerce").dropna()
+    if t.empty:
+        return BUCKET_STEPS[0]
+    span = t.max() - t.min()
+    for step in BUCKET_STEPS:
+        if span / pd.Timedelta(step) < budget:
+            return step
+    return BUCKET_STEPS[-1]
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+# numpy dtype -> plotly.js typed-array dtype code (no 64-bit integers there)
+_TYPED_CODES = {
+    np.dtype("float64"): "f8", np.dtype("float32"): "f4",
+    np.dtype("int32"): "i4", np.dtype("uint32"): "u4",
+    np.dtype("int16"): "i2", np.dtype("uint16"): "u2",
+    np.dtype("int8"): "i1", np.dtype("uint8"): "u1",
+}
+
+def _as_numeric(values) -> np.ndarray | None:
+    """Numeric ndarray for values, datetimes as epoch ms; None if not numeric."""
+    if isinstance(values, (pd.Series, pd.Index)):
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            values = pd.DatetimeIndex(values)
+            if values.tz is not None:
+                values = values.tz_convert(None)
+            ms = values.as_unit("ms").asi8.astype(np.float64)
+            ms[values.isna()] = np.nan
+            return ms
+        if not pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+            return None
+        return values.to_numpy(dtype=float, na_value=np.nan) if values.hasnans else values.to_numpy()
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        ms = arr.astype("datetime64[ms]").astype(np.int64).astype(np.float64)
+        ms[np.isnat(arr)] = np.nan
+        return ms
+    if arr.dtype.kind in "iuf":
+        return arr
+    return None
+
+def typed_array(values):
+    """values as a plotly.js typed-array spec, or a plain list when the values
+    are not numeric (or CHART_TYPED_ARRAYS is off)."""
+    arr = _as_numeric(values)
+    if arr is None:
+        return list(values)
+    if arr.dtype.kind in "iu" and arr.dtype not in _TYPED_CODES:
+        info = np.iinfo(np.int32)
+        fits = arr.size == 0 or (arr.min() >= info.min and arr.max() <= info.max)
+        arr = arr.astype(np.int32 if fits else np.float64)
+    elif arr.dtype not in _TYPED_CODES:
+        arr = arr.astype(np.float64)
+    if not TYPED_ARRAYS:
+        return arr.tolist()
+    arr = np.ascontiguousarray(arr)
+    return {"dtype": _TYPED_CODES[arr.dtype], "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+
+# ---------------------------------------------------------------------------
+# Traces and figures
+# ---------------------------------------------------------------------------
+
+def line_trace(x, y, name: str = "", width_px: int | None = None, method: str = "lttb", **props) -> dict:
+    """Line trace of (x, y) reduced to the point budget for width_px. x is
+    numeric or datetime."""
+    x = _as_numeric(x if isinstance(x, np.ndarray) else pd.Series(x))
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    keep = downsample(x, y, point_budget(width_px), method)
+    return {"type": "scattergl" if len(keep) > SCATTERGL_THRESHOLD else "scatter",
+            "mode": "lines", "name": name, "x": typed_array(x[keep]), "y": typed_array(y[keep]), **props}
+
+def scatter_trace(x, y, name: str = "", width_px: int | None = None, max_points: int | None = None,
+                  **props) -> dict:
+    """Marker trace of at most max_points (default SCATTER_FACTOR x the point
+    budget for width_px); WebGL above SCATTERGL_THRESHOLD points. When reduced,
+    half the points are min/max per x bucket (outliers survive) and half an
+    even sample in x order (dense stretches stay dense)."""
+    if max_points is None:
+        max_points = int(SCATTER_FACTOR * point_budget(width_px))
+    xs = _as_numeric(x if isinstance(x, np.ndarray) else pd.Series(x))
+    ys = np.asarray(y, dtype=float)
+    if len(xs) > max_points:
+        order = np.argsort(xs, kind="stable")
+        extremes = minmax_indices(xs[order], ys[order], max(1, max_points // 4))
+        sample = np.linspace(0, len(xs) - 1, max(0, max_points - len(extremes))).astype(np.int64)
+        keep = order[np.union1d(extremes, sample)]
+        xs, ys = xs[keep], ys[keep]
+    return {"type": "scattergl" if len(xs) > SCATTERGL_THRESHOLD else "scatter",
+            "mode": "markers", "name": name, "x": typed_array(xs), "y": typed_array(ys), **props}
+
+def _figure(data: list[dict], title: str, **layout) -> dict:
+    return {"data": data, "layout": {
+        "title": {"text": title},
+        "margin": {"l": 50, "r": 20, "t": 50, "b": 40},
+        **layout,
+    }}
+
+def runs_over_time_figure(run: pd.DataFrame, width_px: int | None = None) -> dict:
+    """Stacked succeeded / failed / in-progress runs per adaptive time bucket."""
+    if run.empty:
+        return _figure([], "Runs over time")
+    step = time_bucket(run["StartTime"], point_budget(width_px))
+    bucket = run["StartTime"].dt.floor(step)
+    outcome = np.select([run["InProgress"].to_numpy(), run["IsSuccess"].to_numpy()],
+                        ["In progress", "Succeeded"], "Failed")
+    counts = pd.crosstab(bucket, outcome)
+    data = [{"type": "bar", "name": col, "x": typed_array(counts.index), "y": typed_array(counts[col].to_numpy())}
+            for col in ("Succeeded", "Failed", "In progress") if col in counts.columns]
+    return _figure(data, f"Runs per {step}", barmode="stack", bargap=0,
+                   xaxis={"type": "date"}, yaxis={"title": {"text": "Runs"}})
+
+def duration_figure(run: pd.DataFrame, width_px: int | None = None) -> dict:
+    """Run durations against start time: per-run markers (WebGL when large)
+    plus the min / max envelope per pixel bucket as a line."""
+    done = run.loc[run["DurationSeconds"].notna(), ["StartTime", "DurationSeconds"]] if not run.empty else run
+    if done.empty:
+        return _figure([], "Run duration")
+    x, y = done["StartTime"], done["DurationSeconds"].to_numpy(dtype=float)
+    data = [
+        scatter_trace(x, y, "Runs", width_px, marker={"size": 3, "opacity": 0.4}),
+        line_trace(x, y, "Range", width_px, method="minmax", line={"width": 1}),
+    ]
+    return _figure(data, "Run duration", xaxis={"type": "date"},
+                   yaxis={"title": {"text": "Seconds"}, "type": "log"})
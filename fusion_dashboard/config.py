@@ -68,6 +68,8 @@ def load_settings() -> dict:
       DB_SERVER, DB_NAME, DB_USER, DB_PASSWORD
       REPORT_MONTH (optional)
       ODBC_DRIVER (optional)
+      DB_READ_ROUTING, DB_READ_SERVER, DB_READ_DATABASE_SUFFIX,
+      DB_READ_MAX_LAG_S (optional, env only; see data_loader._conn)
     """
     settings = {
         "DB_SERVER": os.getenv("DB_SERVER", "").strip(),
@@ -76,6 +78,10 @@ def load_settings() -> dict:
         "DB_PASSWORD": os.getenv("DB_PASSWORD", "").strip(),
         "REPORT_MONTH": os.getenv("REPORT_MONTH", "").strip(),   # optional now (we'll pick latest month)
         "ODBC_DRIVER": os.getenv("ODBC_DRIVER", "").strip(),     # optional
+        "DB_READ_ROUTING": os.getenv("DB_READ_ROUTING", "").strip(),
+        "DB_READ_SERVER": os.getenv("DB_READ_SERVER", "").strip(),
+        "DB_READ_DATABASE_SUFFIX": os.getenv("DB_READ_DATABASE_SUFFIX", "").strip(),
+        "DB_READ_MAX_LAG_S": os.getenv("DB_READ_MAX_LAG_S", "").strip(),
     }
 
     # If required env vars set, done
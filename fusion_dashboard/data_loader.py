@@ -1,10 +1,24 @@
 import datetime as dt
-from functools import lru_cache
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 
 import pandas as pd
 import numpy as np
 
+import coldtier
+import dbio
+from changebus import ChangeBus
 from config import load_settings
+from env import env_flag, env_int
+from fingerprint import fingerprint_errors
+from metrics import instrument_connection
+from singleflight import SINGLEFLIGHT_LOCK_DIR, SingleFlight, coalesced, coalesced_cache
+from statements import STATEMENTS
+from trigram import TrigramIndex
+from sketches import DEFAULT_QUANTILES, DIMENSIONS, build_month_sketches, merge_sketches, sketch_quantiles
 
 RUNDETAIL_SQL = r"""
 SELECT
@@ -64,6 +78,13 @@ WHERE StartTime IS NOT NULL
 ORDER BY MonthKey DESC
 """
 
+# StatusNorm values counted as success
+SUCCESS_STATUSES = ("SUCCESS", "SUCCEEDED", "OK", "COMPLETED", "SUCCESSFUL")
+
+RUNDETAIL = STATEMENTS.define("dashboard.rundetail", RUNDETAIL_SQL, ("start", "end"))
+EXPECTED = STATEMENTS.define("dashboard.cfg_active", EXPECTED_SQL)
+MONTHS = STATEMENTS.define("dashboard.months", MONTHS_SQL)
+
 def month_to_range(month_str: str):
     """month_str 'YYYY-MM' -> [start, end)"""
     y, m = month_str.split("-")
@@ -95,44 +116,120 @@ def _pick_driver(preferred: str = "") -> str:
     # Return something helpful
     return drivers[-1] if drivers else "ODBC Driver 18 for SQL Server"
 
-def _conn():
-    s = load_settings()
-    missing = [k for k in ["DB_SERVER","DB_NAME","DB_USER","DB_PASSWORD"] if not s.get(k)]
-    if missing:
-        raise RuntimeError(f"Missing DB settings: {', '.join(missing)}. Set env vars (Render) or render.ini (local).")
+# Read replica routing (same settings as the portal's app/replicas.py): every
+# dashboard query is a read-only analytics pull, so with DB_READ_ROUTING on
+# they go to DB_READ_SERVER (or the primary with ApplicationIntent=ReadOnly),
+# falling back to the primary while the replica is unreachable
+# (REPLICA_RETRY_S) or more than DB_READ_MAX_LAG_S behind (checked every
+# LAG_CHECK_S). The change bus polls the primary.
+REPLICA_RETRY_S = 30.0
+LAG_CHECK_S = 15.0
+REPLICA_LAG_SQL = """
+SELECT MAX(ISNULL(secondary_lag_seconds, DATEDIFF(SECOND, last_redone_time, last_received_time)))
+FROM sys.dm_database_replica_states
+WHERE is_local = 1 AND database_id = DB_ID();
+"""
+
+_replica = {"down_until": 0.0, "checked_at": 0.0, "lag_s": None, "stale": False}
 
+def _conn_str(s: dict, readonly: bool) -> str:
     driver = _pick_driver(s.get("ODBC_DRIVER","").strip())
-    conn_str = (
+    server, database, intent = s["DB_SERVER"], s["DB_NAME"], ""
+    if readonly:
+        server = s.get("DB_READ_SERVER") or server
+        database += s.get("DB_READ_DATABASE_SUFFIX", "")
+        intent = "" if s.get("DB_READ_SERVER") else "ApplicationIntent=ReadOnly;"
+    return (
         f"DRIVER={{{driver}}};"
-        f"SERVER={s['DB_SERVER']};"
-        f"DATABASE={s['DB_NAME']};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
         f"UID={s['DB_USER']};"
         f"PWD={s['DB_PASSWORD']};"
         "Encrypt=yes;"
         "TrustServerCertificate=no;"
         "Connection Timeout=30;"
+        f"{intent}"
     )
 
+def _replica_conn(s: dict, query: str, pyodbc):
+    """Instrumented replica connection, or None to use the primary."""
+    now = time.monotonic()
+    lag_due = now - _replica["checked_at"] >= LAG_CHECK_S
+    max_lag = float(s.get("DB_READ_MAX_LAG_S") or 30)
+    if now < _replica["down_until"] or (_replica["stale"] and not lag_due):
+        return None
+    cs = _conn_str(s, readonly=True)
+    try:
+        conn = instrument_connection(lambda: dbio.connect(pyodbc.connect, cs), query, s["DB_NAME"] + "@read")
+    except Exception as e:
+        _replica["down_until"] = now + REPLICA_RETRY_S
+        print(f"[DB] read replica unavailable, using primary for {REPLICA_RETRY_S:.0f}s: {type(e).__name__}: {e}", flush=True)
+        return None
+    if max_lag > 0 and lag_due:
+        _replica["checked_at"] = now
+        try:
+            row = conn.cursor().execute(REPLICA_LAG_SQL).fetchone()
+            _replica["lag_s"] = float(row[0]) if row and row[0] is not None else 0.0
+        except Exception:
+            _replica["lag_s"] = None  # lag DMV not visible: treat as current
+        _replica["stale"] = _replica["lag_s"] is not None and _replica["lag_s"] > max_lag
+        if _replica["stale"]:
+            conn.close()
+            return None
+    return conn
+
+def _conn(query: str = "unnamed", readonly: bool = True):
+    s = load_settings()
+    missing = [k for k in ["DB_SERVER","DB_NAME","DB_USER","DB_PASSWORD"] if not s.get(k)]
+    if missing:
+        raise RuntimeError(f"Missing DB settings: {', '.join(missing)}. Set env vars (Render) or render.ini (local).")
+
     try:
         import pyodbc
     except Exception as e:
         raise RuntimeError("pyodbc not installed. pip install pyodbc") from e
 
-    return pyodbc.connect(conn_str)
+    if readonly and s.get("DB_READ_ROUTING", "").lower() in ("1", "true", "yes", "on"):
+        conn = _replica_conn(s, query, pyodbc)
+        if conn is not None:
+            return conn
 
+    conn_str = _conn_str(s, readonly=False)
+    # dbio: bounded DB concurrency, off the event loop under gevent workers
+    return instrument_connection(lambda: dbio.connect(pyodbc.connect, conn_str), query, s["DB_NAME"])
+
+# load_cfg_active and the completeness of every cached month are derived from
+# CFG.Interface_Movements; refresh_config() updates them in place.
+CHANGE_GROUPS = {"cfg.interface_movements": ("CFG.Interface_Movements",)}
+
+def _on_config_change(group: str) -> None:
+    refresh_config()
+
+change_bus = ChangeBus("dashboard", lambda: _conn("changebus.poll", readonly=False), CHANGE_GROUPS)
+change_bus.subscribe(_on_config_change)
+
+def start_change_bus() -> None:
+    """Start polling CFG for changes in this process. Called by load_month and
+    load_cfg_active, so every worker starts it on first use (once per process)."""
+    change_bus.start()
+
+@coalesced("dashboard.months")
 def list_available_months() -> list[str]:
-    conn = _conn()
+    conn = _conn(MONTHS.name)
     try:
-        months = pd.read_sql(MONTHS_SQL, conn)["MonthKey"].dropna().astype(str).tolist()
+        months = pd.read_sql(MONTHS.sql, conn)["MonthKey"].dropna().astype(str).tolist()
     finally:
         conn.close()
     return months
 
-@lru_cache(maxsize=1)
+@coalesced_cache(maxsize=1, name="dashboard.cfg_active")
 def load_cfg_active() -> pd.DataFrame:
-    conn = _conn()
+    start_change_bus()
+    # From the primary, like the change bus polls: a lagging replica would hand
+    # refresh_config() the old rows and the change would be lost for good.
+    conn = _conn(EXPECTED.name, readonly=False)
     try:
-        cfg = pd.read_sql(EXPECTED_SQL, conn)
+        cfg = pd.read_sql(EXPECTED.sql, conn)
     finally:
         conn.close()
 
@@ -164,7 +261,7 @@ def _derive_fields(df: pd.DataFrame) -> pd.DataFrame:
     df["InterfaceName"] = df["InterfaceName"].fillna(df["InterfaceCode"]).astype(str)
 
     df["StatusNorm"] = df["Status"].astype(str).str.strip().str.upper()
-    df["IsSuccess"] = df["StatusNorm"].isin(["SUCCESS", "SUCCEEDED", "OK", "COMPLETED", "SUCCESSFUL", "SUCCESS "])
+    df["IsSuccess"] = df["StatusNorm"].isin(SUCCESS_STATUSES)
 
     df["FileSizeBytes"] = pd.to_numeric(df["FileSizeBytes"], errors="coerce").fillna(0).astype(float)
 
@@ -179,6 +276,7 @@ def _derive_fields(df: pd.DataFrame) -> pd.DataFrame:
 
     df["ErrorMessageClean"] = df["ErrorMessage"].fillna("").astype(str).str.strip()
     df.loc[df["ErrorMessageClean"] == "", "ErrorMessageClean"] = "(none)"
+    df["ErrorTemplateId"], df["ErrorTemplate"] = fingerprint_errors(df["ErrorMessageClean"])
 
     df["InProgress"] = df["EndTime"].isna()
 
@@ -194,27 +292,23 @@ def build_expected_map(cfg_active: pd.DataFrame) -> pd.DataFrame:
     out["ExpectedMovementCount"] = out["ExpectedMovementList"].apply(len)
     return out
 
-def compute_route_completeness(run_df: pd.DataFrame, expected_map_df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Route = (Principal_Code, InterfaceCode) configured in CFG.
-    A "Route Run" = (RunID, Principal_Code, InterfaceCode) observed in LOG.
-    """
-    if run_df.empty:
-        return pd.DataFrame(columns=[
-            "RunID","Principal_Code","InterfaceCode",
-            "ActualMovementCount","ExpectedMovementCount",
-            "CompletenessRatio","RouteStatus"
-        ])
+ROUTE_KEYS = ["Principal_Code", "InterfaceCode"]
 
-    actual = (
-        run_df.groupby(["RunID","Principal_Code","InterfaceCode"], dropna=False)["MovementCode"]
+def route_run_actuals(run_df: pd.DataFrame) -> pd.DataFrame:
+    """Distinct MovementCodes observed per route run; config-independent."""
+    if run_df.empty:
+        return pd.DataFrame(columns=["RunID", *ROUTE_KEYS, "ActualMovementCount"])
+    return (
+        run_df.groupby(["RunID", *ROUTE_KEYS], dropna=False)["MovementCode"]
         .nunique()
         .reset_index(name="ActualMovementCount")
     )
 
+def apply_expected(actual: pd.DataFrame, expected_map_df: pd.DataFrame) -> pd.DataFrame:
+    """Route-run actuals + expected counts -> completeness rows."""
     merged = actual.merge(
-        expected_map_df[["Principal_Code","InterfaceCode","ExpectedMovementCount"]],
-        on=["Principal_Code","InterfaceCode"],
+        expected_map_df[ROUTE_KEYS + ["ExpectedMovementCount"]],
+        on=ROUTE_KEYS,
         how="left"
     )
     merged["CompletenessRatio"] = merged["ActualMovementCount"] / merged["ExpectedMovementCount"]
@@ -230,34 +324,288 @@ def compute_route_completeness(run_df: pd.DataFrame, expected_map_df: pd.DataFra
     )
     return merged
 
-@lru_cache(maxsize=24)
-def load_month(month: str) -> dict:
+def compute_route_completeness(run_df: pd.DataFrame, expected_map_df: pd.DataFrame) -> pd.DataFrame:
     """
-    Loads a month of RunDetail plus precomputed completeness.
-    Cached by month for snappy filtering.
+    Route = (Principal_Code, InterfaceCode) configured in CFG.
+    A "Route Run" = (RunID, Principal_Code, InterfaceCode) observed in LOG.
     """
+    if run_df.empty:
+        return pd.DataFrame(columns=[
+            "RunID","Principal_Code","InterfaceCode",
+            "ActualMovementCount","ExpectedMovementCount",
+            "CompletenessRatio","RouteStatus"
+        ])
+    return apply_expected(route_run_actuals(run_df), expected_map_df)
+
+def changed_routes(old_map: pd.DataFrame, new_map: pd.DataFrame) -> pd.DataFrame:
+    """Routes whose expected MovementCode set differs (incl. added / removed routes)."""
+    old = old_map.set_index(ROUTE_KEYS)["ExpectedMovementList"].map(tuple)
+    new = new_map.set_index(ROUTE_KEYS)["ExpectedMovementList"].map(tuple)
+    both = pd.concat([old.rename("old"), new.rename("new")], axis=1)
+    diff = both["old"].ne(both["new"])  # NaN (missing on one side) counts as changed
+    return both.index[diff].to_frame(index=False)
+
+# ---------------------------------------------------------------------------
+# Month cache
+#
+# A cached month keeps its RunDetail-derived data (run, sketches, route-run
+# actuals, names) apart from what depends on CFG (completeness). When CFG
+# changes, refresh_config() rebuilds the expected map once and re-derives
+# completeness only for the route runs of routes whose expected movements
+# changed, in every cached month, without refetching RunDetail. Run-level
+# CFG attributes from the RunDetail join (InterfaceName, InterfaceType, ...)
+# stay as fetched until the month is reloaded.
+# ---------------------------------------------------------------------------
+
+MONTH_CACHE_MAX = 24
+# Byte budgets of the two month tiers: live frames (most recently used first)
+# up to MONTH_HOT_MB, then frames frozen by coldtier.py up to MONTH_COLD_MB.
+# The month being served always stays live.
+MONTH_HOT_MB = env_int("MONTH_HOT_MB", 4096)
+MONTH_COLD_MB = env_int("MONTH_COLD_MB", 2048)
+# Build the substring-search index (trigram.py) while loading each month
+# rather than on its first search_month() call.
+SEARCH_INDEX = env_flag("SEARCH_INDEX")
+
+@dataclass(eq=False)
+class _MonthData:
+    month: str
+    run: pd.DataFrame | None        # None while frozen
+    sketches: dict
+    actual: pd.DataFrame            # route_run_actuals(run)
+    dim: pd.DataFrame | None        # names per route
+    cfg_version: int = 0            # config the completeness below was derived from
+    completeness: pd.DataFrame | None = None
+    search: TrigramIndex | None = None
+    nbytes: int = 0                 # live size of run (coldtier.frame_nbytes)
+    frozen: coldtier.Frozen | None = None
+    freezing: bool = False
+    hits: int = 0
+    thaws: int = 0
+    thaw_ms: float = 0.0            # last thaw
+    frozen_size: int = 0            # last freeze: compressed bytes, ms
+    freeze_ms: float = 0.0
+
+_months: OrderedDict[str, _MonthData] = OrderedDict()
+_months_lock = threading.RLock()
+_config: tuple[int, pd.DataFrame, pd.DataFrame] | None = None  # (version, cfg, expected_map)
+_config_lock = threading.Lock()
+# Concurrent first requests for the same month share one RunDetail pull and
+# one _derive_fields pass (see singleflight.py). With SINGLEFLIGHT_LOCK_DIR,
+# workers take turns on a month's lock file and the one that pulls it leaves
+# the derived frame there for the others (_shared_month).
+_month_flight = SingleFlight("dashboard.month", lock_dir=SINGLEFLIGHT_LOCK_DIR)
+_thaw_flight = SingleFlight("dashboard.month_thaw")
+
+def _current_config() -> tuple[int, pd.DataFrame, pd.DataFrame]:
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                cfg = load_cfg_active()
+                _config = (1, cfg, build_expected_map(cfg))
+    return _config
+
+def _with_names(completeness: pd.DataFrame, dim: pd.DataFrame | None) -> pd.DataFrame:
+    if dim is None or completeness.empty:
+        return completeness
+    return completeness.merge(dim, on=ROUTE_KEYS, how="left")
+
+def _full_completeness(md: _MonthData, exp_map: pd.DataFrame) -> pd.DataFrame:
+    if md.run is not None and md.run.empty:  # empty months are never frozen
+        return compute_route_completeness(md.run, exp_map)
+    return _with_names(apply_expected(md.actual, exp_map), md.dim)
+
+def _delta_completeness(md: _MonthData, routes: pd.DataFrame, exp_map: pd.DataFrame) -> pd.DataFrame:
+    """md.completeness with only the route runs of `routes` re-derived."""
+    comp = md.completeness
+    if comp.empty or routes.empty:
+        return comp
+    hit = pd.MultiIndex.from_frame(comp[ROUTE_KEYS]).isin(pd.MultiIndex.from_frame(routes))
+    if not hit.any():
+        return comp
+    redone = _with_names(apply_expected(md.actual.loc[
+        pd.MultiIndex.from_frame(md.actual[ROUTE_KEYS]).isin(pd.MultiIndex.from_frame(routes))
+    ], exp_map), md.dim)
+    out = pd.concat([comp.loc[~hit], redone[comp.columns]], ignore_index=True)
+    return out.sort_values(["RunID", *ROUTE_KEYS], kind="stable", ignore_index=True)
+
+def _fetch_month(month: str) -> _MonthData:
     start, end = month_to_range(month)
 
-    conn = _conn()
+    conn = _conn(RUNDETAIL.name)
     try:
-        run = pd.read_sql(RUNDETAIL_SQL, conn, params=[start, end])
+        run = pd.read_sql(RUNDETAIL.sql, conn, params=RUNDETAIL.bind(start, end))
     finally:
         conn.close()
 
     run = _derive_fields(run)
+    if SINGLEFLIGHT_LOCK_DIR and coldtier.available():
+        _share_month(month, run)
+    return _build_month(month, run)
 
-    cfg = load_cfg_active()
-    exp_map = build_expected_map(cfg)
-    completeness = compute_route_completeness(run, exp_map)
+def _shared_month_path(month: str) -> str:
+    return os.path.join(SINGLEFLIGHT_LOCK_DIR, f"dashboard.month.{month_to_range(month)[0]:%Y-%m}.arrow")
 
-    # Add friendly names to completeness rows
-    if not run.empty and not completeness.empty:
-        dim = (
-            run.groupby(["Principal_Code","InterfaceCode"], dropna=False)
-            .agg(PrincipalName=("PrincipalName","first"), InterfaceName=("InterfaceName","first"))
-            .reset_index()
-        )
-        completeness = completeness.merge(dim, on=["Principal_Code","InterfaceCode"], how="left")
+def _share_month(month: str, run: pd.DataFrame) -> None:
+    try:
+        coldtier.save(coldtier.freeze(run), _shared_month_path(month))
+    except Exception as e:  # e.g. a full disk: the others pull it themselves
+        print(f"[CACHE] month {month} not shared: {type(e).__name__}: {e}", flush=True)
+
+def _shared_month(month: str, since: float) -> _MonthData | None:
+    """The month as another worker pulled it while this one waited for the
+    lock file (saved after `since`), or None to pull it here."""
+    if not coldtier.available():
+        return None
+    path = _shared_month_path(month)
+    try:
+        if os.path.getmtime(path) < since:
+            return None
+        run, ms = coldtier.load(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[CACHE] month {month} shared copy unreadable, pulling it: {type(e).__name__}: {e}", flush=True)
+        return None
+    print(f"[CACHE] month {month} read from another worker's pull in {ms:,.0f} ms", flush=True)
+    md = _build_month(month, run)
+    with _months_lock:
+        return _months.setdefault(month, md)
+
+def _build_month(month: str, run: pd.DataFrame) -> _MonthData:
+    # Friendly names for completeness rows
+    dim = (
+        run.groupby(ROUTE_KEYS, dropna=False)
+        .agg(PrincipalName=("PrincipalName","first"), InterfaceName=("InterfaceName","first"))
+        .reset_index()
+    ) if not run.empty else None
+    md = _MonthData(month, run, build_month_sketches(run), route_run_actuals(run), dim,
+                    nbytes=coldtier.frame_nbytes(run))
+    if SEARCH_INDEX:
+        md.search = TrigramIndex(run)
+    return md
+
+def _cache_month(month: str) -> _MonthData:
+    """The cached month, fetched and cached first if missing (run single-flight)."""
+    with _months_lock:
+        md = _months.get(month)
+    if md is None:
+        md = _fetch_month(month)
+        with _months_lock:
+            md = _months.setdefault(month, md)
+    return md
+
+def _mb(n: float) -> str:
+    return f"{n / 2**20:,.1f} MB"
+
+def _thaw(md: _MonthData) -> pd.DataFrame:
+    with _months_lock:
+        if md.run is not None:
+            return md.run
+        frozen = md.frozen
+    run, ms = dbio.run_blocking(coldtier.thaw, frozen)
+    with _months_lock:
+        if md.run is None:
+            md.run, md.frozen = run, None
+            md.thaws += 1
+            md.thaw_ms = ms
+    print(f"[CACHE] month {md.month} thawed: {_mb(frozen.size)} -> {_mb(frozen.nbytes)} in {ms:,.0f} ms", flush=True)
+    return md.run
+
+def _live_run(md: _MonthData) -> pd.DataFrame:
+    """md.run, thawed first if the month is frozen (one thaw at a time per month)."""
+    run = md.run
+    if run is not None:
+        return run
+    return _thaw_flight.do(md.month, lambda: _thaw(md))
+
+def _freeze_candidate(keep: str) -> _MonthData | None:
+    """Least recently used live month while live months exceed MONTH_HOT_MB."""
+    live = [md for md in _months.values() if md.run is not None and not md.freezing]
+    if sum(md.nbytes for md in live) <= MONTH_HOT_MB * 2**20:
+        return None
+    for md in live:  # _months is in LRU order
+        if md.month != keep and not md.run.empty:
+            return md
+    return None
+
+def _drop_cold() -> None:
+    frozen = [md for md in _months.values() if md.frozen is not None]
+    total = sum(md.frozen.size for md in frozen)
+    for md in frozen:
+        if total <= MONTH_COLD_MB * 2**20:
+            break
+        total -= md.frozen.size
+        del _months[md.month]
+        print(f"[CACHE] month {md.month} dropped from the cold tier ({_mb(md.frozen.size)})", flush=True)
+
+def _enforce_budgets(keep: str) -> None:
+    """Freeze least recently used live months beyond MONTH_HOT_MB (or drop
+    them without pyarrow), then drop frozen ones beyond MONTH_COLD_MB."""
+    while True:
+        with _months_lock:
+            while len(_months) > MONTH_CACHE_MAX:
+                _months.popitem(last=False)
+            md = _freeze_candidate(keep)
+            if md is None:
+                _drop_cold()
+                return
+            if not coldtier.available():
+                del _months[md.month]
+                continue
+            md.freezing = True
+            run, hits = md.run, md.hits
+        try:
+            frozen = dbio.run_blocking(coldtier.freeze, run, md.nbytes)
+        except Exception as e:  # e.g. a column Arrow cannot type
+            frozen = None
+            print(f"[CACHE] month {md.month} not frozen, dropping it: {type(e).__name__}: {e}", flush=True)
+        finally:
+            with _months_lock:
+                md.freezing = False
+        with _months_lock:
+            if md.run is not run or md.hits != hits or _months.get(md.month) is not md:
+                continue  # used or replaced meanwhile: leave it live
+            if frozen is None:
+                del _months[md.month]
+                continue
+            md.run, md.frozen, md.search = None, frozen, None
+            md.frozen_size, md.freeze_ms = frozen.size, frozen.freeze_ms
+        print(f"[CACHE] month {md.month} frozen: {_mb(frozen.nbytes)} -> {_mb(frozen.size)} "
+              f"({frozen.ratio:.1f}x) in {frozen.freeze_ms:,.0f} ms", flush=True)
+
+def load_month(month: str) -> dict:
+    """
+    Loads a month of RunDetail plus precomputed completeness.
+    Cached by month for snappy filtering: recently used months live, older
+    ones compressed (MONTH_HOT_MB / MONTH_COLD_MB, coldtier.py), at most
+    MONTH_CACHE_MAX. Config changes update completeness in place (see
+    refresh_config). Concurrent callers for an uncached month wait for a
+    single fetch.
+    """
+    # per process: a forked worker may inherit a cached config and never miss it
+    start_change_bus()
+    with _months_lock:
+        md = _months.get(month)
+        if md is not None:
+            _months.move_to_end(month)
+            md.hits += 1
+    if md is None:
+        since = time.time()
+        md = _month_flight.do(month, lambda: _cache_month(month), recheck=lambda: _shared_month(month, since))
+    run = _live_run(md)
+    loaded = _current_config()
+    with _months_lock:
+        # refresh_config() swaps _config under this lock
+        version, cfg, exp_map = _config or loaded
+        md = _months.setdefault(month, md)
+        _months.move_to_end(month)
+        if md.cfg_version != version:
+            md.completeness = _full_completeness(md, exp_map)
+            md.cfg_version = version
+        completeness = md.completeness
+    _enforce_budgets(keep=month)
 
     return {
         "month": month,
@@ -265,4 +613,109 @@ def load_month(month: str) -> dict:
         "cfg": cfg,
         "expected_map": exp_map,
         "completeness": completeness,
-    }
\ No newline at end of file
+        "sketches": md.sketches,
+    }
+
+def search_month(month: str, text: str, columns=None) -> pd.DataFrame:
+    """
+    Rows of month whose FileName / SourcePath / DestinationPath /
+    ErrorMessageClean (or just `columns`) contain text, case-insensitively.
+    Uses the month's trigram index, building it on first use.
+    """
+    run = load_month(month)["run"]
+    with _months_lock:
+        md = _months[month]
+        index = md.search
+    if index is None:  # also after a freeze: a thawed frame has the same rows
+        index = TrigramIndex(run)
+        with _months_lock:
+            if md.search is None:
+                md.search = index
+    return run.iloc[index.search(text, columns)]
+
+def cached_run(month: str) -> pd.DataFrame | None:
+    """The cached run frame for month (thawed if frozen), or None - never queries."""
+    with _months_lock:
+        md = _months.get(month)
+        if md is None:
+            return None
+        _months.move_to_end(month)
+        md.hits += 1
+    run = _live_run(md)
+    _enforce_budgets(keep=month)
+    return run
+
+def month_cache_stats() -> dict:
+    """Tier sizes against their budgets and, per cached month (least recently
+    used first), its tier, live / compressed size and freeze / thaw times."""
+    with _months_lock:
+        mds = list(_months.values())
+    months = []
+    for md in mds:
+        frozen = md.frozen
+        months.append({
+            "month": md.month,
+            "tier": "cold" if frozen is not None else "hot",
+            "live_mb": round(md.nbytes / 2**20, 1),
+            "frozen_mb": round(md.frozen_size / 2**20, 1) if md.frozen_size else None,
+            "ratio": round(md.nbytes / md.frozen_size, 1) if md.frozen_size else None,
+            "freeze_ms": md.freeze_ms or None,
+            "thaws": md.thaws,
+            "thaw_ms": md.thaw_ms or None,
+        })
+    return {
+        "codec": coldtier.COLD_CODEC if coldtier.available() else None,
+        "hot_mb": round(sum(m["live_mb"] for m in months if m["tier"] == "hot"), 1),
+        "hot_budget_mb": MONTH_HOT_MB,
+        "cold_mb": round(sum(m["frozen_mb"] for m in months if m["tier"] == "cold"), 1),
+        "cold_budget_mb": MONTH_COLD_MB,
+        "months": months,
+    }
+
+def refresh_config() -> pd.DataFrame:
+    """Reload CFG and update every cached month's completeness for the routes
+    whose expected movements changed. Returns those routes."""
+    global _config
+    with _config_lock:
+        old = _config
+        load_cfg_active.cache_clear()
+        cfg = load_cfg_active()
+        exp_map = build_expected_map(cfg)
+        version = (old[0] if old else 0) + 1
+        routes = changed_routes(old[2], exp_map) if old else exp_map[ROUTE_KEYS]
+        with _months_lock:
+            for md in _months.values():
+                if old is not None and md.cfg_version == old[0]:
+                    md.completeness = _delta_completeness(md, routes, exp_map)
+                else:
+                    md.completeness = _full_completeness(md, exp_map)
+                md.cfg_version = version
+            _config = (version, cfg, exp_map)
+    if old is not None and not routes.empty:
+        print(f"[CACHE] CFG changed: {len(routes)} route(s) re-derived in {len(_months)} cached month(s)", flush=True)
+    return routes
+
+def clear_month_cache() -> None:
+    global _config
+    with _config_lock, _months_lock:
+        _months.clear()
+        _config = None
+        load_cfg_active.cache_clear()
+
+def sla_percentiles(
+    months: list[str],
+    metric: str = "DurationSeconds",
+    dimension: str = "route",
+    quantiles=DEFAULT_QUANTILES,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> pd.DataFrame:
+    """
+    p50/p95/p99-style percentiles of DurationSeconds or FileSizeBytes per
+    route / interface / principal over any set of months, optionally clipped
+    to [start_date, end_date]. Merges the per-day sketches kept by load_month;
+    never touches raw rows.
+    """
+    keys = DIMENSIONS[dimension]
+    tables = [load_month(m)["sketches"].get(metric) for m in months]
+    return sketch_quantiles(merge_sketches(tables, keys, start_date, end_date), keys, quantiles)
\ No newline at end of file
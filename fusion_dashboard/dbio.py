@@ -0,0 +1,228 @@
+# Generated from Fusion_Portal/app/dbio.py by Fusion_Portal/scripts/sync_shared.py.
+# Edit that file and re-run the script; do not edit this copy.
+"""
+Bounded execution of blocking database calls.
+
+pyodbc blocks the calling OS thread for the whole connect / execute / fetch.
+With threaded gunicorn workers that caps in-flight requests at
+workers x threads. Under a gevent worker (GUNICORN_WORKER_CLASS=gevent) one
+process multiplexes hundreds of requests on greenlets, but a pyodbc call
+would stall all of them - so connect() here returns a connection whose
+blocking calls run on a pool of DB_MAX_CONCURRENCY real threads, and the
+calling greenlet yields until the result is back.
+
+DB_IO_MODE:
+    auto     (default) offload when gevent has monkey-patched the process,
+             otherwise run calls inline
+    offload  always offload (needs gevent)
+    inline   never offload
+
+Either way at most DB_MAX_CONCURRENCY (default 16) calls per process are in
+the driver at once: offloaded calls queue for a pool thread, inline calls
+for a semaphore. status() reports the gate for /healthz: mode, limit, calls
+in flight (queued or in the driver), their peak, and how long calls queued.
+
+run_blocking(fn, ...) is the same offload for other long native calls that
+are not DB work (bcrypt), on gevent's own thread pool and without the limit.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+from env import env_int
+
+DB_IO_MODE = os.getenv("DB_IO_MODE", "auto").strip().lower()
+DB_MAX_CONCURRENCY = max(1, env_int("DB_MAX_CONCURRENCY", 16))
+
+def gevent_patched() -> bool:
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("socket")
+
+class DbGate:
+    def __init__(self, limit: int = DB_MAX_CONCURRENCY, mode: str = DB_IO_MODE):
+        self.limit = limit
+        self.mode = mode
+        self._pid = 0
+        self._pool = None
+        self._sem: threading.BoundedSemaphore | None = None
+        self._lock = threading.Lock()
+        self.in_flight = 0        # queued for or running in the driver
+        self.peak = 0
+        self.calls = 0
+        self.queued = 0           # calls that had to wait for a slot
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def _setup(self) -> None:
+        # Per process: pool threads and semaphore holders do not survive a fork.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            offload = self.mode == "offload" or (self.mode == "auto" and gevent_patched())
+            if offload:
+                from gevent.threadpool import ThreadPool
+                self._pool, self._sem = ThreadPool(self.limit), None
+            else:
+                if self.mode != "inline" and gevent_patched():
+                    print("[DB] DB_IO_MODE=inline under gevent: DB calls block the worker", flush=True)
+                self._pool, self._sem = None, threading.BoundedSemaphore(self.limit)
+            self.in_flight = self.peak = 0
+            self._pid = os.getpid()
+
+    @property
+    def offloading(self) -> bool:
+        self._setup()
+        return self._pool is not None
+
+    # Bookkeeping runs in the calling thread / greenlet only: pool threads
+    # must not take locks that gevent may have patched.
+    def _submitted(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.calls += 1
+
+    def _finished(self, waited: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if waited > 0.001:
+                self.queued += 1
+                self.wait_s += waited
+                self.max_wait_s = max(self.max_wait_s, waited)
+
+    def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) within the concurrency limit (on a pool thread when offloading)."""
+        self._setup()
+        queued_at = time.perf_counter()
+        self._submitted()
+        started = [queued_at]
+        try:
+            if self._pool is not None:
+                def call():
+                    started[0] = time.perf_counter()
+                    return fn(*args, **kwargs)
+                return self._pool.apply(call)
+            with self._sem:
+                started[0] = time.perf_counter()
+                return fn(*args, **kwargs)
+        finally:
+            self._finished(started[0] - queued_at)
+
+    def status(self) -> dict:
+        self._setup()
+        with self._lock:
+            return {
+                "mode": "offload" if self._pool is not None else "inline",
+                "limit": self.limit, "in_flight": self.in_flight, "peak": self.peak,
+                "calls": self.calls, "queued": self.queued,
+                "wait_ms_total": round(self.wait_s * 1000, 1),
+                "wait_ms_max": round(self.max_wait_s * 1000, 1),
+            }
+
+gate = DbGate()
+
+def run_blocking(fn, *args, **kwargs):
+    """fn(*args, **kwargs) on a real thread when the gate offloads, else inline."""
+    if not gate.offloading:
+        return fn(*args, **kwargs)
+    import gevent
+
+    return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+
+class GatedCursor:
+    """Cursor proxy running the calls that reach the server through the gate."""
+
+    def __init__(self, cursor, gate: DbGate):
+        object.__setattr__(self, "_cur", cursor)
+        object.__setattr__(self, "_gate", gate)
+
+    def __getattr__(self, item):
+        return getattr(self._cur, item)
+
+    def __setattr__(self, key, value):
+        setattr(self._cur, key, value)
+
+    def execute(self, sql, *params):
+        self._gate.run(self._cur.execute, sql, *params)
+        return self
+
+    def executemany(self, sql, *params):
+        self._gate.run(self._cur.executemany, sql, *params)
+        return self
+
+    def fetchone(self):
+        return self._gate.run(self._cur.fetchone)
+
+    def fetchall(self):
+        return self._gate.run(self._cur.fetchall)
+
+    def fetchmany(self, *args):
+        return self._gate.run(self._cur.fetchmany, *args)
+
+    def nextset(self):
+        return self._gate.run(self._cur.nextset)
+
+    def __iter__(self):
+        # one gated call per batch, not per row
+        size = max(getattr(self._cur, "arraysize", 1) or 1, 500)
+        while True:
+            rows = self.fetchmany(size)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        self._cur.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class GatedConnection:
+    """Connection proxy: commit / rollback / close and pyodbc's commit-on-exit
+    go through the gate; cursors are GatedCursors."""
+
+    def __init__(self, conn, gate: DbGate):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_gate", gate)
+
+    def __getattr__(self, item):
+        return getattr(self._conn, item)
+
+    def __setattr__(self, key, value):
+        setattr(self._conn, key, value)  # e.g. timeout
+
+    def cursor(self):
+        return GatedCursor(self._conn.cursor(), self._gate)
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def commit(self):
+        return self._gate.run(self._conn.commit)
+
+    def rollback(self):
+        return self._gate.run(self._conn.rollback)
+
+    def close(self):
+        return self._gate.run(self._conn.close)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._gate.run(self._conn.__exit__, *exc)
+
+def connect(connect_fn, *args, **kwargs):
+    """connect_fn(*args, **kwargs) through the gate; the connection's later
+    blocking calls go through it too."""
+    return GatedConnection(gate.run(connect_fn, *args, **kwargs), gate)
@@ -0,0 +1,31 @@
+# Generated from Fusion_Portal/app/env.py by Fusion_Portal/scripts/sync_shared.py.
+# Edit that file and re-run the script; do not edit this copy.
+"""
+Typed reads of environment knobs.
+
+A malformed value falls back to the default instead of failing the import
+(a typo in one tuning knob should not keep a worker from booting). The
+portal's own knobs go through app.config.Settings; the modules it shares
+with the dashboard (scripts/sync_shared.py) and the dashboard read them here.
+"""
+from __future__ import annotations
+
+import os
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+def env_flag(name: str, default: bool = False) -> bool:
+    v = os.getenv(name)
+    if v is None or not v.strip():
+        return default
+    return v.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,270 @@
+"""
+Streaming export of filtered LOG.RunDetail rows as CSV or Parquet.
+
+register_export_route(server) serves GET /export/rundetail with the
+dashboard's filter state as query parameters:
+
+    month=2025-01                 required
+    principal=P1&principal=P2     or principal=P1,P2 (Principal_Code)
+    interface=I1,I2               InterfaceCode
+    date=2025-01-14               or start_date= / end_date= (inclusive)
+    failed=1                      finished runs whose status is not a success
+    format=csv|parquet            default csv (parquet needs pyarrow)
+
+export_url(...) builds the same URL for a download link in a callback.
+
+Rows are streamed in EXPORT_CHUNK_ROWS slices, so memory stays bounded by
+one chunk regardless of how many rows match:
+
+- month cached by data_loader.load_month: a boolean mask over the cached
+  frame, then one iloc take per chunk - the frame itself is never copied;
+- otherwise: the same filters as a parameterised statement, read with
+  cursor.fetchmany(). Uncached months are not loaded into the cache.
+
+EXPORT_TOKEN, if set, must be sent as "Authorization: Bearer <token>".
+"""
+from __future__ import annotations
+
+import datetime as dt
+import os
+import re
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+from flask import Response, abort, request
+
+import data_loader
+from env import env_int
+from statements import STATEMENTS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: CSV only
+    pa = pq = None
+
+EXPORT_CHUNK_ROWS = env_int("EXPORT_CHUNK_ROWS", 20_000)
+
+# RUNDETAIL_SQL's select list
+EXPORT_COLUMNS = [
+    "DetailID", "RunID", "MovementCode", "InterfaceCode", "Principal_Code",
+    "PrincipalName", "InterfaceName", "InterfaceType", "InterfaceProfile",
+    "ConfigDirection", "RunDirection", "FileName", "SourcePath", "DestinationPath",
+    "FileSizeBytes", "Status", "ErrorMessage", "StartTime", "EndTime",
+]
+
+_SUCCESS_SQL = ", ".join(f"'{s}'" for s in data_loader.SUCCESS_STATUSES)
+
+# Catch-all filters: "? IS NULL OR ..." skips a filter; RECOMPILE keeps each
+# export from reusing a plan built for a different filter combination.
+EXPORT_SQL = data_loader.RUNDETAIL_SQL.rstrip() + f"""
+  AND (? IS NULL OR rd.Principal_Code IN (SELECT value FROM STRING_SPLIT(?, ',')))
+  AND (? IS NULL OR rd.InterfaceCode IN (SELECT value FROM STRING_SPLIT(?, ',')))
+  AND (? IS NULL OR rd.StartTime >= ?)
+  AND (? IS NULL OR rd.StartTime < ?)
+  AND (? = 0 OR (rd.EndTime IS NOT NULL AND UPPER(LTRIM(RTRIM(ISNULL(rd.Status, '')))) NOT IN ({_SUCCESS_SQL})))
+OPTION (RECOMPILE)
+"""
+EXPORT = STATEMENTS.define("dashboard.rundetail_export", EXPORT_SQL, (
+    "start", "end", "principals", "principals", "interfaces", "interfaces",
+    "from_time", "from_time", "to_time", "to_time", "failed",
+))
+
+_MONTH_RX = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+@dataclass(frozen=True)
+class ExportFilter:
+    month: str
+    principals: tuple[str, ...] = ()
+    interfaces: tuple[str, ...] = ()
+    start_date: str | None = None   # YYYY-MM-DD, inclusive
+    end_date: str | None = None     # YYYY-MM-DD, inclusive
+    failed_only: bool = False
+
+    @classmethod
+    def from_args(cls, args) -> "ExportFilter":
+        """Parse request.args; raises ValueError on bad input."""
+        def many(name):
+            return tuple(v.strip() for raw in args.getlist(name) for v in raw.split(",") if v.strip())
+
+        def day(name):
+            v = (args.get(name) or "").strip()
+            return dt.date.fromisoformat(v).isoformat() if v else None
+
+        month = (args.get("month") or "").strip()
+        if not _MONTH_RX.match(month):
+            raise ValueError("month must be YYYY-MM")
+        start_date, end_date = day("start_date"), day("end_date")
+        if args.get("date"):
+            start_date = end_date = day("date")
+        return cls(month, many("principal"), many("interface"), start_date, end_date,
+                   (args.get("failed") or "").strip().lower() in ("1", "true", "yes", "on"))
+
+    def params(self) -> dict:
+        start, end = data_loader.month_to_range(self.month)
+        from_time = dt.datetime.fromisoformat(self.start_date) if self.start_date else None
+        to_time = dt.datetime.fromisoformat(self.end_date) + dt.timedelta(days=1) if self.end_date else None
+        return {
+            "start": start, "end": end,
+            "principals": ",".join(self.principals) or None,
+            "interfaces": ",".join(self.interfaces) or None,
+            "from_time": from_time, "to_time": to_time,
+            "failed": int(self.failed_only),
+        }
+
+    def mask(self, run: pd.DataFrame) -> np.ndarray:
+        """Matching rows of a load_month run frame."""
+        keep = np.ones(len(run), dtype=bool)
+        if self.principals:
+            keep &= run["Principal_Code"].isin(self.principals).to_numpy()
+        if self.interfaces:
+            keep &= run["InterfaceCode"].isin(self.interfaces).to_numpy()
+        if self.start_date:
+            keep &= (run["StartDate"] >= self.start_date).to_numpy()
+        if self.end_date:
+            keep &= (run["StartDate"] <= self.end_date).to_numpy()
+        if self.failed_only:
+            keep &= ~(run["IsSuccess"].to_numpy() | run["InProgress"].to_numpy())
+        return keep
+
+    def filename(self, fmt: str) -> str:
+        parts = ["rundetail", self.month]
+        if len(self.principals) == 1:
+            parts.append(self.principals[0])
+        if len(self.interfaces) == 1:
+            parts.append(self.interfaces[0])
+        if self.start_date and self.start_date == self.end_date:
+            parts.append(self.start_date)
+        if self.failed_only:
+            parts.append("failed")
+        return re.sub(r"[^\w.-]", "_", "_".join(parts)) + "." + fmt
+
+def export_url(month: str, principals=(), interfaces=(), start_date=None, end_date=None,
+               failed_only: bool = False, fmt: str = "csv", path: str = "/export/rundetail") -> str:
+    args = [("month", month), *[("principal", p) for p in principals], *[("interface", i) for i in interfaces]]
+    if start_date:
+        args.append(("start_date", start_date))
+    if end_date:
+        args.append(("end_date", end_date))
+    if failed_only:
+        args.append(("failed", "1"))
+    args.append(("format", fmt))
+    return f"{path}?{urlencode(args)}"
+
+# ---------------------------------------------------------------------------
+# Row sources (yield DataFrames of at most chunk_rows rows, EXPORT_COLUMNS)
+# ---------------------------------------------------------------------------
+
+def cached_chunks(run: pd.DataFrame, f: ExportFilter, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    positions = np.flatnonzero(f.mask(run))
+    # Column by column: run.iloc[rows, cols] would first materialise the
+    # selected columns for every row of the month.
+    columns = {c: run[c].array for c in EXPORT_COLUMNS}
+    for i in range(0, len(positions), chunk_rows):
+        rows = positions[i:i + chunk_rows]
+        yield pd.DataFrame({c: arr.take(rows) for c, arr in columns.items()})
+
+def query_chunks(f: ExportFilter, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    conn = data_loader._conn(EXPORT.name)
+    try:
+        cur = EXPORT.execute(conn.cursor(), **f.params())
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records([tuple(r) for r in rows], columns=EXPORT_COLUMNS)
+    finally:
+        conn.close()
+
+# ---------------------------------------------------------------------------
+# Encoders (DataFrame chunks -> bytes)
+# ---------------------------------------------------------------------------
+
+def csv_stream(chunks):
+    header = True
+    for frame in chunks:
+        yield frame.to_csv(index=False, header=header, date_format="%Y-%m-%d %H:%M:%S").encode("utf-8")
+        header = False
+    if header:  # no rows: header only
+        yield (",".join(EXPORT_COLUMNS) + "\n").encode("utf-8")
+
+def _parquet_schema():
+    text = {c: pa.string() for c in EXPORT_COLUMNS}
+    text.update({
+        "DetailID": pa.int64(), "RunID": pa.int64(), "FileSizeBytes": pa.float64(),
+        "StartTime": pa.timestamp("us"), "EndTime": pa.timestamp("us"),
+    })
+    return pa.schema([(c, text[c]) for c in EXPORT_COLUMNS])
+
+class _Drain:
+    """Write-only file object whose contents are handed out as they arrive."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+def parquet_stream(chunks):
+    """One row group per chunk, zstd-compressed."""
+    schema = _parquet_schema()
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for frame in chunks:
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False, safe=False))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+FORMATS = {
+    "csv": ("text/csv", csv_stream),
+    "parquet": ("application/vnd.apache.parquet", parquet_stream),
+}
+
+def register_export_route(server, path: str = "/export/rundetail"):
+    token = os.getenv("EXPORT_TOKEN", "").strip()
+
+    def export_rundetail():
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            abort(401)
+        fmt = (request.args.get("format") or "csv").lower()
+        if fmt not in FORMATS:
+            abort(400, f"format must be one of {sorted(FORMATS)}")
+        if fmt == "parquet" and pq is None:
+            abort(501, "Parquet export needs pyarrow")
+        try:
+            f = ExportFilter.from_args(request.args)
+        except ValueError as e:
+            abort(400, str(e))
+
+        run = data_loader.cached_run(f.month)
+        chunks = cached_chunks(run, f) if run is not None else query_chunks(f)
+        mimetype, encode = FORMATS[fmt]
+        return Response(encode(chunks), mimetype=mimetype, headers={
+            "Content-Disposition": f'attachment; filename="{f.filename(fmt)}"',
+            "X-Export-Source": "cache" if run is not None else "query",
+        })
+
+    server.add_url_rule(path, "fusion_export_rundetail", export_rundetail)
+    return server
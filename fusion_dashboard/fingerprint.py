@@ -0,0 +1,136 @@
+"""
+Error-message fingerprinting.
+
+Turns raw ErrorMessage values into templates by masking the parts that vary
+between otherwise identical failures (GUIDs, timestamps, paths, file names,
+numbers...). The regex passes run vectorised over the *unique* messages of a
+frame only and are mapped back to rows through category codes.
+
+Template IDs are memoised per process, so the same template keeps the same
+integer ID across every month loaded by this worker and top-error rollups are
+plain integer groupbys.
+"""
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Order matters: specific shapes first, bare numbers last.
+FINGERPRINT_RULES = [
+    (r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b", "<guid>"),
+    (r"\b\d{4}-\d{2}-\d{2}[T ]\d{1,2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?", "<ts>"),
+    (r"\b\d{4}[-/]\d{2}[-/]\d{2}\b|\b\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}\b", "<date>"),
+    (r"\b\d{1,2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?\s*(?:[AaPp][Mm])?\b", "<time>"),
+    (r"\b[a-zA-Z][a-zA-Z0-9+.-]*://[^\s'\"<>]+", "<url>"),
+    (r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+", "<email>"),
+    (r"(?:\b[A-Za-z]:|\\\\[^\\\s'\"]+)\\[^\s'\"<>|]*", "<path>"),
+    (r"(?<![\w.<])/(?:[^\s/'\"<>]+/)+[^\s'\"<>]*", "<path>"),
+    (r"\b[\w\-.]+\.(?i:csv|txt|xml|json|xlsx?|zip|gz|dat|edi|pdf|tmp|bak|done|ok)\b", "<file>"),
+    (r"\b0x[0-9a-fA-F]+\b", "<hex>"),
+    (r"\b[0-9a-fA-F]{16,}\b", "<hex>"),
+    # Short hashes / CRCs (6+ hex characters with a digit and a letter) are
+    # masked like numbers: an all-digit CRC is indistinguishable from one.
+    (r"\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{6,}\b", "<n>"),
+    (r"'[^']*'", "'<str>'"),
+    (r"\"[^\"]*\"", "\"<str>\""),
+    (r"\b\d+(?:[.,]\d+)*\b", "<n>"),
+    (r"\s+", " "),
+]
+_COMPILED_RULES = [(re.compile(p), r) for p, r in FINGERPRINT_RULES]
+
+# Per-process memo: raw message -> template text, template text -> ID.
+# The message memo is bounded; template IDs are never reassigned.
+MESSAGE_MEMO_MAX = 250_000
+
+_lock = threading.Lock()
+_message_template: dict[str, str] = {}
+_template_id: dict[str, int] = {}
+_template_text: list[str] = []
+
+def normalize_messages(messages: pd.Series) -> pd.Series:
+    """Apply the fingerprint rules to a Series of (unique) strings."""
+    out = messages.astype(str)
+    for pattern, repl in _COMPILED_RULES:
+        out = out.str.replace(pattern, repl, regex=True)
+    return out.str.strip()
+
+def _templates_for(unique_messages: pd.Index) -> np.ndarray:
+    with _lock:
+        cached = [_message_template.get(m) for m in unique_messages]
+    missing = [m for m, t in zip(unique_messages, cached) if t is None]
+
+    if missing:
+        fresh = dict(zip(missing, normalize_messages(pd.Series(missing, dtype=object)).tolist()))
+        with _lock:
+            if len(_message_template) + len(fresh) > MESSAGE_MEMO_MAX:
+                _message_template.clear()
+            _message_template.update(fresh)
+        cached = [t if t is not None else fresh[m] for m, t in zip(unique_messages, cached)]
+
+    return np.asarray(cached, dtype=object)
+
+def _ids_for(templates: np.ndarray) -> np.ndarray:
+    ids = np.empty(len(templates), dtype=np.int32)
+    with _lock:
+        for i, t in enumerate(templates):
+            tid = _template_id.get(t)
+            if tid is None:
+                tid = len(_template_text)
+                _template_id[t] = tid
+                _template_text.append(t)
+            ids[i] = tid
+    return ids
+
+def fingerprint_errors(messages: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """
+    messages -> (ErrorTemplateId int32, ErrorTemplate categorical), row aligned.
+    Missing messages get ID -1 and a NaN template.
+    """
+    cat = messages.astype("category")
+    codes = cat.cat.codes.to_numpy()
+    uniq = cat.cat.categories
+
+    if len(uniq) == 0:
+        ids = pd.Series(np.full(len(messages), -1, dtype=np.int32), index=messages.index)
+        return ids, pd.Series(pd.Categorical([None] * len(messages)), index=messages.index)
+
+    templates = _templates_for(uniq)
+    uniq_ids = _ids_for(templates)
+
+    tmpl_values, tmpl_codes = np.unique(templates.astype(str), return_inverse=True)
+    row_tmpl_codes = np.where(codes >= 0, tmpl_codes.reshape(-1)[codes], -1)
+    row_ids = np.where(codes >= 0, uniq_ids[codes], -1).astype(np.int32)
+
+    ids = pd.Series(row_ids, index=messages.index)
+    tmpl = pd.Series(pd.Categorical.from_codes(row_tmpl_codes, categories=tmpl_values), index=messages.index)
+    return ids, tmpl
+
+def template_text(template_ids) -> list[str]:
+    with _lock:
+        return [_template_text[i] if 0 <= i < len(_template_text) else "" for i in template_ids]
+
+def top_error_templates(run: pd.DataFrame, n: int = 10, failures_only: bool = True) -> pd.DataFrame:
+    """
+    Top-N error templates by row count. Integer groupby on ErrorTemplateId;
+    the "(none)" placeholder is excluded.
+    """
+    cols = ["ErrorTemplateId", "ErrorTemplate", "Count", "Share", "Interfaces"]
+    if run.empty or "ErrorTemplateId" not in run.columns:
+        return pd.DataFrame(columns=cols)
+
+    df = run.loc[~run["IsSuccess"]] if failures_only else run
+    with _lock:
+        none_id = _template_id.get("(none)", -1)
+    df = df.loc[(df["ErrorTemplateId"] >= 0) & (df["ErrorTemplateId"] != none_id)]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+
+    counts = df.groupby("ErrorTemplateId", sort=False).agg(
+        Count=("ErrorTemplateId", "size"),
+        Interfaces=("InterfaceCode", "nunique"),
+    )
+    counts = counts.nlargest(n, "Count").reset_index()
+    counts["ErrorTemplate"] = template_text(counts["ErrorTemplateId"].tolist())
+    counts["Share"] = counts["Count"] / len(df)
+    return counts[cols]
@@ -0,0 +1,313 @@
+# Generated from Fusion_Portal/app/metrics.py by Fusion_Portal/scripts/sync_shared.py.
+# Edit that file and re-run the script; do not edit this copy.
+"""
+In-process metrics and DB query instrumentation.
+
+- Histogram / Counter: label-keyed, thread-safe, rendered in the Prometheus
+  text exposition format by render_prometheus().
+- instrument_connection(): wraps a pyodbc connection so every cursor records,
+  per named query, connect / execute / fetch seconds, rows returned and
+  errors. Queries slower than DB_SLOW_QUERY_MS (default 1000, 0 = off) are
+  printed as [DB] slow query lines.
+
+Values are per process: under gunicorn each worker answers /metrics with its
+own counts (the pid label tells them apart).
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+
+from env import env_float
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    f = float(v)
+    return str(int(f)) if f.is_integer() else repr(f)
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra: dict | None = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def snapshot(self) -> dict[tuple, dict]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        return {k: {"sum": v[-2], "count": v[-1], "buckets": dict(zip(self.buckets, v[:-2]))} for k, v in items}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        pid = str(os.getpid())  # not at import: under --preload that is the master's
+        for labels, s in sorted(self.snapshot().items()):
+            for b, c in s["buckets"].items():
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, {'le': _fmt(b), 'pid': pid})} {c}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, {'le': '+Inf', 'pid': pid})} {s['count']}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels, {'pid': pid})} {s['sum']!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels, {'pid': pid})} {s['count']}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def snapshot(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._series)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        pid = str(os.getpid())
+        for labels, v in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels, {'pid': pid})} {_fmt(v)}")
+        return lines
+
+_registry_lock = threading.Lock()
+_registry: dict[str, object] = {}
+
+def register(metric):
+    """Register a metric (idempotent by name) and return the registered one."""
+    with _registry_lock:
+        return _registry.setdefault(metric.name, metric)
+
+def render_prometheus() -> str:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines: list[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+# ---------------------------------------------------------------------------
+# DB instrumentation
+# ---------------------------------------------------------------------------
+
+DB_CONNECT_SECONDS = register(Histogram(
+    "fusion_db_connect_seconds", "Time to open a DB connection.", ("query", "database")))
+DB_EXECUTE_SECONDS = register(Histogram(
+    "fusion_db_execute_seconds", "Time spent in cursor.execute per named query.", ("query", "database")))
+DB_FETCH_SECONDS = register(Histogram(
+    "fusion_db_fetch_seconds", "Time spent fetching results per named query.", ("query", "database")))
+DB_ROWS = register(Histogram(
+    "fusion_db_rows", "Rows returned per named query execution.", ("query", "database"), buckets=ROW_BUCKETS))
+DB_ERRORS = register(Counter(
+    "fusion_db_errors_total", "DB errors per named query and phase.", ("query", "database", "phase", "error")))
+
+SLOW_QUERY_SECONDS = env_float("DB_SLOW_QUERY_MS", 1000.0) / 1000.0
+
+# fn(database, phase, exc) for every connect / execute / fetch outcome, exc is
+# None on success (connect and execute only). Used by the portal's breaker.
+_outcome_listeners: list = []
+
+def add_outcome_listener(fn) -> None:
+    _outcome_listeners.append(fn)
+
+def _notify(database: str, phase: str, exc: BaseException | None) -> None:
+    for fn in _outcome_listeners:
+        fn(database, phase, exc)
+
+def record_error(query: str, database: str, phase: str, exc: BaseException) -> None:
+    DB_ERRORS.inc(query, database, phase, type(exc).__name__)
+    _notify(database, phase, exc)
+
+# Running total of DB seconds (connect + execute + fetch) on this thread, so
+# request-level profiling can split wall time into DB vs Python.
+_thread_db = threading.local()
+
+def _add_db_time(seconds: float) -> None:
+    _thread_db.seconds = getattr(_thread_db, "seconds", 0.0) + seconds
+
+def thread_db_seconds() -> float:
+    return getattr(_thread_db, "seconds", 0.0)
+
+def credit_db_time(seconds: float) -> None:
+    """Charge DB time measured on a helper thread to the calling thread."""
+    _add_db_time(seconds)
+
+class InstrumentedCursor:
+    """pyodbc cursor proxy. One observation per execute: rows and fetch time
+    accumulate until the next execute, close(), or the connection closes."""
+
+    def __init__(self, cursor, query: str, database: str):
+        object.__setattr__(self, "_cur", cursor)
+        object.__setattr__(self, "_query", query)
+        object.__setattr__(self, "_database", database)
+        object.__setattr__(self, "_pending", None)  # [execute_s, fetch_s, rows]
+
+    def __getattr__(self, item):
+        return getattr(self._cur, item)
+
+    def __setattr__(self, key, value):
+        setattr(self._cur, key, value)  # e.g. fast_executemany
+
+    def _flush(self) -> None:
+        p = self._pending
+        if p is None:
+            return
+        object.__setattr__(self, "_pending", None)
+        execute_s, fetch_s, rows = p
+        DB_FETCH_SECONDS.observe(fetch_s, self._query, self._database)
+        DB_ROWS.observe(rows, self._query, self._database)
+        if SLOW_QUERY_SECONDS > 0 and execute_s + fetch_s >= SLOW_QUERY_SECONDS:
+            print(
+                f"[DB] slow query: {self._query} database={self._database} "
+                f"execute={execute_s * 1000:.0f}ms fetch={fetch_s * 1000:.0f}ms rows={rows}",
+                flush=True,
+            )
+
+    def _run(self, method, sql, params):
+        self._flush()
+        t0 = time.perf_counter()
+        try:
+            method(sql, *params)
+        except Exception as e:
+            _add_db_time(time.perf_counter() - t0)
+            record_error(self._query, self._database, "execute", e)
+            raise
+        elapsed = time.perf_counter() - t0
+        _add_db_time(elapsed)
+        DB_EXECUTE_SECONDS.observe(elapsed, self._query, self._database)
+        _notify(self._database, "execute", None)
+        object.__setattr__(self, "_pending", [elapsed, 0.0, 0])
+        return self
+
+    def execute(self, sql, *params):
+        return self._run(self._cur.execute, sql, params)
+
+    def executemany(self, sql, *params):
+        return self._run(self._cur.executemany, sql, params)
+
+    def _fetch(self, method, *args, single: bool = False):
+        t0 = time.perf_counter()
+        try:
+            out = method(*args)
+        except Exception as e:
+            record_error(self._query, self._database, "fetch", e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            _add_db_time(elapsed)
+        p = self._pending
+        if p is not None:
+            p[1] += elapsed
+            p[2] += (out is not None) if single else len(out)
+        return out
+
+    def fetchone(self):
+        return self._fetch(self._cur.fetchone, single=True)
+
+    def fetchall(self):
+        return self._fetch(self._cur.fetchall)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cur.fetchmany, *args)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._flush()
+        self._cur.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class InstrumentedConnection:
+    """pyodbc connection proxy handing out InstrumentedCursors. Context-manager
+    behaviour is pyodbc's (commit/rollback on exit, no close); pending cursor
+    observations are flushed on exit and on close()."""
+
+    def __init__(self, conn, query: str, database: str):
+        self._conn = conn
+        self._query = query
+        self._database = database
+        self._cursors: list[InstrumentedCursor] = []
+
+    def __getattr__(self, item):
+        return getattr(self._conn, item)
+
+    def cursor(self):
+        cur = InstrumentedCursor(self._conn.cursor(), self._query, self._database)
+        self._cursors.append(cur)
+        return cur
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def _flush(self):
+        for cur in self._cursors:
+            cur._flush()
+        self._cursors.clear()
+
+    def close(self):
+        self._flush()
+        self._conn.close()
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._flush()
+        return self._conn.__exit__(*exc)
+
+def instrument_connection(connect, query: str, database: str = ""):
+    """Time connect() (a zero-arg callable returning a DB-API connection) and
+    wrap the result."""
+    t0 = time.perf_counter()
+    try:
+        conn = connect()
+    except Exception as e:
+        _add_db_time(time.perf_counter() - t0)
+        record_error(query, database, "connect", e)
+        raise
+    elapsed = time.perf_counter() - t0
+    _add_db_time(elapsed)
+    DB_CONNECT_SECONDS.observe(elapsed, query, database)
+    _notify(database, "connect", None)
+    return InstrumentedConnection(conn, query, database)
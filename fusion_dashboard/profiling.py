@@ -0,0 +1,186 @@
+"""
+Dash request profiling.
+
+instrument_dash_app() wraps a Dash app's ``_dash-layout`` and
+``_dash-update-component`` Flask views, so every layout function and every
+callback (``app.callback`` or ``dash.callback``) is measured as served:
+
+- wall time, split into DB time (from app.metrics' per-thread DB clock) and
+  Python time (the rest, including Dash's JSON serialisation)
+- serialised response bytes
+- call / error counts per target and per user
+
+Targets are "<app>:layout" or "<app>:<callback output id>". Wall time and
+bytes also feed metrics.render_prometheus() (fusion_dash_*).
+
+Dashboard copy of the portal's app/profiling.py. The portal serves the stats
+on an admin-only page; here register_profiling_route() serves them as JSON
+behind PROFILING_TOKEN, since the dashboard has no user accounts.
+
+Optional cProfile sampling: with PROFILE_SAMPLE_RATE > 0 a fraction of
+invocations run under cProfile (one at a time per process); those that take
+at least PROFILE_SLOW_MS are written to PROFILE_DIR as .prof files
+(open with ``python -m pstats`` or snakeviz).
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter as _Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flask import abort, request
+
+from env import env_float
+from metrics import Histogram, register, thread_db_seconds
+
+BYTE_BUCKETS = (256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216)
+
+DASH_SECONDS = register(Histogram(
+    "fusion_dash_request_seconds", "Wall time of Dash layout/callback requests.", ("app", "target")))
+DASH_BYTES = register(Histogram(
+    "fusion_dash_response_bytes", "Serialised size of Dash layout/callback responses.", ("app", "target"),
+    buckets=BYTE_BUCKETS))
+
+@dataclass
+class TargetStats:
+    app: str
+    target: str
+    calls: int = 0
+    errors: int = 0
+    wall_s: float = 0.0
+    wall_max_s: float = 0.0
+    db_s: float = 0.0
+    bytes_total: int = 0
+    bytes_max: int = 0
+    users: _Counter = field(default_factory=_Counter)
+
+    def as_dict(self) -> dict:
+        n = self.calls or 1
+        return {
+            "app": self.app,
+            "target": self.target,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.wall_s / n * 1000, 1),
+            "max_ms": round(self.wall_max_s * 1000, 1),
+            "avg_db_ms": round(self.db_s / n * 1000, 1),
+            "avg_py_ms": round(max(self.wall_s - self.db_s, 0.0) / n * 1000, 1),
+            "avg_bytes": int(self.bytes_total / n),
+            "max_bytes": self.bytes_max,
+            "users": dict(self.users.most_common(10)),
+        }
+
+_lock = threading.Lock()
+_stats: dict[tuple[str, str], TargetStats] = {}
+_profile_lock = threading.Lock()  # cProfile cannot run two profilers at once
+
+PROFILE_SAMPLE_RATE = env_float("PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_SLOW_SECONDS = env_float("PROFILE_SLOW_MS", 2000.0) / 1000.0
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+
+def _user_key() -> str:
+    # No logins on the dashboard; the client address is the closest thing.
+    return request.headers.get("X-Forwarded-For", request.remote_addr or "anonymous").split(",")[0].strip()
+
+def _target(kind: str) -> str:
+    if kind == "layout":
+        return "layout"
+    body = request.get_json(silent=True) or {}
+    return str(body.get("output", "?"))
+
+def _record(app_name: str, target: str, wall: float, db: float, nbytes: int, failed: bool) -> None:
+    DASH_SECONDS.observe(wall, app_name, target)
+    DASH_BYTES.observe(nbytes, app_name, target)
+    user = _user_key()
+    with _lock:
+        st = _stats.get((app_name, target))
+        if st is None:
+            st = _stats[(app_name, target)] = TargetStats(app_name, target)
+        st.calls += 1
+        st.errors += int(failed)
+        st.wall_s += wall
+        st.wall_max_s = max(st.wall_max_s, wall)
+        st.db_s += db
+        st.bytes_total += nbytes
+        st.bytes_max = max(st.bytes_max, nbytes)
+        st.users[user] += 1
+
+def _dump_profile(prof: cProfile.Profile, app_name: str, target: str, wall: float) -> None:
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{app_name}_{target}")[:80]
+        prof.dump_stats(PROFILE_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}_{os.getpid()}_{safe}_{wall * 1000:.0f}ms.prof")
+    except OSError as e:
+        print(f"[PROFILE] could not write profile: {e}", flush=True)
+
+def _profiled_view(view, app_name: str, kind: str):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        target = _target(kind)
+        prof = None
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE and _profile_lock.acquire(blocking=False):
+            prof = cProfile.Profile()
+        db0 = thread_db_seconds()
+        t0 = time.perf_counter()
+        failed = True
+        nbytes = 0
+        try:
+            if prof is not None:
+                prof.enable()
+            resp = view(*args, **kwargs)
+            failed = getattr(resp, "status_code", 200) >= 400
+            if hasattr(resp, "calculate_content_length"):
+                nbytes = resp.calculate_content_length() or 0
+            return resp
+        finally:
+            if prof is not None:
+                prof.disable()
+            wall = time.perf_counter() - t0
+            _record(app_name, target, wall, thread_db_seconds() - db0, nbytes, failed)
+            if prof is not None:
+                _profile_lock.release()
+                if wall >= PROFILE_SLOW_SECONDS:
+                    _dump_profile(prof, app_name, target, wall)
+
+    wrapper._fusion_profiled = True
+    return wrapper
+
+def instrument_dash_app(dash_app, name: str):
+    """Profile every layout/callback request served by dash_app. Idempotent."""
+    server = dash_app.server
+    prefix = dash_app.config.routes_pathname_prefix
+    for endpoint, kind in ((prefix + "_dash-layout", "layout"), (prefix + "_dash-update-component", "callback")):
+        view = server.view_functions.get(endpoint)
+        if view is None or getattr(view, "_fusion_profiled", False):
+            continue
+        server.view_functions[endpoint] = _profiled_view(view, name, kind)
+    return dash_app
+
+def profile_stats() -> list[dict]:
+    with _lock:
+        rows = [st.as_dict() for st in _stats.values()]
+    return sorted(rows, key=lambda r: r["avg_ms"] * r["calls"], reverse=True)
+
+def reset_profile_stats() -> None:
+    with _lock:
+        _stats.clear()
+
+def register_profiling_route(server, path: str = "/admin/profiling"):
+    """Serve profile_stats() as JSON at path. Disabled unless PROFILING_TOKEN is set;
+    callers send "Authorization: Bearer <token>"."""
+    token = os.getenv("PROFILING_TOKEN", "").strip()
+
+    def profiling_json():
+        if not token or request.headers.get("Authorization") != f"Bearer {token}":
+            abort(404)
+        return {"pid": os.getpid(), "targets": profile_stats()}
+
+    server.add_url_rule(path, "fusion_profiling", profiling_json)
+    return server
@@ -0,0 +1,242 @@
+# Generated from Fusion_Portal/app/singleflight.py by Fusion_Portal/scripts/sync_shared.py.
+# Edit that file and re-run the script; do not edit this copy.
+"""
+Single-flight request coalescing.
+
+functools.lru_cache only helps once a value is cached: N threads that miss
+at the same time all run the function. SingleFlight.do(key, fn) runs fn once
+per key at a time; callers arriving while it runs wait for that call and get
+its result, or its exception re-raised. A waiter gives up after timeout_s
+(SINGLEFLIGHT_TIMEOUT_S, default 120, 0 = wait forever) with
+SingleFlightTimeout; the running call is not interrupted.
+
+    coalesced(name)            decorator: in-flight deduplication only
+    coalesced_cache(maxsize)   decorator: lru_cache replacement whose misses
+                               are coalesced; has cache_clear()
+
+Across worker processes: with lock_dir set (SINGLEFLIGHT_LOCK_DIR), the call
+that runs also holds an exclusive lock on <lock_dir>/<name>.<key hash>.lock,
+so at most one process at a time runs fn for a key; the others wait for the
+file lock and then call recheck() first, which can return a value another
+process left in a shared store (None = run fn after all). Without fcntl
+(Unix) or msvcrt (Windows) the lock file is skipped.
+
+Flights are per process and reset after a fork.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from env import env_float
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # Unix
+    msvcrt = None
+
+SINGLEFLIGHT_TIMEOUT_S = env_float("SINGLEFLIGHT_TIMEOUT_S", 120.0)
+SINGLEFLIGHT_LOCK_DIR = os.getenv("SINGLEFLIGHT_LOCK_DIR", "").strip()
+
+_LOCK_POLL_S = 0.05
+
+class SingleFlightTimeout(TimeoutError):
+    pass
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+class _FileLock:
+    """Exclusive lock on a file, acquired by polling so it can time out."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: int | None = None
+
+    def acquire(self, timeout_s: float) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + timeout_s if timeout_s > 0 else None
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self.fd = fd
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False
+                time.sleep(_LOCK_POLL_S)
+
+    def release(self) -> None:
+        if self.fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+_flights: dict[str, "SingleFlight"] = {}
+
+class SingleFlight:
+    def __init__(self, name: str, timeout_s: float = SINGLEFLIGHT_TIMEOUT_S, lock_dir: str = ""):
+        self.name = name
+        self.timeout_s = timeout_s
+        self.lock_dir = lock_dir if lock_dir and (fcntl or msvcrt) else ""
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self._pid = os.getpid()
+        self.counts = {"run": 0, "shared": 0, "timeout": 0, "error": 0}
+        _flights[name] = self
+
+    def _count(self, what: str) -> None:
+        with self._lock:
+            self.counts[what] += 1
+
+    def _lock_path(self, key) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.lock_dir, f"{self.name}.{digest}.lock")
+
+    def do(self, key, fn, timeout_s: float | None = None, recheck=None):
+        """fn() once per key at a time; concurrent callers share the outcome."""
+        timeout_s = self.timeout_s if timeout_s is None else timeout_s
+        with self._lock:
+            if self._pid != os.getpid():  # forked: the parent's calls are not ours
+                self._calls, self._pid = {}, os.getpid()
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(timeout_s if timeout_s > 0 else None):
+                self._count("timeout")
+                raise SingleFlightTimeout(f"{self.name}: gave up waiting for {key!r} after {timeout_s:g}s")
+            self._count("shared")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, timeout_s, recheck)
+            self._count("run")
+            return call.result
+        except BaseException as e:
+            call.error = e
+            self._count("error")
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def _run(self, key, fn, timeout_s: float, recheck):
+        if not self.lock_dir:
+            return fn()
+        lock = _FileLock(self._lock_path(key))
+        if not lock.acquire(timeout_s):
+            raise SingleFlightTimeout(f"{self.name}: lock file for {key!r} busy for {timeout_s:g}s")
+        try:
+            if recheck is not None:
+                # another process may have just run fn and left the value behind
+                value = recheck()
+                if value is not None:
+                    return value
+            return fn()
+        finally:
+            lock.release()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), **self.counts}
+
+def flight_status() -> dict[str, dict]:
+    return {name: f.status() for name, f in sorted(_flights.items())}
+
+def _make_key(args, kwargs):
+    return (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+def coalesced(name: str, timeout_s: float = SINGLEFLIGHT_TIMEOUT_S):
+    """Deduplicate concurrent calls with equal (hashable) arguments."""
+    def decorate(fn):
+        flight = SingleFlight(name, timeout_s)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flight.do(_make_key(args, kwargs), lambda: fn(*args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+    return decorate
+
+def coalesced_cache(maxsize: int = 128, name: str | None = None, timeout_s: float = SINGLEFLIGHT_TIMEOUT_S):
+    """lru_cache(maxsize) whose concurrent misses for a key run fn once.
+
+    cache_clear() also makes calls already in flight skip storing their
+    (possibly stale) result, and later callers start a new call instead of
+    waiting for one of those."""
+    def decorate(fn):
+        flight = SingleFlight(name or f"{fn.__module__}.{fn.__qualname__}", timeout_s)
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+        generation = [0]
+
+        def compute(key, gen, args, kwargs):
+            with lock:
+                if key in cache:  # filled by a call that finished just before ours started
+                    return cache[key]
+            value = fn(*args, **kwargs)
+            with lock:
+                if gen == generation[0]:
+                    cache[key] = value
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return value
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = _make_key(args, kwargs)
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+                gen = generation[0]
+            # keyed on the generation too: callers after a cache_clear() must
+            # not join a call that started before it
+            return flight.do((gen, key), lambda: compute(key, gen, args, kwargs))
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                generation[0] += 1
+
+        wrapper.cache_clear = cache_clear
+        wrapper.flight = flight
+        return wrapper
+    return decorate
@@ -0,0 +1,112 @@
+"""
+Mergeable quantile sketches (DDSketch style) for SLA percentiles.
+
+A sketch is a set of logarithmic buckets: a positive value v lands in bucket
+ceil(log(v) / log(GAMMA)), and any quantile read back from the buckets is
+within RELATIVE_ACCURACY of the true value. Merging two sketches is adding
+their bucket counts, so per-day sketches combine into any date range, and
+per-route sketches combine into per-interface ones, without raw rows.
+
+Sketches are kept as a long "sketch table" - one row per
+(StartDate, route keys..., Bucket) with a Count - which is one DDSketch per
+route per day. Everything below is vectorised over that table.
+"""
+import numpy as np
+import pandas as pd
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = np.log(GAMMA)
+
+# Values at or below this (including 0) share one bucket that reads back as 0.
+MIN_INDEXABLE = 1e-9
+ZERO_BUCKET = np.iinfo(np.int32).min
+
+ROUTE_KEYS = ["Principal_Code", "InterfaceCode"]
+DIMENSIONS = {
+    "route": ROUTE_KEYS,
+    "interface": ["InterfaceCode"],
+    "principal": ["Principal_Code"],
+}
+SKETCH_METRICS = ["DurationSeconds", "FileSizeBytes"]
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+def bucket_index(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, ZERO_BUCKET, dtype=np.int32)
+    pos = values > MIN_INDEXABLE
+    out[pos] = np.ceil(np.log(values[pos]) / _LOG_GAMMA).astype(np.int32)
+    return out
+
+def bucket_value(buckets: np.ndarray) -> np.ndarray:
+    buckets = np.asarray(buckets)
+    out = np.zeros(buckets.shape, dtype=float)
+    nz = buckets != ZERO_BUCKET
+    # Midpoint (in relative terms) of (GAMMA^(i-1), GAMMA^i]
+    out[nz] = 2.0 * np.power(GAMMA, buckets[nz].astype(float)) / (GAMMA + 1.0)
+    return out
+
+def build_sketch_table(run: pd.DataFrame, metric: str, keys=ROUTE_KEYS) -> pd.DataFrame:
+    """Raw rows -> per-day, per-key sketch table for one metric (NaNs skipped)."""
+    cols = ["StartDate"] + list(keys) + ["Bucket", "Count"]
+    if run.empty or metric not in run.columns:
+        return pd.DataFrame(columns=cols)
+
+    vals = run[metric].to_numpy(dtype=float, na_value=np.nan)
+    ok = ~np.isnan(vals)
+    if not ok.any():
+        return pd.DataFrame(columns=cols)
+
+    df = run.loc[ok, ["StartDate"] + list(keys)].copy()
+    df["Bucket"] = bucket_index(vals[ok])
+    return (
+        df.groupby(["StartDate"] + list(keys) + ["Bucket"], sort=False, observed=True)
+        .size()
+        .reset_index(name="Count")
+    )
+
+def build_month_sketches(run: pd.DataFrame) -> dict:
+    """metric -> route-level per-day sketch table, for every SKETCH_METRICS column."""
+    return {m: build_sketch_table(run, m) for m in SKETCH_METRICS}
+
+def merge_sketches(tables, keys=ROUTE_KEYS, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+    """
+    Merge any number of sketch tables (days, months) into one sketch per key.
+    keys may be any subset of the route keys (e.g. ["InterfaceCode"]).
+    Dates are inclusive 'YYYY-MM-DD' strings.
+    """
+    keys = list(keys)
+    frames = [t for t in tables if t is not None and not t.empty]
+    if not frames:
+        return pd.DataFrame(columns=keys + ["Bucket", "Count"])
+
+    df = pd.concat(frames, ignore_index=True)
+    if start_date:
+        df = df.loc[df["StartDate"] >= start_date]
+    if end_date:
+        df = df.loc[df["StartDate"] <= end_date]
+
+    return df.groupby(keys + ["Bucket"], sort=True)["Count"].sum().reset_index()
+
+def sketch_quantiles(merged: pd.DataFrame, keys=ROUTE_KEYS, quantiles=DEFAULT_QUANTILES) -> pd.DataFrame:
+    """
+    One row per key with Count and a P<q> column per quantile (e.g. P50, P95).
+    Cost is O(keys x buckets), independent of the number of raw rows.
+    """
+    keys = list(keys)
+    qcols = [f"P{round(q * 100, 1):g}" for q in quantiles]
+    if merged.empty:
+        return pd.DataFrame(columns=keys + ["Count"] + qcols)
+
+    df = merged.sort_values(keys + ["Bucket"], kind="stable").reset_index(drop=True)
+    grp = df.groupby(keys, sort=False)["Count"]
+    df["Cum"] = grp.cumsum()
+    df["Total"] = grp.transform("sum")
+
+    out = df.groupby(keys, sort=False)["Total"].first().reset_index(name="Count")
+    for q, col in zip(quantiles, qcols):
+        rank = q * (df["Total"] - 1)
+        hit = df.loc[df["Cum"] > rank].groupby(keys, sort=False).head(1)
+        vals = pd.DataFrame({**{k: hit[k].to_numpy() for k in keys}, col: bucket_value(hit["Bucket"].to_numpy())})
+        out = out.merge(vals, on=keys, how="left")
+    return out
@@ -0,0 +1,96 @@
+# Generated from Fusion_Portal/app/statements.py by Fusion_Portal/scripts/sync_shared.py.
+# Edit that file and re-run the script; do not edit this copy.
+"""
+Named, parameterised SQL statements.
+
+Every value is a bound parameter, so a statement's text is byte-identical on
+every call and SQL Server compiles it once and reuses the cached plan. Text
+with inlined values (f"TOP ({limit})") gets a new plan per distinct value.
+
+- STATEMENTS.define(name, sql, params): register a statement; params names
+  the ? placeholders in order.
+- Statement.bind(*args, **kwargs): values in placeholder order;
+  Statement.execute(cursor, ...) runs it on a cursor.
+- Statement.for_identifiers(**idents): statements whose text needs schema /
+  table names (which cannot be bound). Names are quoted with quote_ident();
+  callers must validate them against the catalog first. One Statement (and
+  one plan) per distinct identifier set.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+IDENTIFIER_CACHE_MAX = 4096
+
+def quote_ident(name: str) -> str:
+    """[name] with ] escaped - QUOTENAME() on the client side."""
+    if not name or len(name) > 128:
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return "[" + name.replace("]", "]]") + "]"
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+    params: tuple[str, ...] = ()
+
+    def bind(self, *args, **kwargs) -> list:
+        if args and kwargs:
+            raise TypeError(f"{self.name}: pass parameters positionally or by name, not both")
+        if kwargs:
+            missing = [p for p in self.params if p not in kwargs]
+            extra = [k for k in kwargs if k not in self.params]
+            if missing or extra:
+                raise TypeError(f"{self.name}: missing {missing}, unexpected {extra}")
+            return [kwargs[p] for p in self.params]
+        if len(args) != len(self.params):
+            raise TypeError(f"{self.name}: expected {len(self.params)} parameters {self.params}, got {len(args)}")
+        return list(args)
+
+    def execute(self, cursor, *args, **kwargs):
+        """cursor.execute(sql, *bound values); returns the cursor."""
+        return cursor.execute(self.sql, *self.bind(*args, **kwargs))
+
+    def for_identifiers(self, **idents: str) -> "Statement":
+        return STATEMENTS._specialise(self, idents)
+
+class Registry:
+    def __init__(self):
+        self._statements: dict[str, Statement] = {}
+        self._specialised: dict[tuple, Statement] = {}
+        self._lock = threading.Lock()
+
+    def define(self, name: str, sql: str, params=()) -> Statement:
+        stmt = Statement(name, sql, tuple(params))
+        existing = self._statements.get(name)
+        if existing is not None and existing != stmt:
+            raise ValueError(f"Statement {name!r} already defined with different text")
+        self._statements[name] = stmt
+        return stmt
+
+    def get(self, name: str) -> Statement:
+        return self._statements[name]
+
+    def names(self) -> list[str]:
+        return sorted(self._statements)
+
+    def _specialise(self, stmt: Statement, idents: dict) -> Statement:
+        key = (stmt.name, tuple(sorted(idents.items())))
+        hit = self._specialised.get(key)
+        if hit is not None:
+            return hit
+        wanted = set(_PLACEHOLDER.findall(stmt.sql))
+        if wanted != set(idents):
+            raise TypeError(f"{stmt.name}: identifiers {sorted(wanted)} required, got {sorted(idents)}")
+        quoted = {k: quote_ident(v) for k, v in idents.items()}
+        out = Statement(stmt.name, _PLACEHOLDER.sub(lambda m: quoted[m.group(1)], stmt.sql), stmt.params)
+        with self._lock:
+            if len(self._specialised) >= IDENTIFIER_CACHE_MAX:
+                self._specialised.clear()
+            self._specialised[key] = out
+        return out
+
+STATEMENTS = Registry()
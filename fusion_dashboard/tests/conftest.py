@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The dashboard's modules are flat (import data_loader, ...), run from fusion_dashboard/.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import data_loader as dl  # noqa: E402
+from benchmarks.fake_odbc import FakeConnection  # noqa: E402
+from benchmarks.synthetic import generate_cfg, generate_rundetail  # noqa: E402
+from metrics import instrument_connection  # noqa: E402
+
+MONTHS = ["2025-01", "2025-02"]
+
+@pytest.fixture
+def offline(monkeypatch):
+    """data_loader against the synthetic MONTHS through the fake ODBC
+    connection; yields (cfg, set_cfg) to swap the CFG table."""
+    cfg = generate_cfg(seed=3)
+    run = pd.concat([generate_rundetail(20_000, m, cfg, seed=i) for i, m in enumerate(MONTHS)], ignore_index=True)
+    state = {"datasets": {"run": run, "cfg": cfg}}
+
+    def set_cfg(new_cfg):
+        # a fresh dict: FakeConnection caches converted rows in the datasets
+        state["datasets"] = {"run": run, "cfg": new_cfg}
+
+    monkeypatch.setattr(dl, "_conn", lambda query="unnamed", readonly=True: instrument_connection(
+        lambda: FakeConnection(state["datasets"]), query, "synthetic"))
+    monkeypatch.setattr(dl.change_bus, "interval_s", 0)  # no poller thread
+    dl.clear_month_cache()
+    yield cfg, set_cfg
+    dl.clear_month_cache()
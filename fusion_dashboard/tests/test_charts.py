@@ -0,0 +1,55 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+import charts
+
+def _values(arr) -> np.ndarray:
+    """A trace array back from typed_array()."""
+    if isinstance(arr, dict):
+        return np.frombuffer(base64.b64decode(arr["bdata"]), dtype=arr["dtype"])
+    return np.asarray(arr)
+
+def test_scatter_trace_follows_the_point_budget():
+    rng = np.random.default_rng(0)
+    n = 300_000
+    x = pd.Series(pd.date_range("2025-01-01", periods=n, freq="s"))
+    y = rng.lognormal(3, 1, n)
+    y[123_456] = 1e9  # an outlier must survive the cut
+    for width in (600, 1200, 2400):
+        trace = charts.scatter_trace(x, y, width_px=width)
+        assert len(_values(trace["x"])) <= charts.SCATTER_FACTOR * charts.point_budget(width)
+    assert _values(charts.scatter_trace(x, y, width_px=1200)["y"]).max() == 1e9
+
+def _series(n=50_000, seed=1):
+    rng = np.random.default_rng(seed)
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = np.cumsum(rng.normal(size=n))
+    y[::1000] = np.nan
+    return x, y
+
+def test_lttb_keeps_endpoints_and_budget():
+    x, y = _series()
+    for n_out in (3, 100, 2000):
+        idx = charts.lttb(x, y, n_out)
+        assert len(idx) == n_out
+        assert np.all(np.diff(idx) > 0)
+        assert not np.isnan(y[idx]).any()
+        valid = np.flatnonzero(~np.isnan(y))
+        assert idx[0] == valid[0] and idx[-1] == valid[-1]
+    assert len(charts.lttb(x[:10], y[:10], 100)) == np.count_nonzero(~np.isnan(y[:10]))
+
+def test_minmax_indices_keeps_bucket_extremes():
+    x, y = _series()
+    n_buckets = 250
+    idx = charts.minmax_indices(x, y, n_buckets)
+    assert len(idx) <= 2 * n_buckets
+    assert np.all(np.diff(idx) > 0)
+    kept = set(idx.tolist())
+    valid = np.flatnonzero(~np.isnan(y))
+    edges = np.minimum(((x[valid] - x[valid[0]]) / (x[valid[-1]] - x[valid[0]]) * n_buckets).astype(int), n_buckets - 1)
+    for b in np.unique(edges):
+        members = valid[edges == b]
+        assert members[np.argmin(y[members])] in kept
+        assert members[np.argmax(y[members])] in kept
@@ -0,0 +1,56 @@
+"""refresh_config()'s per-route delta against a full recompute, on the
+benchmarks' synthetic month served through the fake ODBC connection."""
+import pandas as pd
+
+import data_loader as dl
+from conftest import MONTHS
+
+def _expected(month: str) -> pd.DataFrame:
+    out = dl.load_month(month)
+    run = out["run"]
+    full = dl.compute_route_completeness(run, out["expected_map"])
+    dim = (run.groupby(dl.ROUTE_KEYS, dropna=False)
+           .agg(PrincipalName=("PrincipalName", "first"), InterfaceName=("InterfaceName", "first"))
+           .reset_index())
+    return full.merge(dim, on=dl.ROUTE_KEYS, how="left")
+
+def _assert_matches_full_recompute():
+    keys = ["RunID", *dl.ROUTE_KEYS]
+    for month in MONTHS:
+        got = dl.load_month(month)["completeness"]
+        want = _expected(month)
+        assert list(got.columns) == list(want.columns)
+        pd.testing.assert_frame_equal(
+            got.sort_values(keys, ignore_index=True), want.sort_values(keys, ignore_index=True), check_dtype=False)
+
+def test_delta_refresh_matches_full_recompute(offline):
+    cfg, set_cfg = offline
+    for month in MONTHS:
+        dl.load_month(month)
+    _assert_matches_full_recompute()
+
+    routes = cfg[dl.ROUTE_KEYS].drop_duplicates()
+    dropped = routes.iloc[::3]
+    keep = ~pd.MultiIndex.from_frame(cfg[dl.ROUTE_KEYS]).isin(pd.MultiIndex.from_frame(dropped))
+    set_cfg(cfg[keep])
+    changed = dl.refresh_config()
+    assert len(changed) == len(dropped)
+    _assert_matches_full_recompute()
+
+    # fewer expected movements on some routes, others untouched
+    set_cfg(cfg[cfg["MovementCode"] != cfg["MovementCode"].iloc[0]])
+    dl.refresh_config()
+    _assert_matches_full_recompute()
+
+    set_cfg(cfg)
+    dl.refresh_config()
+    _assert_matches_full_recompute()
+
+    set_cfg(cfg.iloc[0:0])
+    assert len(dl.refresh_config()) == len(routes)
+    _assert_matches_full_recompute()
+    assert (dl.load_month(MONTHS[0])["completeness"]["RouteStatus"] == "UNKNOWN").all()
+
+    set_cfg(cfg)
+    dl.refresh_config()
+    _assert_matches_full_recompute()
@@ -0,0 +1,21 @@
+import pandas as pd
+
+import data_loader
+from benchmarks.synthetic import ERROR_TEMPLATES, generate_cfg, generate_rundetail
+from fingerprint import normalize_messages
+
+def _normalize(*messages):
+    return normalize_messages(pd.Series(messages, dtype=object)).tolist()
+
+def test_short_hex_is_masked():
+    assert _normalize("CRC 100e4d2 expected, got 9f3a01bc") == ["CRC <n> expected, got <n>"]
+
+def test_codes_and_words_are_kept():
+    # letters only, or non-hex letters: not hashes
+    assert _normalize("deadbeef IF0000 P005") == ["deadbeef IF0000 P005"]
+
+def test_synthetic_month_collapses_to_its_templates():
+    cfg = generate_cfg(seed=7)
+    run = data_loader._derive_fields(generate_rundetail(100_000, "2025-01", cfg, seed=8))
+    failed = run.loc[run["ErrorMessage"].notna() & (run["ErrorMessage"].astype(str).str.strip() != ""), "ErrorTemplate"]
+    assert failed.nunique() == len(ERROR_TEMPLATES)
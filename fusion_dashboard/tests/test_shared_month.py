@@ -0,0 +1,28 @@
+"""A month pulled by one worker and read back by a worker that waited on
+its SINGLEFLIGHT_LOCK_DIR lock file (data_loader._shared_month)."""
+import time
+
+import pandas as pd
+import pytest
+
+import coldtier
+import data_loader as dl
+from conftest import MONTHS
+
+pytestmark = pytest.mark.skipif(not coldtier.available(), reason="needs pyarrow")
+
+def test_waiter_reads_the_month_the_lock_holder_pulled(offline, monkeypatch, tmp_path):
+    monkeypatch.setattr(dl, "SINGLEFLIGHT_LOCK_DIR", str(tmp_path))
+    since = time.time()
+    pulled = dl._fetch_month(MONTHS[0])
+    assert (tmp_path / f"dashboard.month.{MONTHS[0]}.arrow").exists()
+
+    shared = dl._shared_month(MONTHS[0], since)
+    pd.testing.assert_frame_equal(shared.run, pulled.run)
+    pd.testing.assert_frame_equal(shared.actual, pulled.actual)
+    pd.testing.assert_frame_equal(shared.dim, pulled.dim)
+    assert dl.cached_run(MONTHS[0]) is shared.run
+
+    # saved before this caller started waiting: pull it again
+    assert dl._shared_month(MONTHS[0], time.time() + 1) is None
+    assert dl._shared_month(MONTHS[1], since) is None
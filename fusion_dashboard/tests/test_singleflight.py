@@ -0,0 +1,32 @@
+import threading
+
+from singleflight import coalesced_cache
+
+def test_cache_clear_starts_a_new_call():
+    release = threading.Event()
+    started = threading.Event()
+    source = {"value": "old"}
+
+    @coalesced_cache(maxsize=1, name="test.cache_clear")
+    def load():
+        value = source["value"]
+        if value == "old":
+            started.set()
+            release.wait(5)
+        return value
+
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault("first", load()))
+    first.start()
+    assert started.wait(5)
+
+    source["value"] = "new"
+    load.cache_clear()
+    second = threading.Thread(target=lambda: results.setdefault("second", load()))
+    second.start()
+    second.join(5)
+    release.set()
+    first.join(5)
+
+    assert results == {"first": "old", "second": "new"}
+    assert load() == "new"  # the stale result was not cached
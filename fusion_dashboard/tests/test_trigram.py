@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_cfg, generate_rundetail
+from data_loader import _derive_fields
+from trigram import SEARCH_COLUMNS, TrigramIndex
+
+def _contains(run: pd.DataFrame, text: str, columns) -> np.ndarray:
+    mask = np.zeros(len(run), dtype=bool)
+    for c in columns:
+        mask |= run[c].astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+    return np.flatnonzero(mask)
+
+def test_search_matches_str_contains():
+    cfg = generate_cfg(seed=5)
+    run = _derive_fields(generate_rundetail(20_000, "2025-03", cfg, seed=5))
+    run.loc[::97, "FileName"] = None
+    run.loc[1, "SourcePath"] = "\\\\Share\\Ünïcode\\Path"
+    index = TrigramIndex(run)
+    some_file = str(run["FileName"].dropna().iloc[10])
+    needles = [some_file, some_file[2:9].upper(), "ünï", "timeout", ".csv", "x", "ab", "no such text anywhere"]
+    for needle in needles:
+        np.testing.assert_array_equal(index.search(needle), _contains(run, needle, SEARCH_COLUMNS), err_msg=needle)
+        np.testing.assert_array_equal(index.search(needle, ["FileName"]), _contains(run, needle, ["FileName"]),
+                                      err_msg=needle)
+    assert len(index.search("")) == 0
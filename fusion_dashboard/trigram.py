@@ -0,0 +1,128 @@
+"""
+Trigram index for substring search over a month's text columns.
+
+A month has millions of rows but far fewer distinct FileName / SourcePath /
+DestinationPath / ErrorMessageClean values. Each column is factorised once
+(row -> unique value code), and the unique values, lower-cased, are indexed
+by their character trigrams:
+
+- all trigrams are computed in one vectorised pass over the concatenated
+  UTF-32 code points and packed into int64 keys (3 x 21 bits);
+- postings are a CSR layout: sorted distinct keys, offsets, and the ids of
+  the unique values containing each trigram (ascending, deduplicated).
+
+search("needle") intersects the posting lists of the needle's trigrams
+(shortest first), verifies the few candidates with a real substring check,
+and maps matching value ids back to row positions through the codes
+(one boolean take over the rows). Needles shorter than 3 characters scan
+the unique values instead. Matching is case-insensitive.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMNS = ["FileName", "SourcePath", "DestinationPath", "ErrorMessageClean"]
+
+_SHIFT = np.int64(21)
+
+def _code_points(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenated code points of values, each followed by a 0 separator,
+    and the owning value id of every position."""
+    lengths = np.fromiter((len(v) + 1 for v in values), dtype=np.int64, count=len(values))
+    text = "\0".join(values) + "\0"
+    cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    owner = np.repeat(np.arange(len(values), dtype=np.int32), lengths)
+    return cps, owner
+
+def _trigram_keys(cps: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """int64 key per position that starts a trigram, and the valid positions."""
+    if len(cps) < 3:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    a, b, c = cps[:-2], cps[1:-1], cps[2:]
+    valid = np.flatnonzero((a != 0) & (b != 0) & (c != 0))
+    keys = (a[valid] << (2 * _SHIFT)) | (b[valid] << _SHIFT) | c[valid]
+    return keys, valid
+
+def needle_keys(needle: str) -> np.ndarray:
+    cps = np.frombuffer(needle.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    keys, _ = _trigram_keys(cps)
+    return np.unique(keys)
+
+class ColumnIndex:
+    """Trigram postings over the unique values of one text column."""
+
+    def __init__(self, series: pd.Series):
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.codes = codes.astype(np.int32, copy=False)
+        self.values = np.asarray(uniques, dtype=object)
+        self.lowered = [str(v).replace("\0", "").lower() for v in self.values]
+
+        cps, owner = _code_points(self.lowered)
+        keys, pos = _trigram_keys(cps)
+        owners = owner[pos]
+        # Positions run in value order, so a stable sort by key leaves each
+        # key's owners ascending; drop repeats of (key, owner).
+        order = np.argsort(keys, kind="stable")
+        keys, owners = keys[order], owners[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (owners[1:] != owners[:-1])
+        keys, owners = keys[keep], owners[keep]
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        self.keys = keys[starts]
+        self.offsets = np.r_[starts, len(keys)].astype(np.int64)
+        self.postings = owners
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.keys.nbytes + self.offsets.nbytes + self.postings.nbytes
+
+    def _posting(self, key: np.int64) -> np.ndarray:
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return np.empty(0, dtype=np.int32)
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def matching_values(self, needle: str) -> np.ndarray:
+        """Ids of unique values containing needle (already lower-cased)."""
+        keys = needle_keys(needle)
+        if len(keys) == 0:
+            candidates = range(len(self.lowered))
+        else:
+            lists = sorted((self._posting(k) for k in keys), key=len)
+            candidates = lists[0]
+            for other in lists[1:]:
+                if len(candidates) == 0:
+                    break
+                candidates = np.intersect1d(candidates, other, assume_unique=True)
+        lowered = self.lowered
+        return np.fromiter((i for i in candidates if needle in lowered[i]), dtype=np.int64)
+
+    def rows_for(self, value_ids: np.ndarray) -> np.ndarray:
+        """Boolean row mask for rows whose value is one of value_ids."""
+        hit = np.zeros(len(self.values) + 1, dtype=bool)  # last slot: NaN rows (code -1)
+        hit[value_ids] = True
+        return hit[self.codes]
+
+class TrigramIndex:
+    def __init__(self, run: pd.DataFrame, columns=SEARCH_COLUMNS):
+        self.columns = {c: ColumnIndex(run[c]) for c in columns if c in run.columns}
+        self.n_rows = len(run)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ix.nbytes for ix in self.columns.values())
+
+    def search(self, text: str, columns=None) -> np.ndarray:
+        """Row positions where any of columns (default: all indexed) contains text."""
+        needle = (text or "").replace("\0", "").lower()
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if not needle:
+            return np.flatnonzero(mask)
+        for name in columns or self.columns:
+            ix = self.columns[name]
+            ids = ix.matching_values(needle)
+            if len(ids):
+                mask |= ix.rows_for(ids)
+        return np.flatnonzero(mask)